@@ -0,0 +1,1335 @@
+#!/usr/bin/env python3
+"""
+📏 Reality Engine Benchmark Suite
+=================================
+
+Repeatable micro/macro benchmarks for the Reality Engine hot paths.
+Baselines live in benchmarks/baselines.json and `compare` flags
+statistically significant regressions (Welch's t-test + minimum slowdown).
+A benchmark without a baseline fails `compare` (exit 2) unless
+--allow-new is given - otherwise an empty file would pass everything.
+
+Benchmarks:
+    emit_event          micro  - one lifecycle event
+    check_rate_limit    micro  - one Redis rate-limit decision
+    vote                macro  - one POST /api/vote round trip
+    stats_10k           macro  - GET /api/stats over 10k rows
+    stats_100k          macro  - GET /api/stats over 100k rows
+    stats_1m            macro  - GET /api/stats over 1M rows
+    poll_stats_200      macro  - GET /api/polls/<id>/stats, 200 polls x 5k votes
+    polls_list_200      macro  - GET /api/polls over 200 polls
+    container_start     macro  - get_postgres_container() cold start
+    bulk_load_100k      macro  - COPY 100k synthetic votes
+    export_100k         macro  - GET /api/export (CSV) over 100k rows
+    metrics_observe     micro  - one counter inc + one histogram observe
+
+Usage:
+    python3 benchmark.py list
+    python3 benchmark.py run                        # run everything
+    python3 benchmark.py run --only emit_event vote # run a subset
+    python3 benchmark.py run --save                 # refresh baselines
+    python3 benchmark.py run --output results.json  # keep raw results
+    python3 benchmark.py compare                    # run + compare to baselines
+    python3 benchmark.py compare --current results.json
+    python3 benchmark.py compare --only vote --allow-new  # no baseline yet: report, don't fail
+    python3 benchmark.py serving                    # threaded Flask vs asyncio
+    python3 benchmark.py serving --modes threaded multiworker --workers 1 2 4
+    python3 benchmark.py serving --subscribers 1000 --votes 2000
+    python3 benchmark.py roundtrips                 # DB round trips per request
+    python3 benchmark.py export --rows 1000000      # /api/export rows/s and MB/s
+    python3 benchmark.py partitions                 # plain vs hash-partitioned votes
+    python3 benchmark.py partitions --layouts 0 8 --rows 5000000 --writers 32
+    python3 benchmark.py shards                     # vote throughput on 1, 2, 4 shards
+    python3 benchmark.py shards --counts 1 8 --votes 100000 --writers 64
+    python3 benchmark.py startup                    # import audit + cold start
+    python3 benchmark.py startup --runs 0           # import audit only (no Docker)
+
+Note: benchmarks import reality_engine, so Docker must be running and
+port 5001 must be free (stop the show first).
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import math
+import os
+import platform
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import bulk_load
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(HERE, "benchmarks", "baselines.json")
+
+# Regression thresholds: significant at ALPHA *and* slower by MIN_SLOWDOWN
+ALPHA = 0.01
+MIN_SLOWDOWN = 0.10
+
+# ==============================================================================
+# BENCHMARK REGISTRY
+# ==============================================================================
+
+BENCHMARKS = {}
+
+def benchmark(name, kind="micro", repeat=200, warmup=10):
+    """Register a benchmark function.
+
+    The function receives the imported engine module plus `repeat`/`warmup`
+    and returns a list of per-iteration durations in seconds.
+    """
+    def decorator(func):
+        BENCHMARKS[name] = {
+            "func": func,
+            "kind": kind,
+            "repeat": repeat,
+            "warmup": warmup,
+            "doc": (func.__doc__ or "").strip().split("\n")[0],
+        }
+        return func
+    return decorator
+
+def time_calls(op, repeat, warmup):
+    """Call op() warmup+repeat times and return timed durations (seconds)"""
+    for _ in range(warmup):
+        op()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        op()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow engine console output so terminal I/O doesn't dominate timings"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def load_engine():
+    """Import reality_engine and run its pre-flight checks"""
+    import reality_engine
+    reality_engine.run_preflight()
+    return reality_engine
+
+def engine_connection(engine):
+    """Open a psycopg connection to the engine's Postgres container"""
+    container = engine.get_postgres_container()
+    return engine.psycopg.connect(**engine.postgres_conninfo(container))
+
+def truncate_votes(engine):
+    """Empty the votes table (and drop extra polls) between benchmarks"""
+    conn = engine_connection(engine)
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE votes RESTART IDENTITY")
+        cur.execute("DELETE FROM polls WHERE id <> %s", (engine.schema.DEFAULT_POLL_ID,))
+    conn.commit()
+    conn.close()
+
+def seed_votes(engine, rows, skew=0.0, seed=42):
+    """Fill the votes table with `rows` synthetic votes (one COPY, uniform by default)"""
+    conn = engine_connection(engine)
+    try:
+        bulk_load.copy_votes(conn, bulk_load.synthetic_votes(rows, skew=skew, seed=seed, prefix="bench"),
+                             truncate=True)
+    finally:
+        conn.close()
+
+def seed_polls(engine, polls, votes_per_poll):
+    """`polls` extra polls with `votes_per_poll` skewed votes each; returns their ids"""
+    import db
+
+    truncate_votes(engine)
+    conn = engine_connection(engine)
+    try:
+        ids = [db.create_poll(conn, f"Bench poll {n}", bulk_load.DEFAULT_CHOICES)["id"] for n in range(polls)]
+        conn.commit()
+        for poll_id in ids:
+            votes = bulk_load.synthetic_votes(votes_per_poll, seed=poll_id, prefix=f"p{poll_id}")
+            bulk_load.copy_votes(conn, votes, analyze=False, poll_id=poll_id)
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE votes")
+        conn.commit()
+    finally:
+        conn.close()
+    return ids
+
+# ==============================================================================
+# BENCHMARKS
+# ==============================================================================
+
+@benchmark("emit_event", kind="micro", repeat=5000, warmup=100)
+def bench_emit_event(engine, repeat, warmup):
+    """emit_event() - append one lifecycle event"""
+    with quiet():
+        return time_calls(
+            lambda: engine.emit_event("bench", "system", {"n": 1}),
+            repeat, warmup
+        )
+
+@benchmark("check_rate_limit", kind="micro", repeat=1000, warmup=20)
+def bench_check_rate_limit(engine, repeat, warmup):
+    """check_rate_limit() - one Redis INCR/EXPIRE decision"""
+    was_enabled = engine.rate_limit_enabled()
+    if not was_enabled:
+        engine.STATE.toggle("rate_limit")
+    counter = iter(range(10**9))
+
+    try:
+        with quiet():
+            engine.get_redis_container()
+            return time_calls(
+                lambda: engine.check_rate_limit(f"bench-{next(counter)}"),
+                repeat, warmup
+            )
+    finally:
+        if not was_enabled:
+            engine.STATE.toggle("rate_limit")
+
+@benchmark("vote", kind="macro", repeat=300, warmup=10)
+def bench_vote(engine, repeat, warmup):
+    """POST /api/vote - one full vote round trip (new session per call)"""
+    with quiet():
+        engine.get_postgres_container()
+        truncate_votes(engine)
+
+        def op():
+            client = engine.app.test_client()
+            response = client.post('/api/vote', json={"choice": "Python"})
+            assert response.status_code == 200, response.get_json()
+
+        samples = time_calls(op, repeat, warmup)
+        truncate_votes(engine)
+        return samples
+
+def make_stats_benchmark(rows):
+    def bench_stats(engine, repeat, warmup):
+        with quiet():
+            seed_votes(engine, rows)
+            client = engine.app.test_client()
+
+            def op():
+                response = client.get('/api/stats')
+                assert response.get_json()["total_votes"] == rows
+
+            samples = time_calls(op, repeat, warmup)
+            truncate_votes(engine)
+            return samples
+
+    bench_stats.__doc__ = f"GET /api/stats - leaderboard over {rows:,} rows"
+    return bench_stats
+
+for _label, _rows, _repeat in (("10k", 10_000, 100), ("100k", 100_000, 50), ("1m", 1_000_000, 20)):
+    benchmark(f"stats_{_label}", kind="macro", repeat=_repeat, warmup=3)(make_stats_benchmark(_rows))
+
+@benchmark("container_start", kind="macro", repeat=5, warmup=0)
+def bench_container_start(engine, repeat, warmup):
+    """get_postgres_container() - cold start incl. schema bootstrap"""
+    samples = []
+    with quiet():
+        for _ in range(repeat):
+            if engine.postgres_container is not None:
+                engine.postgres_container.stop()
+                engine.postgres_container = None
+            engine.stop_shards()  # SHARDS > 1: the next start brings up fresh ones
+
+            start = time.perf_counter()
+            engine.get_postgres_container()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+@benchmark("poll_stats_200", kind="macro", repeat=200, warmup=10)
+def bench_poll_stats(engine, repeat, warmup):
+    """GET /api/polls/<id>/stats - one of 200 polls x 5k votes (1M rows)"""
+    with quiet():
+        engine.get_postgres_container()
+        ids = seed_polls(engine, 200, 5_000)
+        client = engine.app.test_client()
+        picks = iter(ids * (repeat + warmup))
+
+        def op():
+            response = client.get(f'/api/polls/{next(picks)}/stats')
+            assert response.get_json()["total_votes"] == 5_000
+
+        samples = time_calls(op, repeat, warmup)
+        truncate_votes(engine)
+        return samples
+
+@benchmark("polls_list_200", kind="macro", repeat=100, warmup=5)
+def bench_polls_list(engine, repeat, warmup):
+    """GET /api/polls - 200 polls with totals (1M rows)"""
+    with quiet():
+        engine.get_postgres_container()
+        seed_polls(engine, 200, 5_000)
+        client = engine.app.test_client()
+
+        def op():
+            response = client.get('/api/polls')
+            assert len(response.get_json()["polls"]) == 201
+
+        samples = time_calls(op, repeat, warmup)
+        truncate_votes(engine)
+        return samples
+
+@benchmark("bulk_load_100k", kind="macro", repeat=5, warmup=1)
+def bench_bulk_load(engine, repeat, warmup):
+    """COPY 100k synthetic votes - the bulk loader's throughput"""
+    with quiet():
+        engine.get_postgres_container()
+        samples = time_calls(lambda: seed_votes(engine, 100_000, skew=1.0), repeat, warmup)
+        truncate_votes(engine)
+        return samples
+
+@benchmark("export_100k", kind="macro", repeat=10, warmup=1)
+def bench_export(engine, repeat, warmup):
+    """GET /api/export - stream 100k votes as CSV"""
+    with quiet():
+        engine.get_postgres_container()
+        seed_votes(engine, 100_000, skew=1.0)
+        client = engine.app.test_client()
+        samples = time_calls(lambda: stream_export(client, "csv"), repeat, warmup)
+        truncate_votes(engine)
+        return samples
+
+@benchmark("metrics_observe", kind="micro", repeat=20000, warmup=1000)
+def bench_metrics_observe(engine, repeat, warmup):
+    """Per-request instrumentation cost (counter + histogram)"""
+    requests_total = engine.HTTP_REQUESTS.labels("/bench", "GET", 200)
+    latency = engine.HTTP_LATENCY.labels("/bench")
+
+    def op():
+        requests_total.inc()
+        latency.observe(0.003)
+
+    return time_calls(op, repeat, warmup)
+
+# ==============================================================================
+# STATISTICS
+# ==============================================================================
+
+def summarize(samples):
+    """Summary statistics stored in baselines/results"""
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        "n": n,
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.stdev(ordered) if n > 1 else 0.0,
+        "median": statistics.median(ordered),
+        "p95": ordered[min(n - 1, int(math.ceil(0.95 * n)) - 1)],
+        "min": ordered[0],
+    }
+
+def _betacf(a, b, x):
+    """Continued fraction for the regularized incomplete beta function"""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+
+    for m in range(1, 300):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                   -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + aa / c
+            c = c if abs(c) > tiny else tiny
+            delta = d * c
+            h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+def _betainc(a, b, x):
+    """Regularized incomplete beta I_x(a, b)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(
+        math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+        + a * math.log(x) + b * math.log(1.0 - x)
+    )
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+def welch_p_slower(baseline, current):
+    """One-sided Welch's t-test p-value for 'current mean > baseline mean'"""
+    v1 = baseline["stdev"] ** 2 / baseline["n"]
+    v2 = current["stdev"] ** 2 / current["n"]
+    if v1 + v2 == 0:
+        return 0.0 if current["mean"] > baseline["mean"] else 1.0
+
+    t = (current["mean"] - baseline["mean"]) / math.sqrt(v1 + v2)
+    # Welch-Satterthwaite degrees of freedom
+    denominator = sum(
+        v ** 2 / (s["n"] - 1) for v, s in ((v1, baseline), (v2, current)) if s["n"] > 1
+    )
+    df = (v1 + v2) ** 2 / denominator if denominator else 1.0
+    # Student's t survival function via the incomplete beta function
+    tail = 0.5 * _betainc(df / 2.0, 0.5, df / (df + t * t))
+    return tail if t > 0 else 1.0 - tail
+
+def compare_results(baselines, current, alpha=ALPHA, min_slowdown=MIN_SLOWDOWN):
+    """Compare summaries; returns a list of per-benchmark verdict dicts"""
+    verdicts = []
+    for name, cur in sorted(current.items()):
+        base = baselines.get(name)
+        if base is None:
+            verdicts.append({"name": name, "status": "new", "current": cur})
+            continue
+
+        change = (cur["mean"] - base["mean"]) / base["mean"] if base["mean"] else 0.0
+        p_value = welch_p_slower(base, cur)
+
+        if p_value < alpha and change > min_slowdown:
+            status = "regression"
+        elif welch_p_slower(cur, base) < alpha and change < -min_slowdown:
+            status = "improvement"
+        else:
+            status = "ok"
+
+        verdicts.append({
+            "name": name,
+            "status": status,
+            "change": change,
+            "p_value": p_value,
+            "baseline": base,
+            "current": cur,
+        })
+    return verdicts
+
+# ==============================================================================
+# SERVING MODES (threaded Flask vs asyncio)
+# ==============================================================================
+
+SERVING_MODES = {
+    "threaded": "reality_engine.py",
+    "asgi": "reality_engine_asgi.py",
+    "multiworker": "serve.py",
+}
+ENGINE_HOST, ENGINE_PORT = "127.0.0.1", 5001
+# serve.py's own defaults
+DEFAULT_WORKERS = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2))
+DEFAULT_THREADS = 32
+
+def http_call(method, path, body=None, timeout=30):
+    """One request on a fresh connection (= fresh session = new voter)"""
+    conn = http.client.HTTPConnection(ENGINE_HOST, ENGINE_PORT, timeout=timeout)
+    try:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+def wait_for_engine(proc, timeout=180):
+    """Poll /api/health until the engine answers (container start included)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Engine exited early (code {proc.returncode})")
+        try:
+            if http_call("GET", "/api/health", timeout=2) == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("Engine did not become healthy in time")
+
+def open_sse_subscribers(count):
+    """Idle /api/events streams: connect, send the request, never read"""
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection((ENGINE_HOST, ENGINE_PORT), timeout=10)
+        sock.sendall(b"GET /api/events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+        sockets.append(sock)
+    return sockets
+
+def server_threads(pid):
+    """OS threads in the engine process tree (Linux /proc only)"""
+    if not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("Threads:"):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+        pending.extend(children.get(current, []))
+    return total
+
+def worker_threads(subscribers, concurrency, workers, threads=None):
+    """
+    gthread threads per serve.py worker. Every open SSE stream holds a
+    thread, so each worker needs its share of the streams plus one thread
+    per concurrent voter, or the votes queue behind the streams. `threads`
+    given: checked (ValueError if the streams alone would use them all).
+    """
+    needed = -(-subscribers // workers) + concurrency
+    if threads is None:
+        return max(DEFAULT_THREADS, needed)
+    if subscribers >= workers * threads:
+        raise ValueError(f"{subscribers} SSE streams need more than {workers} workers × {threads} threads"
+                         f" (at least {needed} threads per worker)")
+    return threads
+
+def timed_vote(_):
+    start = time.perf_counter()
+    try:
+        status = http_call("POST", "/api/vote", {"choice": "Python"})
+    except OSError:
+        status = None
+    return time.perf_counter() - start, status
+
+def run_serving_mode(mode, subscribers, votes, concurrency, workers=None, threads=None):
+    """Start one engine mode, hold idle SSE streams open, fire concurrent votes"""
+    command = [sys.executable, SERVING_MODES[mode]]
+    if mode == "multiworker":
+        threads = worker_threads(subscribers, concurrency, workers or DEFAULT_WORKERS, threads)
+        command += ["--threads", str(threads)]
+        if workers:
+            command += ["--workers", str(workers)]
+
+    proc = subprocess.Popen(
+        command,
+        cwd=HERE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=dict(os.environ, LOG_CONSOLE_RATE="5"),
+    )
+    sockets = []
+    try:
+        wait_for_engine(proc)
+        http_call("POST", "/api/control/reset")
+        http_call("GET", "/api/stats")
+
+        sockets = open_sse_subscribers(subscribers)
+        time.sleep(1.0)
+        threads_idle = server_threads(proc.pid)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed_vote, range(votes)))
+        wall = time.perf_counter() - start
+        threads_loaded = server_threads(proc.pid)
+
+        latencies = sorted(latency for latency, status in results if status == 200)
+        return {
+            "mode": f"{mode}x{workers}" if mode == "multiworker" and workers else mode,
+            "subscribers": subscribers,
+            "votes": votes,
+            "concurrency": concurrency,
+            "ok": len(latencies),
+            "errors": votes - len(latencies),
+            "votes_per_s": len(latencies) / wall if wall else 0.0,
+            "latency": summarize(latencies) if latencies else None,
+            "threads_idle": threads_idle,
+            "threads_loaded": threads_loaded,
+            "worker_threads": threads if mode == "multiworker" else None,
+        }
+    finally:
+        for sock in sockets:
+            sock.close()
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+def print_serving(results):
+    print("\n📊 Serving modes")
+    print("=" * 82)
+    print(f"{'mode':<14}{'SSE subs':>9}{'votes/s':>10}{'p50':>10}{'p95':>10}{'errors':>8}{'threads':>12}")
+    for r in results:
+        p50 = format_duration(r["latency"]["median"]) if r["latency"] else "-"
+        p95 = format_duration(r["latency"]["p95"]) if r["latency"] else "-"
+        threads = f"{r['threads_idle']}/{r['threads_loaded']}"
+        print(f"{r['mode']:<14}{r['subscribers']:>9}{r['votes_per_s']:>10.1f}{p50:>10}{p95:>10}"
+              f"{r['errors']:>8}{threads:>12}")
+    print("=" * 82)
+    print("threads = OS threads in the engine process tree (idle SSE only / under vote load)")
+
+# ==============================================================================
+# ROUND TRIPS (per-request connections vs pooled and prepared)
+# ==============================================================================
+
+class RoundTripProxy:
+    """
+    Loopback TCP proxy in front of Postgres that counts round trips.
+
+    A round trip is a client -> server flight that follows a server reply
+    (or opens the connection): however many packets a burst takes, the
+    client is waiting on the server between two flights.
+    """
+
+    def __init__(self, target_host, target_port):
+        self.target = (target_host, int(target_port))
+        self.round_trips = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(64)
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, name="roundtrip-proxy", daemon=True).start()
+
+    def reset(self):
+        with self._lock:
+            self.round_trips = self.connections = 0
+
+    def close(self):
+        self._server.close()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(self.target)
+            with self._lock:
+                self.connections += 1
+            # Per connection: which side sent last ("s" before the first flight)
+            state = {"last": "s"}
+            threading.Thread(target=self._pump, args=(client, upstream, state, "c"), daemon=True).start()
+            threading.Thread(target=self._pump, args=(upstream, client, state, "s"), daemon=True).start()
+
+    def _pump(self, source, sink, state, side):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                with self._lock:
+                    if side == "c" and state["last"] == "s":
+                        self.round_trips += 1
+                    state["last"] = side
+                sink.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (source, sink):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sock.close()
+
+# The request path before db.py: aggregates counted over the whole votes table
+LEGACY_VOTE = "INSERT INTO votes (user_id, choice) VALUES (%s, %s)"
+LEGACY_STATS = (
+    "SELECT choice, COUNT(*) AS count FROM votes GROUP BY choice ORDER BY count DESC",
+    "SELECT COUNT(*) FROM votes",
+)
+
+def roundtrip_strategies(conninfo):
+    """{strategy: {operation: callable}} for the old and the pooled DB paths"""
+    import psycopg
+    import db
+
+    def per_request(statements):
+        def op():
+            conn = psycopg.connect(**conninfo)
+            with conn.cursor() as cur:
+                for sql, params in statements():
+                    cur.execute(sql, params)
+                    if cur.description:
+                        cur.fetchall()
+            conn.commit()
+            conn.close()
+        return op
+
+    counter = iter(range(10**9))
+    vote_params = lambda: [(LEGACY_VOTE, (f"rt-{next(counter)}", "Python"))]
+    stats_params = lambda: [(sql, None) for sql in LEGACY_STATS]
+
+    pool = db.ConnectionPool(conninfo)
+
+    def pooled_vote():
+        with pool.connection() as conn:
+            db.insert_vote(conn, f"rt-{next(counter)}", "Python")
+
+    def pooled_stats():
+        with pool.connection() as conn:
+            db.fetch_stats(conn)
+
+    return pool, {
+        "per-request connection": {"vote": per_request(vote_params), "stats": per_request(stats_params)},
+        "pooled + prepared + tallies": {"vote": pooled_vote, "stats": pooled_stats},
+    }
+
+def measure_round_trips(requests=200, rows=10_000):
+    """Round trips and latency per request for each DB strategy"""
+    engine = load_engine()
+    with quiet():
+        container = engine.get_postgres_container()
+        seed_votes(engine, rows)
+
+    conninfo = engine.postgres_conninfo(container)
+    proxy = RoundTripProxy(conninfo["host"], conninfo["port"])
+    pool, strategies = roundtrip_strategies(dict(conninfo, host="127.0.0.1", port=proxy.port))
+    results = []
+    try:
+        for strategy, operations in strategies.items():
+            for operation, op in operations.items():
+                op()  # warm up: connect/prepare outside the measurement
+                proxy.reset()
+                samples = time_calls(op, requests, warmup=0)
+                results.append({
+                    "strategy": strategy,
+                    "operation": operation,
+                    "round_trips": proxy.round_trips / requests,
+                    "connections": proxy.connections / requests,
+                    "latency": summarize(samples),
+                })
+    finally:
+        pool.close()
+        proxy.close()
+        truncate_votes(engine)
+    return results
+
+def print_round_trips(results):
+    print("\n🔁 Postgres round trips per request")
+    print("=" * 78)
+    print(f"{'strategy':<32}{'op':<8}{'round trips':>12}{'connects':>10}{'p50':>8}{'p95':>8}")
+    for r in results:
+        print(f"{r['strategy']:<32}{r['operation']:<8}{r['round_trips']:>12.2f}{r['connections']:>10.2f}"
+              f"{format_duration(r['latency']['median']):>8}{format_duration(r['latency']['p95']):>8}")
+    print("=" * 78)
+
+# ==============================================================================
+# EXPORT THROUGHPUT (/api/export streaming)
+# ==============================================================================
+
+def stream_export(client, fmt):
+    """GET /api/export without buffering; returns (bytes, lines, largest chunk)"""
+    response = client.get(f"/api/export?format={fmt}", buffered=False)
+    assert response.status_code == 200, response.status_code
+    size = lines = largest = 0
+    try:
+        for chunk in response.response:
+            size += len(chunk)
+            lines += chunk.count(b"\n")
+            largest = max(largest, len(chunk))
+    finally:
+        response.close()
+    return size, lines, largest
+
+def measure_export(rows=1_000_000, formats=("csv", "ndjson"), runs=3):
+    """Rows/s and MB/s for a full export in each format"""
+    engine = load_engine()
+    with quiet():
+        engine.get_postgres_container()
+        seed_votes(engine, rows, skew=1.0)
+
+    client = engine.app.test_client()
+    results = []
+    try:
+        for fmt in formats:
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                size, lines, largest = stream_export(client, fmt)
+                samples.append(time.perf_counter() - start)
+                assert lines == rows + (fmt == "csv"), f"{fmt}: {lines} lines for {rows} rows"
+
+            median = statistics.median(samples)
+            results.append({
+                "format": fmt,
+                "rows": rows,
+                "bytes": size,
+                "largest_chunk": largest,
+                "rows_per_s": rows / median,
+                "mb_per_s": size / median / 1e6,
+                "latency": summarize(samples),
+            })
+    finally:
+        with quiet():
+            truncate_votes(engine)
+    return results
+
+def print_export(results):
+    print(f"\n📤 /api/export throughput ({results[0]['rows']:,} rows)")
+    print("=" * 66)
+    print(f"{'format':<10}{'rows/s':>12}{'MB/s':>8}{'size':>10}{'p50':>10}{'largest chunk':>16}")
+    for r in results:
+        print(f"{r['format']:<10}{r['rows_per_s']:>12,.0f}{r['mb_per_s']:>8.1f}{r['bytes'] / 1e6:>8.1f}MB"
+              f"{format_duration(r['latency']['median']):>10}{r['largest_chunk'] / 1e3:>14.0f}kB")
+    print("=" * 66)
+    print("Largest chunk stays the same at any row count: the server holds one batch at a time.")
+
+# ==============================================================================
+# PARTITIONED VOTES (plain table vs hash partitions)
+# ==============================================================================
+
+@contextlib.contextmanager
+def layout_database(engine, partitions):
+    """A scratch database in the engine's Postgres with the votes schema in the given layout"""
+    import schema
+
+    engine_conninfo = engine.postgres_conninfo(engine.get_postgres_container())
+    admin = engine.psycopg.connect(**engine_conninfo, autocommit=True)
+    name = f"bench_layout_{partitions}"
+    admin.execute(f"DROP DATABASE IF EXISTS {name}")
+    admin.execute(f"CREATE DATABASE {name}")
+    conninfo = dict(engine_conninfo, dbname=name)
+    try:
+        with engine.psycopg.connect(**conninfo) as conn:
+            schema.init_schema(conn, partitions=partitions)
+        yield conninfo
+    finally:
+        admin.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        admin.close()
+
+def concurrent_inserts(pool_for, writers, inserts):
+    """`inserts` single-row votes split over `writers` threads, each on pool_for(user_id);
+    returns (seconds, latency samples)"""
+    import db
+
+    def write(worker):
+        samples = []
+        for n in range(inserts // writers):
+            user_id = f"w{worker}-{n}"
+            start = time.perf_counter()
+            with pool_for(user_id).connection() as conn:
+                db.insert_vote(conn, user_id, bulk_load.DEFAULT_CHOICES[n % 4])
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as executor:
+        samples = [sample for worker in executor.map(write, range(writers)) for sample in worker]
+    return time.perf_counter() - start, samples
+
+def measure_partitions(layouts=(0, 4, 16), rows=1_000_000, writers=16, inserts=20_000, runs=5):
+    """COPY, concurrent INSERT and full-count scaling per votes layout (0 = plain table)"""
+    import db
+
+    engine = load_engine()
+    results = []
+    for partitions in layouts:
+        with quiet(), layout_database(engine, partitions) as conninfo:
+            with engine.psycopg.connect(**conninfo) as conn:
+                start = time.perf_counter()
+                bulk_load.copy_votes(conn, bulk_load.synthetic_votes(rows, prefix="bench"))
+                copy_seconds = time.perf_counter() - start
+
+            pool = db.ConnectionPool(conninfo, max_idle=writers)
+            try:
+                insert_seconds, insert_samples = concurrent_inserts(lambda user_id: pool, writers, inserts)
+                with pool.connection() as conn:
+                    tallies = db.fetch_stats(conn)
+                    db.count_votes(conn)  # warm up: plan + buffer cache
+                    count_samples = time_calls(lambda: db.count_votes(conn), runs, warmup=0)
+                    counted = db.count_votes(conn)
+            finally:
+                pool.close()
+
+        assert tallies == counted, f"{partitions} partitions: tallies {tallies} != counted {counted}"
+        results.append({
+            "partitions": partitions,
+            "rows": rows,
+            "copy_rows_per_s": rows / copy_seconds,
+            "writers": writers,
+            "inserts_per_s": len(insert_samples) / insert_seconds,
+            "insert_latency": summarize(insert_samples),
+            "count_latency": summarize(count_samples),
+            "total_votes": counted[1],
+        })
+    return results
+
+def print_partitions(results):
+    print(f"\n🧩 votes layout: plain vs hash-partitioned ({results[0]['rows']:,} rows copied, "
+          f"{results[0]['writers']} concurrent writers)")
+    print("=" * 78)
+    print(f"{'layout':<16}{'COPY rows/s':>14}{'inserts/s':>12}{'insert p95':>12}{'full count p50':>16}")
+    for r in results:
+        layout = f"{r['partitions']} partitions" if r["partitions"] else "plain table"
+        print(f"{layout:<16}{r['copy_rows_per_s']:>14,.0f}{r['inserts_per_s']:>12,.0f}"
+              f"{format_duration(r['insert_latency']['p95']):>12}"
+              f"{format_duration(r['count_latency']['median']):>16}")
+    print("=" * 78)
+    print("Stats still read poll_tallies in every layout; the full count is the recount/verification path.")
+
+# ==============================================================================
+# SHARDS (votes spread over N Postgres containers)
+# ==============================================================================
+
+@contextlib.contextmanager
+def shard_containers(engine, count):
+    """`count` Postgres containers with the votes schema, started in parallel, as a shards.ShardSet"""
+    import db
+    import schema
+    import shards
+    from testcontainers.postgres import PostgresContainer
+
+    def start(_):
+        container = PostgresContainer("postgres:15-alpine")
+        container.start()
+        with engine.psycopg.connect(**engine.postgres_conninfo(container)) as conn:
+            schema.init_schema(conn)
+        return container
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        containers = list(executor.map(start, range(count)))
+    shard_set = shards.ShardSet([db.ConnectionPool(engine.postgres_conninfo(c), max_idle=64) for c in containers])
+    try:
+        yield shard_set
+    finally:
+        shard_set.close()
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            list(executor.map(lambda c: c.stop(), containers))
+
+def measure_shards(counts=(1, 2, 4), votes=20_000, writers=32, stats_requests=200):
+    """Vote throughput and fan-out stats latency per shard count"""
+    import shards
+
+    engine = load_engine()
+    results = []
+    for count in counts:
+        with quiet(), shard_containers(engine, count) as shard_set:
+            concurrent_inserts(shard_set.pool_for, writers, writers * 10)  # warm up: connections, prepared statements
+            shards.delete_votes(shard_set)
+
+            seconds, samples = concurrent_inserts(shard_set.pool_for, writers, votes)
+            stats_samples = time_calls(lambda: shards.fetch_stats(shard_set, 1), stats_requests, warmup=10)
+            _, total = shards.fetch_stats(shard_set, 1)
+
+        assert total == len(samples), f"{count} shards: stats say {total} votes, {len(samples)} were cast"
+        results.append({
+            "shards": count,
+            "votes": len(samples),
+            "writers": writers,
+            "votes_per_s": len(samples) / seconds,
+            "vote_latency": summarize(samples),
+            "stats_latency": summarize(stats_samples),
+        })
+    return results
+
+def print_shards(results):
+    print(f"\n🧱 Sharded votes ({results[0]['votes']:,} votes, {results[0]['writers']} concurrent writers)")
+    print("=" * 70)
+    print(f"{'shards':<8}{'votes/s':>12}{'speedup':>10}{'vote p50':>10}{'vote p95':>10}{'stats p50':>11}")
+    base = results[0]["votes_per_s"]
+    for r in results:
+        print(f"{r['shards']:<8}{r['votes_per_s']:>12,.0f}{r['votes_per_s'] / base:>9.2f}x"
+              f"{format_duration(r['vote_latency']['median']):>10}{format_duration(r['vote_latency']['p95']):>10}"
+              f"{format_duration(r['stats_latency']['median']):>11}")
+    print("=" * 70)
+    print("All shards share this host's CPUs and disk: scaling flattens once they are saturated.")
+
+# ==============================================================================
+# STARTUP (import-time audit + cold start)
+# ==============================================================================
+
+STARTUP_MODULES = ("reality_engine", "workshop")
+COLD_START_TARGET = 1.5  # seconds from `python3 reality_engine.py` to accepting connections
+
+def parse_importtime(stderr):
+    """Rows of `python -X importtime`: (self_us, cumulative_us, depth, module)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+def summarize_imports(rows, module, top=10):
+    """Total import time of `module` and the packages that cost the most"""
+    by_package = {}
+    for self_us, _, _, name in rows:
+        root = name.split(".")[0]
+        by_package[root] = by_package.get(root, 0) + self_us
+    total = next((cumulative for _, cumulative, depth, name in rows if name == module and depth == 0), None)
+    return {
+        "module": module,
+        "total_s": total / 1e6 if total is not None else None,
+        "modules_loaded": len(rows),
+        "packages": [
+            {"package": name, "self_s": us / 1e6}
+            for name, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+    }
+
+def audit_imports(module, top=10):
+    """Import `module` in a fresh interpreter under -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return summarize_imports(parse_importtime(result.stderr), module, top)
+
+def time_command(args, runs=5):
+    """Median wall time of a short-lived command (e.g. --help)"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=HERE, capture_output=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def measure_cold_start(timeout=60):
+    """Seconds from spawning the engine until port 5001 accepts a connection"""
+    import control
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, SERVING_MODES["threaded"]],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Engine exited early (code {proc.returncode}) - is Docker running?")
+            try:
+                socket.create_connection((ENGINE_HOST, ENGINE_PORT), timeout=0.5).close()
+                return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Engine did not accept connections in time")
+    finally:
+        entry = next((e for e in control.registered() if e["pid"] == proc.pid), None)
+        if entry is not None:
+            control.stop(entry, timeout=30)
+        else:
+            proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+def print_startup(audits, cli, cold_starts, target):
+    print("\n📦 Import-time audit (fresh interpreter, -X importtime)")
+    print("=" * 60)
+    for audit in audits:
+        total = format_duration(audit["total_s"]) if audit["total_s"] is not None else "-"
+        print(f"{audit['module']}: {total} ({audit['modules_loaded']} modules)")
+        for package in audit["packages"]:
+            print(f"   {package['package']:<28}{format_duration(package['self_s']):>12}")
+    print("=" * 60)
+
+    print("\n⚡ Fast paths (median wall time)")
+    for command, seconds in cli.items():
+        print(f"   {command:<36}{format_duration(seconds):>12}")
+
+    if cold_starts:
+        median = statistics.median(cold_starts)
+        verdict = "✅" if median <= target else "❌"
+        print(f"\n🚀 Cold start to first accepted connection: {format_duration(median)} median "
+              f"over {len(cold_starts)} run(s) {verdict} target {format_duration(target)}")
+
+# ==============================================================================
+# RUNNER
+# ==============================================================================
+
+def format_duration(seconds):
+    """Human-friendly duration"""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+def run_benchmarks(names):
+    """Run the selected benchmarks and return {name: summary}"""
+    engine = load_engine()
+    results = {}
+
+    try:
+        for name in names:
+            spec = BENCHMARKS[name]
+            print(f"⏱️  {name:<18} ({spec['kind']}, {spec['repeat']} runs)...", end=" ", flush=True)
+            samples = spec["func"](engine, spec["repeat"], spec["warmup"])
+            results[name] = summarize(samples)
+            print(f"mean {format_duration(results[name]['mean'])}  "
+                  f"p95 {format_duration(results[name]['p95'])}")
+    finally:
+        with quiet():
+            if engine.redis_container is not None:
+                engine.redis_container.stop()
+            if engine.postgres_container is not None:
+                engine.postgres_container.stop()
+
+    return results
+
+def load_baselines(path):
+    """Load the benchmarks section of a baseline/results file"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("benchmarks", {})
+
+def write_results(path, results):
+    """Write results with machine metadata"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    payload = {
+        "_meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "benchmarks": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def print_verdicts(verdicts):
+    """Print the comparison table; returns number of regressions"""
+    icons = {"regression": "❌", "improvement": "🚀", "ok": "✅", "new": "🆕"}
+    print("\n📊 Comparison against baseline")
+    print("=" * 70)
+    regressions = 0
+
+    for v in verdicts:
+        icon = icons[v["status"]]
+        if v["status"] == "new":
+            print(f"{icon} {v['name']:<18} {format_duration(v['current']['mean']):>10}  (no baseline)")
+            continue
+        print(f"{icon} {v['name']:<18} {format_duration(v['baseline']['mean']):>10} → "
+              f"{format_duration(v['current']['mean']):>10}  {v['change']:+7.1%}  p={v['p_value']:.4f}")
+        if v["status"] == "regression":
+            regressions += 1
+
+    print("=" * 70)
+    return regressions
+
+def missing_baselines(baselines, names):
+    """The benchmarks in `names` that have nothing to be compared against"""
+    return [name for name in names if name not in baselines]
+
+def require_baselines(baselines, names, path):
+    """Exit (code 2) unless every benchmark in `names` has a baseline: a compare without one can't fail"""
+    missing = missing_baselines(baselines, names)
+    if missing:
+        print(f"❌ No baseline for: {', '.join(missing)} (in {path})")
+        print(f"   Record them on the reference machine: python3 benchmark.py run --save --only {' '.join(missing)}")
+        print("   Or pass --allow-new to report them as new without failing")
+        sys.exit(2)
+
+def select(only):
+    """Validate benchmark names"""
+    if not only:
+        return list(BENCHMARKS)
+    unknown = [name for name in only if name not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Unknown benchmark(s): {', '.join(unknown)}")
+        print(f"   Available: {', '.join(BENCHMARKS)}")
+        sys.exit(2)
+    return only
+
+def main():
+    parser = argparse.ArgumentParser(description="Reality Engine benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List available benchmarks")
+
+    run_parser = sub.add_parser("run", help="Run benchmarks")
+    run_parser.add_argument("--only", nargs="+", help="Benchmarks to run")
+    run_parser.add_argument("--output", help="Write results JSON here")
+    run_parser.add_argument("--save", action="store_true", help="Merge results into the baseline file")
+
+    cmp_parser = sub.add_parser("compare", help="Compare results against baselines")
+    cmp_parser.add_argument("--only", nargs="+", help="Benchmarks to run")
+    cmp_parser.add_argument("--current", help="Compare an existing results JSON instead of running")
+    cmp_parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON file")
+    cmp_parser.add_argument("--alpha", type=float, default=ALPHA, help="Significance level")
+    cmp_parser.add_argument("--min-slowdown", type=float, default=MIN_SLOWDOWN,
+                            help="Minimum relative slowdown to flag (0.10 = 10%%)")
+    cmp_parser.add_argument("--allow-new", action="store_true",
+                            help="Report benchmarks without a baseline as new instead of failing")
+
+    serve_parser = sub.add_parser("serving", help="Compare serving modes (threaded, asyncio, multi-worker)")
+    serve_parser.add_argument("--modes", nargs="+", default=list(SERVING_MODES), choices=list(SERVING_MODES))
+    serve_parser.add_argument("--subscribers", type=int, default=200, help="Idle SSE streams held open")
+    serve_parser.add_argument("--votes", type=int, default=500, help="Votes to submit")
+    serve_parser.add_argument("--concurrency", type=int, default=32, help="Concurrent voters")
+    serve_parser.add_argument("--workers", type=int, nargs="+", default=[None],
+                              help="Worker counts for multiworker mode (e.g. 1 2 4)")
+    serve_parser.add_argument("--threads", type=int,
+                              help="Threads per worker in multiworker mode (default: enough for the SSE streams"
+                                   " plus the voters)")
+    serve_parser.add_argument("--output", help="Write results JSON here")
+
+    rt_parser = sub.add_parser("roundtrips", help="Postgres round trips per request (old vs pooled DB path)")
+    rt_parser.add_argument("--requests", type=int, default=200, help="Requests per strategy and operation")
+    rt_parser.add_argument("--rows", type=int, default=10_000, help="Votes seeded for the stats query")
+    rt_parser.add_argument("--output", help="Write results JSON here")
+
+    export_parser = sub.add_parser("export", help="/api/export throughput (CSV and NDJSON)")
+    export_parser.add_argument("--rows", type=int, default=1_000_000, help="Votes to seed and export")
+    export_parser.add_argument("--formats", nargs="+", default=["csv", "ndjson"], choices=["csv", "ndjson"])
+    export_parser.add_argument("--runs", type=int, default=3, help="Full exports per format")
+    export_parser.add_argument("--output", help="Write results JSON here")
+
+    part_parser = sub.add_parser("partitions", help="Plain vs hash-partitioned votes (COPY, inserts, counts)")
+    part_parser.add_argument("--layouts", type=int, nargs="+", default=[0, 4, 16],
+                             help="Partition counts to compare (0 = plain table)")
+    part_parser.add_argument("--rows", type=int, default=1_000_000, help="Votes loaded with COPY")
+    part_parser.add_argument("--writers", type=int, default=16, help="Concurrent single-row writers")
+    part_parser.add_argument("--inserts", type=int, default=20_000, help="Single-row votes in total")
+    part_parser.add_argument("--runs", type=int, default=5, help="Full counts timed per layout")
+    part_parser.add_argument("--output", help="Write results JSON here")
+
+    shard_parser = sub.add_parser("shards", help="Vote throughput and stats fan-out per shard count")
+    shard_parser.add_argument("--counts", type=int, nargs="+", default=[1, 2, 4], help="Shard counts to compare")
+    shard_parser.add_argument("--votes", type=int, default=20_000, help="Single-row votes per shard count")
+    shard_parser.add_argument("--writers", type=int, default=32, help="Concurrent voters")
+    shard_parser.add_argument("--stats", type=int, default=200, help="Fan-out stats reads timed")
+    shard_parser.add_argument("--output", help="Write results JSON here")
+
+    startup_parser = sub.add_parser("startup", help="Import-time audit and cold-start time")
+    startup_parser.add_argument("--modules", nargs="+", default=list(STARTUP_MODULES), help="Modules to audit")
+    startup_parser.add_argument("--top", type=int, default=10, help="Packages listed per module")
+    startup_parser.add_argument("--runs", type=int, default=3, help="Cold starts to measure (0 = skip, no Docker)")
+    startup_parser.add_argument("--target", type=float, default=COLD_START_TARGET,
+                                help="Cold-start target in seconds")
+    startup_parser.add_argument("--output", help="Write results JSON here")
+
+    args = parser.parse_args()
+
+    if args.command == "roundtrips":
+        results = measure_round_trips(args.requests, args.rows)
+        print_round_trips(results)
+        if args.output:
+            write_results(args.output, {f"{r['strategy']}/{r['operation']}": r for r in results})
+            print(f"\n💾 Results written to {args.output}")
+        return
+
+    if args.command == "export":
+        results = measure_export(args.rows, args.formats, args.runs)
+        print_export(results)
+        if args.output:
+            write_results(args.output, {r["format"]: r for r in results})
+            print(f"\n💾 Results written to {args.output}")
+        return
+
+    if args.command == "partitions":
+        results = measure_partitions(args.layouts, args.rows, args.writers, args.inserts, args.runs)
+        print_partitions(results)
+        if args.output:
+            write_results(args.output, {f"partitions_{r['partitions']}": r for r in results})
+            print(f"\n💾 Results written to {args.output}")
+        return
+
+    if args.command == "shards":
+        results = measure_shards(args.counts, args.votes, args.writers, args.stats)
+        print_shards(results)
+        if args.output:
+            write_results(args.output, {f"shards_{r['shards']}": r for r in results})
+            print(f"\n💾 Results written to {args.output}")
+        return
+
+    if args.command == "startup":
+        audits = [audit_imports(module, args.top) for module in args.modules]
+        cli = {
+            "reality_engine.py --help": time_command(["reality_engine.py", "--help"]),
+            "workshop.py --help": time_command(["workshop.py", "--help"]),
+        }
+        cold_starts = [measure_cold_start() for _ in range(args.runs)]
+        print_startup(audits, cli, cold_starts, args.target)
+        if args.output:
+            write_results(args.output, {"imports": audits, "cli": cli, "cold_start_s": cold_starts})
+            print(f"\n💾 Results written to {args.output}")
+        if cold_starts and statistics.median(cold_starts) > args.target:
+            sys.exit(1)
+        return
+
+    if args.command == "serving":
+        # Too few threads for the SSE streams: fail now, not after a run of timeouts
+        if "multiworker" in args.modes and args.threads is not None:
+            for workers in args.workers:
+                try:
+                    worker_threads(args.subscribers, args.concurrency, workers or DEFAULT_WORKERS, args.threads)
+                except ValueError as e:
+                    serve_parser.error(str(e))
+        results = [
+            run_serving_mode(mode, args.subscribers, args.votes, args.concurrency, workers, args.threads)
+            for mode in args.modes
+            for workers in (args.workers if mode == "multiworker" else [None])
+        ]
+        print_serving(results)
+        if args.output:
+            write_results(args.output, {r["mode"]: r for r in results})
+            print(f"\n💾 Results written to {args.output}")
+        return
+
+    if args.command == "list":
+        for name, spec in BENCHMARKS.items():
+            print(f"   {name:<18} {spec['kind']:<6} {spec['doc']}")
+        return
+
+    if args.command == "run":
+        results = run_benchmarks(select(args.only))
+        if args.output:
+            write_results(args.output, results)
+            print(f"\n💾 Results written to {args.output}")
+        if args.save:
+            merged = load_baselines(BASELINE_FILE)
+            merged.update(results)
+            write_results(BASELINE_FILE, merged)
+            print(f"\n💾 Baselines updated: {BASELINE_FILE}")
+        return
+
+    baselines = load_baselines(args.baseline)
+    if args.current:
+        current = load_baselines(args.current)
+        if args.only:
+            current = {name: current[name] for name in select(args.only) if name in current}
+        if not args.allow_new:
+            require_baselines(baselines, current, args.baseline)
+    else:
+        names = select(args.only)
+        # Before the run, not after minutes of benchmarks
+        if not args.allow_new:
+            require_baselines(baselines, names, args.baseline)
+        current = run_benchmarks(names)
+
+    regressions = print_verdicts(
+        compare_results(baselines, current, alpha=args.alpha, min_slowdown=args.min_slowdown)
+    )
+    if regressions:
+        print(f"❌ {regressions} significant regression(s)")
+        sys.exit(1)
+    print("✅ No significant regressions")
+
+if __name__ == "__main__":
+    main()
@@ -3,149 +3,261 @@
 Cleanup script for Scenario 1: TestContainers Magic
 Removes orphaned containers, networks, and cleans up Docker resources
 Works in both Codespaces and local environments
+
+Talks to the Docker API through one client (no `docker` subprocesses)
+and removes containers, networks and volumes concurrently, so a CI host
+with hundreds of leaked test containers is clean in seconds.
+
+Usage:
+    python3 cleanup.py                        # everything TestContainers left behind
+    python3 cleanup.py --dry-run              # list what would be removed
+    python3 cleanup.py --older-than 30m       # only resources older than 30 minutes
+    python3 cleanup.py --label ci-run=1234 --image mysql:8
 """
 
+import argparse
+import os
+import shutil
+import signal
 import subprocess
 import sys
-import signal
 import time
-
-def run_command(cmd, ignore_errors=False):
-    """Run a shell command and return output"""
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import docker
+    from docker.errors import NotFound
+except ImportError as e:
+    print(f"❌ Missing packages: {e}")
+    print("\n💡 Solution:")
+    print("   pip install -r requirements.txt")
+    sys.exit(1)
+
+import control
+from docker_events import parse_docker_time
+
+DEFAULT_LABELS = ["org.testcontainers=true"]
+DEFAULT_IMAGES = ["postgres:15-alpine", "redis:7-alpine"]
+DEFAULT_WORKERS = 16
+
+AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_age(text):
+    """'90s', '10m', '2h', '1d' (or plain seconds) -> seconds"""
+    text = text.strip().lower()
+    unit = AGE_UNITS.get(text[-1:]) if text else None
+    number = text[:-1] if unit else text
     try:
-        result = subprocess.run(
-            cmd,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        if result.returncode != 0 and not ignore_errors:
-            print(f"   Warning: {result.stderr.strip()}")
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        print(f"   Timeout running: {cmd}")
-        return ""
-    except Exception as e:
-        if not ignore_errors:
-            print(f"   Error: {e}")
-        return ""
-
-def check_docker():
-    """Check if Docker is available"""
-    result = run_command("docker ps", ignore_errors=True)
-    if "Cannot connect" in result or not result:
+        seconds = float(number) * (unit or 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid age '{text}' (use e.g. 90s, 10m, 2h, 1d)")
+    if seconds < 0:
+        raise argparse.ArgumentTypeError("age must not be negative")
+    return seconds
+
+def get_client(workers=DEFAULT_WORKERS):
+    """Docker client with a connection pool sized for concurrent removal"""
+    try:
+        client = docker.from_env(timeout=60, max_pool_size=workers)
+        client.ping()
+        return client
+    except Exception:
         print("❌ Docker is not running!")
         print("   In Codespaces: Docker should be available automatically")
         print("   Locally: Start Docker Desktop")
         sys.exit(1)
 
-def stop_flask_apps():
-    """Stop any running Flask applications"""
-    print("🛑 Stopping Flask applications...")
+# Demo apps that may be running without a control channel (older
+# checkouts, workshop.py): matched by script name, sent SIGTERM, and
+# killed only if they ignore it
+APP_SCRIPTS = ["reality_engine.py", "reality_engine_asgi.py", "serve.py", "workshop.py", "app.py", "demo.py"]
 
-    # Find Python processes running our apps
-    processes = [
-        "reality_engine.py",
-        "workshop.py",
-        "app.py",
-        "demo.py"
-    ]
+def find_app_processes(scripts=APP_SCRIPTS, exclude=()):
+    """[(pid, script)] for running Python processes of our scripts (POSIX)"""
+    if sys.platform == "win32":
+        return []
+    try:
+        result = subprocess.run(["ps", "-axo", "pid=,command="], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+
+    found = []
+    for line in result.stdout.splitlines():
+        pid_text, _, command = line.strip().partition(" ")
+        if not pid_text.isdigit() or "python" not in command:
+            continue
+        pid = int(pid_text)
+        if pid == os.getpid() or pid in exclude:
+            continue
+        names = {os.path.basename(arg) for arg in command.split()}
+        for script in scripts:
+            if script in names:
+                found.append((pid, script))
+                break
+    return found
+
+def stop_flask_apps(timeout=15.0):
+    """Stop running demo apps: orderly shutdown first, signals only as a fallback"""
+    print("🛑 Stopping Flask applications...")
 
-    for proc in processes:
+    # Registered engines stop their own containers and flush their logs
+    entries = control.registered()
+    handled = set()
+    if entries:
+        with ThreadPoolExecutor(max_workers=len(entries)) as pool:
+            outcomes = list(pool.map(lambda entry: control.stop(entry, timeout=timeout), entries))
+        for outcome in outcomes:
+            handled.add(outcome["pid"])
+            label = f"{outcome['app']} (PID: {outcome['pid']})"
+            if outcome["method"] == "graceful":
+                stopped = ", ".join((outcome.get("summary") or {}).get("containers_stopped", [])) or "no containers"
+                print(f"   Stopped {label} gracefully in {outcome['seconds']:.1f}s ({stopped})")
+            elif outcome["method"] == "stale":
+                print(f"   Removed stale registration for PID {outcome['pid']}")
+            elif outcome["method"] == "failed":
+                print(f"   Warning: could not stop {label}: {outcome.get('error')}")
+            else:
+                print(f"   Stopped {label} ({outcome['method']} after {outcome['seconds']:.1f}s: "
+                      f"{outcome.get('error', 'shutdown timed out')})")
+
+    for pid, script in find_app_processes(exclude=handled):
         try:
-            # Find process IDs
-            result = subprocess.run(
-                f"pgrep -f {proc}",
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            pids = result.stdout.strip().split('\n')
-
-            for pid in pids:
-                if pid:
-                    try:
-                        subprocess.run(f"kill -9 {pid}", shell=True, check=False)
-                        print(f"   Stopped {proc} (PID: {pid})")
-                    except:
-                        pass
-        except:
+            os.kill(pid, signal.SIGTERM)
+            if not control.wait_exit(pid, 3):
+                os.kill(pid, signal.SIGKILL)
+            print(f"   Stopped {script} (PID: {pid})")
+        except ProcessLookupError:
             pass
+        except OSError as e:
+            print(f"   Warning: could not stop {script} (PID: {pid}): {e}")
 
     print("✅ Flask apps stopped\n")
 
-def remove_containers(filter_label=None, filter_image=None):
-    """Remove containers by label or image"""
-    if filter_label:
-        cmd = f'docker ps -a --filter "label={filter_label}" -q'
-        name = filter_label
-    elif filter_image:
-        cmd = f'docker ps -a --filter "ancestor={filter_image}" -q'
-        name = filter_image
-    else:
-        return 0
-
-    container_ids = run_command(cmd, ignore_errors=True)
-
-    if container_ids:
-        ids = container_ids.split('\n')
-        count = len([i for i in ids if i])
-
-        if count > 0:
-            print(f"   Found {count} container(s)")
-            run_command(f"docker rm -f {' '.join(ids)}", ignore_errors=True)
-            return count
-
-    return 0
-
-def cleanup_networks():
-    """Remove orphaned networks"""
-    print("🗑️  Removing orphaned networks...")
-    cmd = 'docker network ls --filter "label=org.testcontainers=true" -q'
-    network_ids = run_command(cmd, ignore_errors=True)
-
-    if network_ids:
-        ids = network_ids.split('\n')
-        count = len([i for i in ids if i])
-
-        if count > 0:
-            print(f"   Found {count} network(s)")
-            for net_id in ids:
-                if net_id:
-                    run_command(f"docker network rm {net_id}", ignore_errors=True)
-            print("✅ Removed TestContainers networks\n")
-            return
-
-    print("   No TestContainers networks found\n")
-
-def cleanup_volumes():
-    """Remove orphaned volumes"""
-    print("🗑️  Removing orphaned volumes...")
-    cmd = 'docker volume ls --filter "label=org.testcontainers=true" -q'
-    volume_ids = run_command(cmd, ignore_errors=True)
-
-    if volume_ids:
-        ids = volume_ids.split('\n')
-        count = len([i for i in ids if i])
-
-        if count > 0:
-            print(f"   Found {count} volume(s)")
-            for vol_id in ids:
-                if vol_id:
-                    run_command(f"docker volume rm {vol_id}", ignore_errors=True)
-            print("✅ Removed TestContainers volumes\n")
-            return
-
-    print("   No TestContainers volumes found\n")
+# ==============================================================================
+# SELECTION
+# ==============================================================================
+
+def created_at(resource):
+    """Creation time in epoch seconds for a container, network or volume"""
+    value = resource.get("Created", resource.get("CreatedAt"))
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return parse_docker_time(value)
+    except (TypeError, ValueError):
+        return None
+
+def old_enough(resource, min_age, now):
+    if not min_age:
+        return True
+    created = created_at(resource)
+    return created is not None and now - created >= min_age
+
+def select_containers(api, labels, images, min_age=None, now=None):
+    """Containers (any state) matching any label or image, oldest first"""
+    now = now or time.time()
+    found = {}
+    for label in labels:
+        for container in api.containers(all=True, filters={"label": label}):
+            found[container["Id"]] = container
+    for image in images:
+        for container in api.containers(all=True, filters={"ancestor": image}):
+            found[container["Id"]] = container
+    selected = [c for c in found.values() if old_enough(c, min_age, now)]
+    return sorted(selected, key=lambda c: c.get("Created", 0))
+
+def select_networks(api, labels, min_age=None, now=None):
+    now = now or time.time()
+    found = {}
+    for label in labels:
+        for network in api.networks(filters={"label": label}):
+            found[network["Id"]] = network
+    return [n for n in found.values() if old_enough(n, min_age, now)]
+
+def select_volumes(api, labels, min_age=None, now=None):
+    now = now or time.time()
+    found = {}
+    for label in labels:
+        for volume in (api.volumes(filters={"label": label}) or {}).get("Volumes") or []:
+            found[volume["Name"]] = volume
+    return [v for v in found.values() if old_enough(v, min_age, now)]
+
+def describe_container(container):
+    name = (container.get("Names") or ["/" + container["Id"][:12]])[0].lstrip("/")
+    return f"{name} ({container.get('Image', '?')}, {container.get('State', '?')})"
+
+def describe_network(network):
+    return network.get("Name", network["Id"][:12])
+
+def describe_volume(volume):
+    return volume["Name"]
+
+# ==============================================================================
+# REMOVAL
+# ==============================================================================
+
+class Phase:
+    """Outcome of one removal step, for the timing summary"""
+
+    def __init__(self, name):
+        self.name = name
+        self.found = 0
+        self.removed = 0
+        self.failed = []
+        self.seconds = 0.0
+
+def remove_all(items, remove, workers=DEFAULT_WORKERS):
+    """Run `remove(item)` concurrently; returns (removed, [(item, error)])"""
+    def attempt(item):
+        try:
+            remove(item)
+            return None
+        except NotFound:
+            return None  # already gone (Ryuk or another cleanup got there first)
+        except Exception as e:
+            return e
+
+    removed, failed = 0, []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items) or 1))) as pool:
+        for item, error in zip(items, pool.map(attempt, items)):
+            if error is None:
+                removed += 1
+            else:
+                failed.append((item, error))
+    return removed, failed
+
+def run_phase(title, items, describe, remove, dry_run=False, workers=DEFAULT_WORKERS):
+    """Select -> (dry-run list | concurrent removal) -> Phase"""
+    phase = Phase(title)
+    phase.found = len(items)
+    print(f"🗑️  {title}...")
+
+    if not items:
+        print("   None found\n")
+        return phase
+
+    if dry_run:
+        for item in items:
+            print(f"   would remove {describe(item)}")
+        print()
+        return phase
+
+    print(f"   Found {len(items)}, removing with {min(workers, len(items))} workers")
+    start = time.perf_counter()
+    phase.removed, phase.failed = remove_all(items, remove, workers)
+    phase.seconds = time.perf_counter() - start
+
+    for item, error in phase.failed[:10]:
+        print(f"   Warning: {describe(item)}: {error}")
+    if len(phase.failed) > 10:
+        print(f"   ... and {len(phase.failed) - 10} more failures")
+    print(f"✅ Removed {phase.removed}/{phase.found} in {phase.seconds:.2f}s\n")
+    return phase
 
 def cleanup_cache():
     """Clean pytest and Python cache"""
     print("🗑️  Cleaning cache files...")
 
-    import shutil
-    import os
-
     # Remove pytest cache
     if os.path.exists(".pytest_cache"):
         shutil.rmtree(".pytest_cache")
@@ -165,77 +277,107 @@ def cleanup_cache():
 
     print("✅ Removed Python cache\n")
 
-def show_docker_status():
+def show_docker_status(api):
     """Show current Docker status"""
     print("📊 Current Docker Status:")
     print("=========================\n")
 
     print("Containers:")
-    result = run_command('docker ps -a --format "table {{.Names}}\t{{.Image}}\t{{.Status}}"')
-    if result:
-        print(result)
-    else:
+    containers = api.containers(all=True)
+    for container in containers:
+        print(f"   {describe_container(container)}  {container.get('Status', '')}")
+    if not containers:
         print("   (none)")
 
     print("\nNetworks:")
-    result = run_command('docker network ls --format "table {{.Name}}\t{{.Driver}}"')
-    if result:
-        print(result)
+    for network in api.networks():
+        print(f"   {network['Name']:<30}{network.get('Driver', '')}")
 
     print("\nVolumes:")
-    result = run_command('docker volume ls --format "table {{.Name}}\t{{.Driver}}"')
-    if result:
-        print(result)
+    volumes = (api.volumes() or {}).get("Volumes") or []
+    for volume in volumes:
+        print(f"   {volume['Name'][:40]:<42}{volume.get('Driver', '')}")
+    if not volumes:
+        print("   (none)")
     print()
 
+def print_summary(phases, total):
+    print("⏱️  Timing Summary:")
+    print("==================\n")
+    print(f"   {'step':<22}{'found':>7}{'removed':>9}{'failed':>8}{'time':>9}")
+    for phase in phases:
+        print(f"   {phase.name:<22}{phase.found:>7}{phase.removed:>9}{len(phase.failed):>8}{phase.seconds:>8.2f}s")
+    print(f"   {'total':<22}{'':>24}{total:>8.2f}s\n")
+
 def main():
     """Main cleanup function"""
+    parser = argparse.ArgumentParser(description="Remove TestContainers leftovers (containers, networks, volumes)")
+    parser.add_argument("--dry-run", action="store_true", help="List what would be removed, remove nothing")
+    parser.add_argument("--label", action="append", dest="labels",
+                        help="Select by label (repeatable, default: org.testcontainers=true)")
+    parser.add_argument("--image", action="append", dest="images",
+                        help="Also select containers of this image (repeatable, default: workshop images)")
+    parser.add_argument("--older-than", type=parse_age, default=None, metavar="AGE",
+                        help="Only resources older than AGE (e.g. 90s, 10m, 2h, 1d)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent removals")
+    parser.add_argument("--keep-apps", action="store_true", help="Don't stop running demo apps")
+    parser.add_argument("--stop-timeout", type=float, default=15.0,
+                        help="Seconds an app gets to shut down before it is signalled")
+    parser.add_argument("--keep-cache", action="store_true", help="Don't remove Python/pytest caches")
+    args = parser.parse_args()
+
+    labels = args.labels or DEFAULT_LABELS
+    images = args.images if args.images is not None else DEFAULT_IMAGES
+
     print("🧹 Scenario 1: Cleanup Script")
     print("==============================\n")
+    if args.dry_run:
+        print("🔎 Dry run: nothing will be removed\n")
+
+    total_start = time.perf_counter()
 
     # Check Docker
     print("🐳 Checking Docker...")
-    check_docker()
+    client = get_client(args.workers)
+    api = client.api
     print("✅ Docker is running\n")
 
     # Stop Flask apps
-    stop_flask_apps()
-
-    # Remove TestContainers
-    print("🗑️  Removing TestContainers containers...")
-    count = remove_containers(filter_label="org.testcontainers=true")
-    if count > 0:
-        print("✅ Removed TestContainers containers\n")
-    else:
-        print("   No TestContainers containers found\n")
-
-    # Remove PostgreSQL containers
-    print("🗑️  Removing PostgreSQL containers...")
-    count = remove_containers(filter_image="postgres:15-alpine")
-    if count > 0:
-        print("✅ Removed PostgreSQL containers\n")
-    else:
-        print("   No PostgreSQL containers found\n")
-
-    # Remove Redis containers
-    print("🗑️  Removing Redis containers...")
-    count = remove_containers(filter_image="redis:7-alpine")
-    if count > 0:
-        print("✅ Removed Redis containers\n")
-    else:
-        print("   No Redis containers found\n")
-
-    # Cleanup networks
-    cleanup_networks()
-
-    # Cleanup volumes
-    cleanup_volumes()
+    if not (args.dry_run or args.keep_apps):
+        stop_flask_apps(args.stop_timeout)
+
+    now = time.time()
+    phases = []
+
+    # Containers first: networks and volumes in use can't be removed
+    phases.append(run_phase(
+        "Containers", select_containers(api, labels, images, args.older_than, now),
+        describe_container, lambda c: api.remove_container(c["Id"], force=True, v=True),
+        args.dry_run, args.workers,
+    ))
+    phases.append(run_phase(
+        "Networks", select_networks(api, labels, args.older_than, now),
+        describe_network, lambda n: api.remove_network(n["Id"]),
+        args.dry_run, args.workers,
+    ))
+    phases.append(run_phase(
+        "Volumes", select_volumes(api, labels, args.older_than, now),
+        describe_volume, lambda v: api.remove_volume(v["Name"], force=True),
+        args.dry_run, args.workers,
+    ))
 
     # Cleanup cache
-    cleanup_cache()
+    if not (args.dry_run or args.keep_cache):
+        cleanup_cache()
 
     # Show status
-    show_docker_status()
+    show_docker_status(api)
+
+    print_summary(phases, time.perf_counter() - total_start)
+
+    if args.dry_run:
+        print("🔎 Dry run complete - re-run without --dry-run to remove these.\n")
+        return
 
     # Summary
     print("✅ Cleanup Complete!")
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+🎛️ Reality Engine Control Channel
+=================================
+
+Lets cleanup.py ask a running engine to shut down properly (drain SSE
+clients, stop its containers, flush logs) instead of `kill -9`-ing it
+and leaving the containers for Ryuk.
+
+Each engine process listens on a loopback port and registers itself in
+a PID file:
+
+    <tmp>/reality-engine/<pid>.json   {"pid", "app", "port", "token", ...}
+
+The file is only readable by its owner; every command must carry its
+random token. Commands are one JSON line in, one JSON line out:
+
+    {"token": ..., "command": "ping"}
+    {"token": ..., "command": "shutdown"}
+
+Loopback TCP rather than a Unix socket so it works on Windows too.
+
+Usage (client side):
+    import control
+    for entry in control.registered():
+        outcome = control.stop(entry, timeout=15)
+"""
+
+import atexit
+import hmac
+import json
+import os
+import secrets
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+RUN_DIR = os.path.join(tempfile.gettempdir(), "reality-engine")
+MAX_LINE = 4096
+
+def pid_file_path(pid):
+    return os.path.join(RUN_DIR, f"{pid}.json")
+
+def pid_alive(pid):
+    """True if a process with this PID exists"""
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # An exited child nobody has waited for yet is a zombie, not alive
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except (OSError, IndexError):
+        return True
+
+# ==============================================================================
+# SERVER (inside the engine)
+# ==============================================================================
+
+class ControlServer:
+    """
+    Loopback command listener for one process.
+
+    `on_shutdown()` does the orderly stop and returns a summary dict. With
+    `exit_process=True` the process exits right after the reply is sent
+    (for servers like Flask's that own the main thread).
+    """
+
+    def __init__(self, app_name, on_shutdown, exit_process=True, http_port=None):
+        self.app_name = app_name
+        self.on_shutdown = on_shutdown
+        self.exit_process = exit_process
+        self.http_port = http_port
+        self.token = secrets.token_hex(16)
+        self.started = time.time()
+        self.path = pid_file_path(os.getpid())
+        self.shutdown_result = None
+        self._shutdown_lock = threading.Lock()
+        self._inflight = 0
+        self._idle = threading.Condition()
+        self._sock = None
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(4)
+
+        os.makedirs(RUN_DIR, exist_ok=True)
+        info = {
+            "pid": os.getpid(),
+            "app": self.app_name,
+            "port": self._sock.getsockname()[1],
+            "http_port": self.http_port,
+            "token": self.token,
+            "started": self.started,
+        }
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(info, f)
+        atexit.register(self._remove_pid_file)
+
+        threading.Thread(target=self._accept, name="control-channel", daemon=True).start()
+        return self
+
+    def close(self, timeout=30):
+        """Wait until shutdown replies are sent, then stop listening and unregister"""
+        with self._idle:
+            self._idle.wait_for(lambda: self._inflight == 0, timeout)
+        if self._sock is not None:
+            self._sock.close()
+        self._remove_pid_file()
+
+    def _remove_pid_file(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return  # closed
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        exit_after = False
+        with conn:
+            conn.settimeout(5)
+            try:
+                request = json.loads(_read_line(conn))
+            except (OSError, ValueError) as e:
+                _send(conn, {"ok": False, "error": f"bad request: {e}"})
+                return
+
+            if not hmac.compare_digest(str(request.get("token", "")), self.token):
+                _send(conn, {"ok": False, "error": "bad token"})
+                return
+
+            command = request.get("command")
+            if command == "ping":
+                _send(conn, {
+                    "ok": True, "app": self.app_name, "pid": os.getpid(),
+                    "uptime_s": round(time.time() - self.started, 1),
+                })
+            elif command == "shutdown":
+                with self._idle:
+                    self._inflight += 1
+                try:
+                    reply = self._shutdown()
+                    _send(conn, reply)
+                finally:
+                    with self._idle:
+                        self._inflight -= 1
+                        self._idle.notify_all()
+                exit_after = self.exit_process and reply["ok"]
+            else:
+                _send(conn, {"ok": False, "error": f"unknown command {command!r}"})
+
+        if exit_after:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            self._remove_pid_file()
+            os._exit(0)
+
+    def _shutdown(self):
+        # A second request while stopping waits for, and shares, the first result
+        with self._shutdown_lock:
+            if self.shutdown_result is None:
+                start = time.perf_counter()
+                try:
+                    summary = self.on_shutdown() or {}
+                    self.shutdown_result = {"ok": True, "summary": summary}
+                except Exception as e:
+                    self.shutdown_result = {"ok": False, "error": str(e)}
+                self.shutdown_result["seconds"] = round(time.perf_counter() - start, 3)
+            return self.shutdown_result
+
+def _read_line(conn):
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = conn.recv(1024)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_LINE:
+            raise ValueError("request too large")
+    return data.decode("utf-8")
+
+def _send(conn, payload):
+    try:
+        conn.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+    except OSError:
+        pass  # client gave up waiting
+
+# ==============================================================================
+# CLIENT (cleanup.py)
+# ==============================================================================
+
+def registered():
+    """Live registered processes; stale PID files are removed"""
+    entries = []
+    if not os.path.isdir(RUN_DIR):
+        return entries
+    for name in sorted(os.listdir(RUN_DIR)):
+        path = os.path.join(RUN_DIR, name)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            pid = int(entry["pid"])
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        if pid_alive(pid):
+            entries.append(entry)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return entries
+
+def request(entry, command, timeout=5.0):
+    """Send one command and return the decoded reply"""
+    with socket.create_connection(("127.0.0.1", entry["port"]), timeout=timeout) as conn:
+        conn.settimeout(timeout)
+        conn.sendall((json.dumps({"token": entry["token"], "command": command}) + "\n").encode("utf-8"))
+        return json.loads(_read_line(conn))
+
+def wait_exit(pid, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if not pid_alive(pid):
+            return True
+        time.sleep(0.05)
+    return not pid_alive(pid)
+
+def stop(entry, timeout=15.0, grace=3.0):
+    """
+    Orderly shutdown with a bounded wait, escalating to SIGTERM then SIGKILL.
+
+    Returns {"pid", "app", "method", "seconds", "summary"|"error"} where
+    method is graceful, terminated, killed, stale or failed.
+
+    Signals are only sent to a process that answered on its control port:
+    if nothing listens there the PID file is stale (and the PID may now
+    belong to someone else), so it is just removed.
+    """
+    pid = entry["pid"]
+    start = time.perf_counter()
+    outcome = {"pid": pid, "app": entry.get("app")}
+
+    try:
+        reply = request(entry, "shutdown", timeout=timeout)
+        if reply.get("ok"):
+            outcome["summary"] = reply.get("summary")
+            if wait_exit(pid, grace):
+                outcome["method"] = "graceful"
+                outcome["seconds"] = round(time.perf_counter() - start, 3)
+                return outcome
+        else:
+            outcome["error"] = reply.get("error")
+    except ConnectionRefusedError:
+        _forget(pid)
+        outcome["method"] = "stale"
+        outcome["seconds"] = round(time.perf_counter() - start, 3)
+        return outcome
+    except (OSError, ValueError) as e:
+        outcome["error"] = str(e)
+
+    for sig, method in ((signal.SIGTERM, "terminated"), (getattr(signal, "SIGKILL", None), "killed")):
+        if sig is None:
+            continue
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            method = "terminated"
+        except OSError as e:
+            outcome["error"] = str(e)
+            break
+        if wait_exit(pid, grace):
+            outcome["method"] = method
+            outcome["seconds"] = round(time.perf_counter() - start, 3)
+            _forget(pid)
+            return outcome
+
+    outcome["method"] = "failed"
+    outcome["seconds"] = round(time.perf_counter() - start, 3)
+    return outcome
+
+def _forget(pid):
+    # A killed process can't remove its own PID file
+    try:
+        os.remove(pid_file_path(pid))
+    except OSError:
+        pass
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+🔌 Reality Engine DB Layer
+==========================
+
+Long-lived Postgres connections for the hot paths. The engine used to
+open a connection per request (TCP, startup and auth round trips), have
+Postgres parse and plan each statement from scratch, then close it.
+
+Here connections are pooled per container (at most DB_POOL_MAX_SIZE,
+PoolExhausted after DB_POOL_TIMEOUT) and kept in autocommit mode:
+
+    prepared   every statement is prepared server-side on first use
+               (prepare_threshold=0), so each connection parses and plans
+               it once and afterwards only binds and executes
+    vote       the INSERT is one round trip (no separate COMMIT); it only
+               inserts into an open poll, and only an allowed choice
+    stats      one indexed read of the poll's running tallies (see
+               schema.py) - no COUNT over the votes table
+    recount    the same numbers counted from votes (checks, benchmarks);
+               on a partitioned votes table each partition is counted
+               on its own and the partial counts are merged
+    export     a server-side cursor fetches EXPORT_BATCH rows at a time,
+               so memory stays flat however big the table is
+
+`python3 benchmark.py roundtrips` counts the round trips per request.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+import psycopg
+from psycopg import pq
+
+from schema import DEFAULT_POLL_ID
+
+logger = logging.getLogger(__name__)
+
+# Connections per pool, in use or idle. Postgres allows 100 by default,
+# shared by every worker process, shard pool, replica pool and monitor.
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+# Seconds to wait for a connection once all of them are in use
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+
+# Inserts nothing (rowcount 0) if the poll is missing, closed or doesn't offer the choice
+INSERT_VOTE = """
+    INSERT INTO votes (poll_id, user_id, choice)
+    SELECT id, %(user_id)s, %(choice)s FROM polls
+    WHERE id = %(poll_id)s AND closed_at IS NULL
+      AND (cardinality(choices) = 0 OR %(choice)s = ANY (choices))
+"""
+# A choice's tally, read in the vote's own transaction: the trigger's row
+# lock orders concurrent votes, so each commit sees a higher count
+TALLY_COUNT = "SELECT count FROM poll_tallies WHERE poll_id = %(poll_id)s AND choice = %(choice)s"
+POLL_TALLIES = """
+    SELECT choice, count FROM poll_tallies
+    WHERE poll_id = %s AND count > 0
+    ORDER BY count DESC, choice
+"""
+# Partial aggregation per partition, then one merge (a no-op on a plain table)
+PARTITIONWISE = "SET LOCAL enable_partitionwise_aggregate = on"
+COUNT_VOTES = """
+    SELECT choice, COUNT(*) FROM votes
+    WHERE poll_id = %s
+    GROUP BY choice
+    ORDER BY COUNT(*) DESC, choice
+"""
+# DELETE, not TRUNCATE: TRUNCATE's ACCESS EXCLUSIVE lock queues behind any
+# open export cursor, and every vote INSERT then queues behind it (on a
+# replica, replaying it cancels running reads). The delete trigger untallies.
+DELETE_VOTES = "DELETE FROM votes"
+VOTER_IDS = "SELECT poll_id || ':' || user_id FROM votes"
+
+POLL_COLUMNS = "id, question, choices, created_at, closed_at"
+CREATE_POLL = f"INSERT INTO polls (question, choices) VALUES (%s, %s) RETURNING {POLL_COLUMNS}"
+GET_POLL = f"SELECT {POLL_COLUMNS} FROM polls WHERE id = %s"
+CLOSE_POLL = f"""
+    UPDATE polls SET closed_at = COALESCE(closed_at, LOCALTIMESTAMP)
+    WHERE id = %s RETURNING {POLL_COLUMNS}
+"""
+LIST_POLLS = """
+    SELECT p.id, p.question, p.choices, p.created_at, p.closed_at, COALESCE(SUM(t.count), 0)::bigint
+    FROM polls p LEFT JOIN poll_tallies t ON t.poll_id = p.id
+    GROUP BY p.id
+    ORDER BY p.id
+"""
+
+# One row per second of the last %s seconds, measured on the database clock
+VOTE_AGES = """
+    SELECT floor(extract(epoch FROM LOCALTIMESTAMP - created_at))::int AS age, COUNT(*)
+    FROM votes
+    WHERE created_at >= LOCALTIMESTAMP - %s * interval '1 second'
+    GROUP BY age
+"""
+
+EXPORT_COLUMNS = ("id", "poll_id", "user_id", "choice", "created_at")
+EXPORT_BATCH = 2000
+EXPORT_FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+class PoolExhausted(RuntimeError):
+    """Raised when every connection of a pool stayed in use for the whole timeout"""
+
+class ConnectionPool:
+    """
+    Thread-safe pool of autocommit connections to one database.
+
+    Connections are opened on demand, at most `max_size` at a time; a
+    checkout beyond that waits up to `timeout` seconds for one to come back,
+    then raises PoolExhausted. Up to `max_idle` are kept for reuse and the
+    rest are closed when handed back. A connection that broke or was left
+    inside a transaction is discarded, never reused.
+    """
+
+    def __init__(self, conninfo, max_idle=16, max_size=None, timeout=None, connect=psycopg.connect):
+        self.conninfo = conninfo
+        self.max_size = max_size or max(POOL_MAX_SIZE, max_idle)
+        self.max_idle = min(max_idle, self.max_size)
+        self.timeout = POOL_TIMEOUT if timeout is None else timeout
+        self._connect = connect
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.opened = 0
+        self.reused = 0
+        self.in_use = 0
+
+    @contextmanager
+    def connection(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolExhausted(f"All {self.max_size} database connections busy for {self.timeout:g}s")
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+                if conn is not None:
+                    self.reused += 1
+            if conn is None:
+                conn = self._connect(**self.conninfo, autocommit=True, prepare_threshold=0)
+                with self._lock:
+                    self.opened += 1
+            with self._lock:
+                self.in_use += 1
+            try:
+                yield conn
+            finally:
+                with self._lock:
+                    self.in_use -= 1
+                self._release(conn)
+        finally:
+            self._slots.release()
+
+    def _release(self, conn):
+        reusable = (
+            not conn.closed and not conn.broken
+            and conn.info.transaction_status == pq.TransactionStatus.IDLE
+        )
+        with self._lock:
+            if reusable and not self._closed and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close idle connections; ones in use are closed when handed back"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug(f"Closing pooled connection failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {"opened": self.opened, "reused": self.reused, "idle": len(self._idle),
+                    "in_use": self.in_use, "max_size": self.max_size}
+
+class AsyncConnectionPool:
+    """
+    ConnectionPool for asyncio (the ASGI engine): the same autocommit,
+    server-side prepared connections, limits and discard rules, handed out
+    by coroutines of one event loop.
+    """
+
+    def __init__(self, conninfo, max_idle=16, max_size=None, timeout=None, connect=None):
+        self.conninfo = conninfo
+        self.max_size = max_size or max(POOL_MAX_SIZE, max_idle)
+        self.max_idle = min(max_idle, self.max_size)
+        self.timeout = POOL_TIMEOUT if timeout is None else timeout
+        self._connect = connect or psycopg.AsyncConnection.connect
+        self._idle = []
+        self._slots = asyncio.Semaphore(self.max_size)
+        self._closed = False
+        self.opened = 0
+        self.reused = 0
+        self.in_use = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise PoolExhausted(f"All {self.max_size} database connections busy for {self.timeout:g}s") from None
+        try:
+            if self._idle:
+                conn = self._idle.pop()
+                self.reused += 1
+            else:
+                conn = await self._connect(**self.conninfo, autocommit=True, prepare_threshold=0)
+                self.opened += 1
+            self.in_use += 1
+            try:
+                yield conn
+            finally:
+                self.in_use -= 1
+                await self._release(conn)
+        finally:
+            self._slots.release()
+
+    async def _release(self, conn):
+        reusable = (
+            not conn.closed and not conn.broken
+            and conn.info.transaction_status == pq.TransactionStatus.IDLE
+        )
+        if reusable and not self._closed and len(self._idle) < self.max_idle:
+            self._idle.append(conn)
+            return
+        await conn.close()
+
+    async def close(self):
+        """Close idle connections; ones in use are closed when handed back"""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.debug(f"Closing pooled connection failed: {e}")
+
+    def stats(self):
+        return {"opened": self.opened, "reused": self.reused, "idle": len(self._idle),
+                "in_use": self.in_use, "max_size": self.max_size}
+
+# ==============================================================================
+# QUERIES
+# ==============================================================================
+
+def insert_vote(conn, user_id, choice, poll_id=DEFAULT_POLL_ID):
+    """
+    One round trip. True if recorded, False if the poll refused it
+    (see poll_rejection); raises IntegrityError for a second vote by the
+    same user in the same poll.
+    """
+    cur = conn.execute(INSERT_VOTE, {"poll_id": poll_id, "user_id": user_id, "choice": choice})
+    return cur.rowcount == 1
+
+def insert_counted_vote(conn, user_id, choice, poll_id=DEFAULT_POLL_ID):
+    """
+    insert_vote() and the choice's tally including this vote, in one
+    transaction: the tally, or None if the poll refused the vote.
+    """
+    with conn.transaction():
+        if not insert_vote(conn, user_id, choice, poll_id):
+            return None
+        return conn.execute(TALLY_COUNT, {"poll_id": poll_id, "choice": choice}).fetchone()[0]
+
+def fetch_stats(conn, poll_id=DEFAULT_POLL_ID):
+    """([(choice, count), ...], total) from the poll's tallies - cost grows with choices, not votes"""
+    rows = conn.execute(POLL_TALLIES, (poll_id,)).fetchall()
+    return rows, sum(count for _, count in rows)
+
+def count_votes(conn, poll_id=DEFAULT_POLL_ID):
+    """fetch_stats() counted from the votes themselves - cost grows with the poll's votes"""
+    with conn.transaction():
+        conn.execute(PARTITIONWISE)
+        rows = conn.execute(COUNT_VOTES, (poll_id,)).fetchall()
+    return rows, sum(count for _, count in rows)
+
+def delete_votes(conn):
+    """Every vote in every poll (the polls themselves stay)"""
+    conn.execute(DELETE_VOTES)
+
+def voter_key(poll_id, user_id):
+    """Known-voter cache entry: voters are unique per poll"""
+    return f"{poll_id}:{user_id}"
+
+def voter_ids(conn):
+    """voter_key() of every vote, streamed row by row (no full result in memory)"""
+    for (key,) in conn.cursor().stream(VOTER_IDS):
+        yield key
+
+# ==============================================================================
+# POLLS
+# ==============================================================================
+
+def poll_dict(row, total=None):
+    poll_id, question, choices, created_at, closed_at = row[:5]
+    poll = {
+        "id": poll_id,
+        "question": question,
+        "choices": list(choices),
+        "created_at": created_at.isoformat() if created_at else None,
+        "closed_at": closed_at.isoformat() if closed_at else None,
+        "open": closed_at is None,
+    }
+    if total is not None:
+        poll["total_votes"] = total
+    return poll
+
+def create_poll(conn, question, choices=()):
+    return poll_dict(conn.execute(CREATE_POLL, (question, list(choices))).fetchone())
+
+def get_poll(conn, poll_id):
+    row = conn.execute(GET_POLL, (poll_id,)).fetchone()
+    return poll_dict(row) if row else None
+
+def close_poll(conn, poll_id):
+    """Close a poll (idempotent); None if there is no such poll"""
+    row = conn.execute(CLOSE_POLL, (poll_id,)).fetchone()
+    return poll_dict(row) if row else None
+
+def list_polls(conn):
+    """Every poll with its vote total (summed from tallies, not counted from votes)"""
+    return [poll_dict(row, total=row[5]) for row in conn.execute(LIST_POLLS).fetchall()]
+
+def poll_rejection(poll, choice):
+    """(HTTP status, message) for a vote insert_vote() refused"""
+    if poll is None:
+        return 404, "No such poll"
+    if not poll["open"]:
+        return 409, "This poll is closed"
+    return 400, f"{choice!r} is not a choice in this poll ({', '.join(poll['choices'])})"
+
+def vote_ages(conn, seconds):
+    """[(seconds ago, votes), ...] for the recent past (seeds the rate series)"""
+    return conn.execute(VOTE_AGES, (seconds,)).fetchall()
+
+# ==============================================================================
+# EXPORT
+# ==============================================================================
+
+def export_query(since=None, until=None, choice=None, poll_id=None):
+    """(sql, params) for the votes in id order, filtered by [since, until), choice and poll"""
+    where, params = [], []
+    if poll_id is not None:
+        where.append("poll_id = %s")
+        params.append(poll_id)
+    if since is not None:
+        where.append("created_at >= %s")
+        params.append(since)
+    if until is not None:
+        where.append("created_at < %s")
+        params.append(until)
+    if choice is not None:
+        where.append("choice = %s")
+        params.append(choice)
+
+    sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM votes"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + " ORDER BY id", params
+
+def export_batches(conn, since=None, until=None, choice=None, poll_id=None, batch=EXPORT_BATCH):
+    """Lists of up to `batch` rows from a server-side cursor (one FETCH per list)"""
+    sql, params = export_query(since, until, choice, poll_id)
+    # Named cursors live inside a transaction; pooled connections are autocommit
+    with conn.transaction(), conn.cursor(name="vote_export") as cur:
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                return
+            yield rows
+
+def export_header(fmt):
+    return ",".join(EXPORT_COLUMNS) + "\n" if fmt == "csv" else ""
+
+def encode_rows(rows, fmt):
+    """One chunk of the export body: CSV lines or NDJSON objects"""
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({"id": vote_id, "poll_id": poll_id, "user_id": user_id, "choice": choice,
+                        "created_at": created_at.isoformat() if created_at else None}) + "\n"
+            for vote_id, poll_id, user_id, choice, created_at in rows
+        )
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        (vote_id, poll_id, user_id, choice, created_at.isoformat() if created_at else "")
+        for vote_id, poll_id, user_id, choice, created_at in rows
+    )
+    return buffer.getvalue()
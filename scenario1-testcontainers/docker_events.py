@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+🐳 Docker Event Tracking
+========================
+
+Follows container lifecycles from the Docker daemon's event stream
+instead of polling `docker ps`. One long-lived HTTP stream delivers
+create/start/health/die/destroy as they happen, so even containers that
+live for a fraction of a second are caught, with nanosecond timestamps.
+
+ContainerTable folds those events into an in-memory table (updated
+incrementally, never rebuilt) and keeps lifetime stats for containers
+that have finished. Subscriber runs the same thing in a background
+thread and hands TestContainers lifecycle changes to a callback (the
+Reality Engine feeds them into emit_event).
+
+Usage:
+    client = docker.from_env()
+    table = ContainerTable()
+    events = open_stream(client)       # subscribe first...
+    table.seed(client)                 # ...then take the snapshot
+    for raw in events:
+        change = table.apply(raw)
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Images the workshop starts; anything labelled by TestContainers counts too
+WATCHED_IMAGES = ("postgres:15-alpine", "redis:7-alpine")
+TESTCONTAINERS_LABEL = "org.testcontainers"
+
+# Container actions that change the table (exec_*, attach, resize... don't)
+LIFECYCLE_ACTIONS = {"create", "start", "health_status", "kill", "die", "stop", "destroy", "oom"}
+
+def action_of(event):
+    """'health_status: healthy' -> ('health_status', 'healthy')"""
+    action = event.get("Action") or event.get("status") or ""
+    name, _, arg = action.partition(":")
+    return name.strip(), arg.strip()
+
+def event_time(event):
+    """Event timestamp in seconds (ns precision when the daemon sends it)"""
+    if event.get("timeNano"):
+        return event["timeNano"] / 1e9
+    return float(event.get("time", time.time()))
+
+def is_testcontainer(attributes, images=WATCHED_IMAGES):
+    """Started by TestContainers (labels, Ryuk) or one of the workshop images"""
+    image = attributes.get("image", "")
+    return (
+        any(key.startswith(TESTCONTAINERS_LABEL) for key in attributes)
+        or image in images
+        or image.startswith("testcontainers/ryuk")
+    )
+
+class ContainerRecord:
+    """One container's lifecycle as seen on the event stream"""
+
+    def __init__(self, container_id, name, image, attributes=None):
+        self.id = container_id
+        self.name = name
+        self.image = image
+        self.attributes = attributes or {}
+        self.state = "created"
+        self.health = None
+        self.exit_code = None
+        self.created_at = None
+        self.started_at = None
+        self.finished_at = None
+        self.destroyed_at = None
+
+    @property
+    def short_id(self):
+        return self.id[:12]
+
+    @property
+    def testcontainer(self):
+        return is_testcontainer(dict(self.attributes, image=self.image))
+
+    def lifetime(self, now=None):
+        """Seconds from start to finish (or to now while running)"""
+        if self.started_at is None:
+            return None
+        end = self.finished_at or now or time.time()
+        return max(0.0, end - self.started_at)
+
+    def to_dict(self, now=None):
+        lifetime = self.lifetime(now)
+        return {
+            "id": self.short_id,
+            "name": self.name,
+            "image": self.image,
+            "state": self.state,
+            "health": self.health,
+            "exit_code": self.exit_code,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "lifetime_s": round(lifetime, 3) if lifetime is not None else None,
+        }
+
+class ContainerTable:
+    """Live containers plus a bounded history of finished ones"""
+
+    def __init__(self, history=200):
+        self.live = {}
+        self.finished = deque(maxlen=history)
+        self.totals = {"started": 0, "finished": 0}
+        self.lifetime_count = 0
+        self.lifetime_sum = 0.0
+        self.lifetime_min = None
+        self.lifetime_max = None
+        self._lock = threading.Lock()
+
+    def seed(self, client):
+        """Add containers already running before we subscribed"""
+        for container in client.containers.list():
+            attrs = container.attrs
+            started = attrs.get("State", {}).get("StartedAt")
+            with self._lock:
+                if container.id in self.live:
+                    continue
+                record = ContainerRecord(
+                    container.id, container.name,
+                    attrs.get("Config", {}).get("Image", ""),
+                    attrs.get("Config", {}).get("Labels") or {},
+                )
+                record.state = "running"
+                record.started_at = parse_docker_time(started)
+                self.live[container.id] = record
+
+    def apply(self, event):
+        """
+        Fold one raw Docker event into the table.
+
+        Returns (action, record) for lifecycle changes, None otherwise.
+        """
+        if event.get("Type", "container") != "container":
+            return None
+        action, arg = action_of(event)
+        if action not in LIFECYCLE_ACTIONS:
+            return None
+
+        actor = event.get("Actor", {})
+        container_id = actor.get("ID") or event.get("id")
+        attributes = actor.get("Attributes", {})
+        at = event_time(event)
+
+        with self._lock:
+            record = self.live.get(container_id)
+            if record is None:
+                if action in ("destroy", "die"):
+                    return None  # stopped before we started watching
+                record = ContainerRecord(
+                    container_id, attributes.get("name", container_id[:12]),
+                    attributes.get("image", event.get("from", "")), attributes,
+                )
+                self.live[container_id] = record
+
+            if action == "create":
+                record.created_at = at
+            elif action == "start":
+                record.state = "running"
+                record.started_at = at
+                record.finished_at = None
+                self.totals["started"] += 1
+            elif action == "health_status":
+                record.health = arg
+            elif action in ("kill", "stop", "oom"):
+                if record.state == "running":
+                    record.state = "stopping"
+            elif action == "die":
+                record.state = "exited"
+                record.finished_at = at
+                exit_code = attributes.get("exitCode")
+                record.exit_code = int(exit_code) if exit_code not in (None, "") else None
+                self._finish(record)
+            elif action == "destroy":
+                record.destroyed_at = at
+                if record.finished_at is None:
+                    record.finished_at = at
+                    self._finish(record)
+                record.state = "removed"
+                self.live.pop(container_id, None)
+
+        return action, record
+
+    def _finish(self, record):
+        # Called with the lock held
+        lifetime = record.lifetime()
+        self.finished.append(record)
+        self.totals["finished"] += 1
+        if lifetime is not None:
+            self.lifetime_count += 1
+            self.lifetime_sum += lifetime
+            self.lifetime_min = lifetime if self.lifetime_min is None else min(self.lifetime_min, lifetime)
+            self.lifetime_max = lifetime if self.lifetime_max is None else max(self.lifetime_max, lifetime)
+
+    def running(self):
+        with self._lock:
+            return [r for r in self.live.values() if r.state in ("running", "stopping")]
+
+    def recent(self, limit=10):
+        with self._lock:
+            return list(self.finished)[-limit:]
+
+    def stats(self):
+        """Lifetime stats over finished containers (seconds)"""
+        with self._lock:
+            return {
+                "started": self.totals["started"],
+                "finished": self.totals["finished"],
+                "running": sum(1 for r in self.live.values() if r.state == "running"),
+                "lifetime_mean": self.lifetime_sum / self.lifetime_count if self.lifetime_count else None,
+                "lifetime_min": self.lifetime_min,
+                "lifetime_max": self.lifetime_max,
+            }
+
+def open_stream(client, since=None):
+    """Subscribe to container events (call before seeding the table)"""
+    return client.events(decode=True, since=since, filters={"type": "container"})
+
+def parse_docker_time(value):
+    """'2024-01-02T03:04:05.123456789Z' -> epoch seconds (None if unset)"""
+    if not value or value.startswith("0001-"):
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+# ==============================================================================
+# LIFECYCLE EVENTS FOR THE DASHBOARD
+# ==============================================================================
+
+# Docker action -> dashboard event type ("stop" is always followed by "die")
+EVENT_TYPES = {
+    "create": "docker_created",
+    "start": "docker_started",
+    "health_status": "docker_health",
+    "kill": "docker_killed",
+    "oom": "docker_oom",
+    "die": "docker_died",
+    "destroy": "docker_destroyed",
+}
+
+def short_image(image):
+    """'testcontainers/ryuk:0.5.1' -> 'ryuk'"""
+    return image.rsplit("/", 1)[-1].split(":", 1)[0] or "container"
+
+def _ms(start, end):
+    return round((end - start) * 1000, 1) if start is not None else None
+
+def translate(action, record, at):
+    """(event_type, container_name, details) for emit_event, or None"""
+    event_type = EVENT_TYPES.get(action)
+    if event_type is None:
+        return None
+
+    details = {
+        "id": record.short_id,
+        "name": record.name,
+        "image": record.image,
+        "docker_time": datetime.fromtimestamp(at).isoformat(timespec="microseconds"),
+    }
+    if action == "start":
+        details["create_to_start_ms"] = _ms(record.created_at, at)
+    elif action == "health_status":
+        details["health"] = record.health
+        details["since_start_ms"] = _ms(record.started_at, at)
+    elif action == "die":
+        details["exit_code"] = record.exit_code
+        details["lifetime_ms"] = _ms(record.started_at, at)
+    elif action == "destroy":
+        details["total_ms"] = _ms(record.created_at, at)
+
+    return event_type, short_image(record.image), {k: v for k, v in details.items() if v is not None}
+
+class Subscriber:
+    """
+    Background thread turning daemon events for TestContainers-managed
+    and workshop containers into dashboard events.
+
+    Reconnects with `since=` after a dropped stream and skips anything
+    already delivered, so a daemon hiccup neither loses nor repeats events.
+    """
+
+    def __init__(self, on_event, images=WATCHED_IMAGES):
+        self.on_event = on_event
+        self.images = images
+        self.table = ContainerTable()
+        self.delivered = 0
+        self._last_nano = 0
+        self._stream = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="docker-events", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._stream is not None:
+            self._stream.close()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        import docker
+
+        while not self._stop.is_set():
+            try:
+                client = docker.from_env()
+                since = int(self._last_nano / 1e9) if self._last_nano else None
+                self._stream = open_stream(client, since=since)
+                if since is None:
+                    self.table.seed(client)
+                for event in self._stream:
+                    self._handle(event)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.warning(f"Docker event stream reconnecting: {e}")
+                self._stop.wait(2)
+
+    def _handle(self, event):
+        nano = int(event_time(event) * 1e9)
+        if nano <= self._last_nano:
+            return  # replayed after a reconnect
+        self._last_nano = nano
+
+        change = self.table.apply(event)
+        if change is None:
+            return
+        action, record = change
+        if not is_testcontainer(dict(record.attributes, image=record.image), self.images):
+            return
+
+        translated = translate(action, record, event_time(event))
+        if translated is None:
+            return
+        self.delivered += 1
+        try:
+            self.on_event(*translated)
+        except Exception as e:
+            logger.error(f"Docker event handler failed: {e}")
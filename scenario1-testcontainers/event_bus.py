@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+📣 Reality Engine Event Bus
+===========================
+
+Lets any process put lifecycle events on the dashboard, using Postgres
+LISTEN/NOTIFY on the container the show already runs:
+
+    test subprocess ─┐
+    other scripts   ─┼─ NOTIFY reality_events ─► Postgres ─► one listener
+    ...             ─┘                                        thread in the
+                                                              engine ─► SSE
+
+The engine hands its connection string to child processes in
+REALITY_EVENTS_DSN. They call `publish()` - one short connection and a
+NOTIFY, no HTTP. Without the variable `publish()` does nothing, so
+scripts run on their own behave exactly as before.
+
+The engine's own events stay in-process; only outside events take the
+Postgres hop.
+
+Usage (from any script):
+    import event_bus
+    event_bus.publish("test_passed", "testcontainers", {"test": "duplicate vote"})
+"""
+
+import json
+import logging
+import os
+import threading
+
+from shared_state import make_event
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "reality_events"
+DSN_ENV = "REALITY_EVENTS_DSN"
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD = 7900
+
+def encode(event):
+    """JSON payload for NOTIFY; oversized details are summarized, not rejected"""
+    payload = json.dumps(event, default=str)
+    size = len(payload.encode("utf-8"))
+    if size > MAX_PAYLOAD:
+        event = dict(event, details={"truncated": True, "payload_bytes": size})
+        payload = json.dumps(event, default=str)
+    return payload
+
+def decode(payload):
+    """Event dict from a NOTIFY payload, or None if it isn't one"""
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        return None
+    if not isinstance(event, dict) or "type" not in event or "container" not in event:
+        return None
+    event.setdefault("details", {})
+    return event
+
+def notify(conn, event):
+    """NOTIFY on an open connection (delivered when the transaction commits)"""
+    conn.execute("SELECT pg_notify(%s, %s)", (CHANNEL, encode(event)))
+
+def publish(event_type, container_name, details=None, dsn=None):
+    """
+    Emit an event from any process. Returns True if it was sent.
+
+    Never raises: a missing or unreachable dashboard must not break the
+    caller (usually a test run).
+    """
+    dsn = dsn or os.getenv(DSN_ENV)
+    if not dsn:
+        return False
+
+    event = make_event(event_type, container_name, details)
+    event["source"] = f"pid {os.getpid()}"
+    try:
+        import psycopg
+        with psycopg.connect(dsn, autocommit=True, connect_timeout=3) as conn:
+            notify(conn, event)
+        return True
+    except Exception as e:
+        logger.debug(f"Event bus publish failed: {e}")
+        return False
+
+class Listener:
+    """
+    One thread LISTENing on the channel, handing each event to `on_event`.
+
+    `conninfo` is a callable returning psycopg connection arguments, so
+    a reconnect always uses the current container endpoint.
+    """
+
+    def __init__(self, conninfo, on_event, poll_interval=1.0):
+        self.conninfo = conninfo
+        self.on_event = on_event
+        self.poll_interval = poll_interval
+        self.received = 0
+        self.reconnects = 0
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="event-bus-listener", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def wait_connected(self, timeout=None):
+        """True once LISTEN is active (useful before launching emitters)"""
+        return self._connected.wait(timeout)
+
+    def _run(self):
+        import psycopg
+
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(**self.conninfo(), autocommit=True, connect_timeout=10) as conn:
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    self._connected.set()
+                    while not self._stop.is_set():
+                        for notification in conn.notifies(timeout=self.poll_interval):
+                            self._deliver(notification.payload)
+            except Exception as e:
+                self._connected.clear()
+                if self._stop.is_set():
+                    break
+                self.reconnects += 1
+                logger.warning(f"Event bus listener reconnecting: {e}")
+                self._stop.wait(1)
+        self._connected.clear()
+
+    def _deliver(self, payload):
+        event = decode(payload)
+        if event is None:
+            logger.warning(f"Ignoring malformed event bus payload: {payload[:200]!r}")
+            return
+        self.received += 1
+        try:
+            self.on_event(event)
+        except Exception as e:
+            logger.error(f"Event bus handler failed: {e}")
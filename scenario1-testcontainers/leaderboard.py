@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+🏆 Reality Engine Leaderboard
+=============================
+
+Optional (LEADERBOARD=1): each poll's standings as a Redis sorted set
+(choice -> votes) in the show's Redis, next to the rate limiter.
+
+    vote     the INSERT reads back its choice's tally on its shard in the
+             same transaction; one Lua script raises the board to that
+             count and, if the rank moved, PUBLISHes the new standings -
+             atomic, whichever process or worker cast the vote
+    stats    one MULTI round trip: "is this board loaded?" + ZREVRANGE
+    SSE      RankFeed subscribes to the rank changes and hands them to
+             /api/events as `event: rank_change`
+
+Postgres stays the source of truth, and the board never counts a vote
+twice. It holds, per (shard, choice), the highest tally Postgres has
+reported, and only ever raises the board by the difference: the tally row
+is locked from the INSERT to its commit, so each vote carries a higher
+count than the one before it. A vote recorded late, or after a rebuild
+already counted it, raises nothing; one that never made it is made up by
+the next vote for that choice or the next rebuild. Rebuilds ("load")
+read Postgres first and apply the same max, so a vote committed while
+they ran is never lost.
+
+Resets version the boards: "Reset" empties Postgres, then bumps the
+epoch and drops every board in one script. Each vote and rebuild reads
+the epoch before it touches Postgres and is refused if it changed, so
+nothing counted before a reset lands on the new boards. The one vote
+this skips wrongly - read the epoch before a reset, committed after it -
+is picked up by the next vote for its choice or the next reconcile.
+
+A board is only read while its "loaded" marker exists, so a fresh Redis -
+after "Inject Chaos", say - serves nothing stale: stats fall back to
+Postgres and rebuild the board. A failed update drops the marker.
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+BOARD_KEY = "leaderboard:{poll_id}"
+COUNTS_KEY = "leaderboard:{poll_id}:counts"  # "<shard>:<choice>" -> highest tally seen
+LOADED_KEY = "leaderboard:{poll_id}:loaded"
+POLLS_KEY = "leaderboard:polls"  # poll ids with a board, for clear()
+EPOCH_KEY = "leaderboard:epoch"  # bumped by every clear(), never deleted
+CHANNEL = "leaderboard:ranks"
+# Only one process reconciles per interval (multi-worker mode)
+RECONCILE_LOCK = "leaderboard:reconcile"
+
+# KEYS: board, counts, epoch, polls. ARGV: choice, shard, tally, epoch,
+# poll_id, channel. Returns nil when the epoch moved on or the board already
+# has this tally, else {votes, previous rank, rank} (ranks from 1; previous
+# rank 0 = new on the board).
+RECORD = """
+if (redis.call('GET', KEYS[3]) or '0') ~= ARGV[4] then
+    return false
+end
+local field = ARGV[2] .. ':' .. ARGV[1]
+local seen = tonumber(redis.call('HGET', KEYS[2], field) or '0')
+local tally = tonumber(ARGV[3])
+if tally <= seen then
+    return false
+end
+redis.call('HSET', KEYS[2], field, tally)
+redis.call('SADD', KEYS[4], ARGV[5])
+local before = redis.call('ZREVRANK', KEYS[1], ARGV[1])
+local count = redis.call('ZINCRBY', KEYS[1], tally - seen, ARGV[1])
+local after = redis.call('ZREVRANK', KEYS[1], ARGV[1])
+if before ~= after then
+    redis.call('PUBLISH', ARGV[6], cjson.encode({
+        poll_id = tonumber(ARGV[5]),
+        choice = ARGV[1],
+        rank = after + 1,
+        previous_rank = before and before + 1 or 0,
+        standings = redis.call('ZREVRANGE', KEYS[1], 0, -1, 'WITHSCORES'),
+    }))
+end
+return {tonumber(count), before and before + 1 or 0, after + 1}
+"""
+
+# KEYS: board, counts, loaded marker, epoch, polls. ARGV: epoch, poll_id,
+# then shard, choice, tally for every tally row. Raises the board like
+# RECORD and marks it loaded. Returns nil when the epoch moved on, else
+# {1 if it was loaded already, votes added}.
+LOAD = """
+if (redis.call('GET', KEYS[4]) or '0') ~= ARGV[1] then
+    return false
+end
+local raised = 0
+for i = 3, #ARGV, 3 do
+    local field = ARGV[i] .. ':' .. ARGV[i + 1]
+    local seen = tonumber(redis.call('HGET', KEYS[2], field) or '0')
+    local tally = tonumber(ARGV[i + 2])
+    if tally > seen then
+        redis.call('HSET', KEYS[2], field, tally)
+        redis.call('ZINCRBY', KEYS[1], tally - seen, ARGV[i + 1])
+        raised = raised + tally - seen
+    end
+end
+redis.call('SADD', KEYS[5], ARGV[2])
+local was_loaded = redis.call('EXISTS', KEYS[3])
+redis.call('SET', KEYS[3], 1)
+return {was_loaded, raised}
+"""
+
+# KEYS: epoch, polls. Drops every board and bumps the epoch, atomically.
+CLEAR = """
+for _, poll_id in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    redis.call('DEL', 'leaderboard:' .. poll_id, 'leaderboard:' .. poll_id .. ':counts',
+               'leaderboard:' .. poll_id .. ':loaded')
+end
+redis.call('DEL', KEYS[2])
+return redis.call('INCR', KEYS[1])
+"""
+
+def board_keys(poll_id):
+    """[board, counts, loaded marker]"""
+    return [key.format(poll_id=poll_id) for key in (BOARD_KEY, COUNTS_KEY, LOADED_KEY)]
+
+def record_args(poll_id, choice, shard, tally, epoch):
+    """(keys, args) for the RECORD script"""
+    board, counts, _ = board_keys(poll_id)
+    return [board, counts, EPOCH_KEY, POLLS_KEY], [choice, shard, tally, epoch, poll_id, CHANNEL]
+
+def load_args(poll_id, per_shard, epoch):
+    """(keys, args) for the LOAD script; per_shard = [tally rows of shard 0, shard 1, ...]"""
+    args = [epoch, poll_id]
+    for shard, rows in enumerate(per_shard):
+        for choice, count in rows:
+            args += [shard, choice, count]
+    return board_keys(poll_id) + [EPOCH_KEY, POLLS_KEY], args
+
+def to_epoch(value):
+    """GET EPOCH_KEY reply -> the string the scripts compare against"""
+    return value or "0"
+
+def to_standings(loaded, pairs):
+    """EXISTS + ZREVRANGE WITHSCORES replies -> (rows, total), or None if the board isn't loaded"""
+    if not loaded:
+        return None
+    rows = [(choice, int(score)) for choice, score in pairs]
+    return rows, sum(count for _, count in rows)
+
+def decode_change(payload):
+    """A rank-change message -> dict with standings as [{choice, count}], or None if malformed"""
+    try:
+        change = json.loads(payload)
+        flat = change["standings"]
+        change["standings"] = [{"choice": flat[i], "count": int(float(flat[i + 1]))}
+                               for i in range(0, len(flat), 2)]
+        change["total_votes"] = sum(row["count"] for row in change["standings"])
+        return change
+    except (ValueError, KeyError, TypeError, IndexError):
+        return None
+
+class Leaderboard:
+    """The sorted sets in one Redis (a redis.Redis client with decode_responses=True)"""
+
+    def __init__(self, client):
+        self.client = client
+        self._record = client.register_script(RECORD)
+        self._load = client.register_script(LOAD)
+        self._clear = client.register_script(CLEAR)
+
+    def epoch(self):
+        """Read before touching Postgres; pass to record() / load()"""
+        return to_epoch(self.client.get(EPOCH_KEY))
+
+    def record(self, poll_id, choice, shard, tally, epoch):
+        """
+        Raise the board to a committed vote's tally on its shard:
+        (votes, previous rank, rank), or None if there was nothing to add.
+        """
+        keys, args = record_args(poll_id, choice, shard, tally, epoch)
+        result = self._record(keys=keys, args=args)
+        return tuple(result) if result else None
+
+    def standings(self, poll_id):
+        """(rows most votes first, total), or None if the board isn't loaded"""
+        board, _, loaded = board_keys(poll_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.exists(loaded)
+        pipe.zrevrange(board, 0, -1, withscores=True)
+        return to_standings(*pipe.execute())
+
+    def load(self, poll_id, per_shard, epoch):
+        """
+        Raise the board to the Postgres tallies (one list of rows per shard,
+        read after `epoch`) and mark it loaded. Returns (was it loaded,
+        votes it was missing), or None if a reset got in between.
+        """
+        keys, args = load_args(poll_id, per_shard, epoch)
+        result = self._load(keys=keys, args=args)
+        return (bool(result[0]), int(result[1])) if result else None
+
+    def invalidate(self, poll_id):
+        """Reads fall back to Postgres until the board is loaded again"""
+        self.client.delete(board_keys(poll_id)[2])
+
+    def clear(self):
+        """Drop every board and refuse anything counted before now (after the votes are deleted)"""
+        return self._clear(keys=[EPOCH_KEY, POLLS_KEY], args=[])
+
+    def claim_reconcile(self, seconds):
+        """True for the one process allowed to reconcile for the next `seconds`"""
+        return bool(self.client.set(RECONCILE_LOCK, 1, nx=True, ex=max(1, int(seconds))))
+
+# ==============================================================================
+# RANK FEED (pub/sub -> SSE)
+# ==============================================================================
+
+class RankFeed:
+    """
+    One thread subscribed to rank changes, keeping the latest ones for SSE.
+
+    `client` is a callable returning the current redis.Redis (or None while
+    Redis is down), so a restarted container is picked up on reconnect.
+    """
+
+    def __init__(self, client, keep=50, poll_interval=1.0):
+        self.client = client
+        self.poll_interval = poll_interval
+        self._changes = deque(maxlen=keep)  # (sequence, JSON)
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="leaderboard-feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    @property
+    def sequence(self):
+        """Pass to since() to get only changes from now on"""
+        with self._lock:
+            return self._sequence
+
+    def add(self, change):
+        with self._lock:
+            self._sequence += 1
+            self._changes.append((self._sequence, json.dumps(change)))
+
+    def since(self, sequence):
+        """(latest sequence, [change JSON after `sequence`]) - pass the sequence back next time"""
+        with self._lock:
+            return self._sequence, [payload for n, payload in self._changes if n > sequence]
+
+    def _run(self):
+        while not self._stop.is_set():
+            client = self.client()
+            if client is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(CHANNEL)
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=self.poll_interval)
+                    if message is not None:
+                        self._deliver(message["data"])
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.warning(f"Leaderboard feed reconnecting: {e}")
+                self._stop.wait(1)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+    def _deliver(self, payload):
+        change = decode_change(payload)
+        if change is None:
+            logger.warning(f"Ignoring malformed rank change: {payload[:200]!r}")
+            return
+        self.add(change)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+📜 Reality Engine Log Sink
+==========================
+
+Non-blocking logging for the Reality Engine. Request threads only put
+log records on an in-memory queue; one background listener thread does
+the formatting and terminal/file I/O. So a slow terminal (or a flood of
+lifecycle events) never stalls vote handling.
+
+Outputs:
+    console    human-readable (or JSON), rate-limited to N lines/second
+    LOG_FILE   JSON lines, unthrottled, one object per record
+
+Environment:
+    LOG_LEVEL          root level                    (default INFO)
+    EVENT_LOG_LEVEL    level for lifecycle events    (default INFO)
+    LOG_FORMAT         console format: text | json   (default text)
+    LOG_FILE           JSON-lines file path          (default: none)
+    LOG_CONSOLE_RATE   console lines/second, 0 = off (default 50)
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from datetime import datetime
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Standard LogRecord attributes - everything else was passed via extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any extra= fields"""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves most of the formatting to the listener thread.
+
+    The stock handler formats the whole line (timestamp, level, traceback)
+    in the calling thread. Here the caller only merges msg % args - the
+    root logger also carries urllib3, docker, psycopg and testcontainers
+    records, whose arguments their owners may change after the call -
+    and the formatter, JSON encoding and tracebacks run on the listener.
+    """
+
+    def prepare(self, record):
+        if not record.args:
+            return record
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+class RateLimitedStreamHandler(logging.StreamHandler):
+    """Token-bucket console handler; reports how many lines were dropped"""
+
+    def __init__(self, stream=None, rate=50):
+        super().__init__(stream)
+        self.rate = rate
+        self.tokens = float(rate)
+        self.last_refill = time.monotonic()
+        self.suppressed = 0
+
+    def emit(self, record):
+        if self.rate > 0:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                return
+            self.tokens -= 1
+
+        self._report_suppressed()
+        super().emit(record)
+
+    def flush(self):
+        # Don't lose the drop count when the sink stops mid-burst
+        self._report_suppressed()
+        super().flush()
+
+    def _report_suppressed(self):
+        if self.suppressed:
+            dropped, self.suppressed = self.suppressed, 0
+            self.stream.write(f"... {dropped} log line(s) suppressed (console rate limit)\n")
+
+class LogSink:
+    """Owns the queue, listener thread and output handlers"""
+
+    def __init__(self, level=logging.INFO, console_format="text", console_rate=50,
+                 log_file=None, stream=None):
+        self.queue = queue.SimpleQueue()
+
+        console = RateLimitedStreamHandler(stream or sys.stderr, rate=console_rate)
+        console.setFormatter(JsonFormatter() if console_format == "json" else logging.Formatter(TEXT_FORMAT))
+        self.console = console
+
+        handlers = [console]
+        if log_file:
+            directory = os.path.dirname(os.path.abspath(log_file))
+            os.makedirs(directory, exist_ok=True)
+            file_handler = logging.FileHandler(log_file, encoding="utf-8")
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        self.handlers = handlers
+
+        self.handler = DeferredQueueHandler(self.queue)
+        self.level = level
+        self._running = False
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+
+    def install(self, logger=None):
+        """Route `logger` (default: root) through the queue and start the listener"""
+        target = logger or logging.getLogger()
+        for existing in list(target.handlers):
+            target.removeHandler(existing)
+        target.addHandler(self.handler)
+        target.setLevel(self.level)
+        self.listener.start()
+        self._running = True
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        """Flush queued records and stop the listener (idempotent)"""
+        if self._running:
+            self._running = False
+            self.listener.stop()
+            for handler in self.handlers:
+                handler.flush()
+
+    def depth(self):
+        """Records waiting for the listener"""
+        return self.queue.qsize()
+
+def level_from_env(name, default="INFO"):
+    """Parse a level name like 'DEBUG' from the environment"""
+    value = os.getenv(name, default).upper()
+    level = logging.getLevelName(value)
+    return level if isinstance(level, int) else logging.getLevelName(default)
+
+def setup_logging():
+    """Install the queue-backed sink on the root logger using env settings"""
+    return LogSink(
+        level=level_from_env("LOG_LEVEL"),
+        console_format=os.getenv("LOG_FORMAT", "text"),
+        console_rate=int(os.getenv("LOG_CONSOLE_RATE", "50")),
+        log_file=os.getenv("LOG_FILE") or None,
+    ).install()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+📈 Reality Engine Metrics
+=========================
+
+Tiny Prometheus-compatible metrics for the Reality Engine - no extra
+dependencies. Counters, gauges and histograms write to one of a fixed
+number of lock-striped cells (picked by thread id), so concurrent request
+threads rarely wait on each other and memory stays bounded however many
+threads come and go. Cells are summed when /metrics is scraped.
+
+Usage:
+    from metrics import REGISTRY
+    VOTES = REGISTRY.counter("votes_total", "Votes recorded", ["choice"])
+    VOTES.labels("Python").inc()
+
+    with REGISTRY.histogram("query_seconds", "Query latency").time():
+        cur.execute(...)
+
+    REGISTRY.render()   # Prometheus text exposition format
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets (seconds) tuned for a demo app: 0.5ms .. 30s
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# ==============================================================================
+# LOCK-STRIPED CELLS
+# ==============================================================================
+
+# Cells per metric child: enough that a few dozen request threads seldom share one
+STRIPES = 16
+
+class _Cells:
+    """STRIPES lists of floats, each behind its own lock; readers sum them all"""
+
+    def __init__(self, size, stripes=STRIPES):
+        self._size = size
+        self._stripes = [([0.0] * size, threading.Lock()) for _ in range(stripes)]
+
+    def add(self, *updates):
+        """Apply (index, amount) pairs to this thread's stripe, together"""
+        cell, lock = self._stripes[threading.get_native_id() % len(self._stripes)]
+        with lock:
+            for index, amount in updates:
+                cell[index] += amount
+
+    def total(self):
+        """Element-wise sum over every stripe"""
+        totals = [0.0] * self._size
+        for cell, lock in self._stripes:
+            with lock:
+                values = list(cell)
+            for i, value in enumerate(values):
+                totals[i] += value
+        return totals
+
+# ==============================================================================
+# METRIC TYPES
+# ==============================================================================
+
+class _Metric:
+    """Base class: handles label children"""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), **kwargs):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._kwargs = kwargs
+        self._children = {}
+        self._lock = threading.Lock()
+        self._cells = None if self.labelnames else self._new_cells()
+
+    def _new_cells(self):
+        return _Cells(1)
+
+    def labels(self, *values):
+        """Child metric for one label combination"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = type(self)(self.name, self.documentation, **self._kwargs)
+                    self._children[key] = child
+        return child
+
+    def _samples(self):
+        """[(suffix, {labels}, value)] for this metric and its children"""
+        if not self.labelnames:
+            return self._own_samples({})
+        samples = []
+        for key, child in sorted(self._children.items()):
+            samples.extend(child._own_samples(dict(zip(self.labelnames, key))))
+        return samples
+
+    def _own_samples(self, labels):
+        return [("", labels, self._cells.total()[0])]
+
+class Counter(_Metric):
+    """Monotonic counter"""
+
+    kind = "counter"
+
+    def inc(self, amount=1):
+        self._cells.add((0, amount))
+
+    @property
+    def value(self):
+        return self._cells.total()[0]
+
+class Gauge(_Metric):
+    """Up/down gauge, or a callback evaluated at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), func=None):
+        super().__init__(name, documentation, labelnames)
+        self._func = func
+
+    def inc(self, amount=1):
+        self._cells.add((0, amount))
+
+    def dec(self, amount=1):
+        self._cells.add((0, -amount))
+
+    @property
+    def value(self):
+        if self._func is not None:
+            return float(self._func())
+        return self._cells.total()[0]
+
+    def _own_samples(self, labels):
+        return [("", labels, self.value)]
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, buckets=self.buckets)
+
+    def _new_cells(self):
+        # one slot per bucket, +Inf, sum
+        return _Cells(len(self.buckets) + 2)
+
+    def observe(self, value):
+        self._cells.add((bisect.bisect_left(self.buckets, value), 1), (len(self.buckets) + 1, value))
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    @property
+    def count(self):
+        return sum(self._cells.total()[:-1])
+
+    def _own_samples(self, labels):
+        totals = self._cells.total()
+        samples = []
+        running = 0.0
+        for bound, count in zip(self.buckets + (float("inf"),), totals[:-1]):
+            running += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            samples.append(("_bucket", dict(labels, le=le), running))
+        samples.append(("_count", labels, running))
+        samples.append(("_sum", labels, totals[-1]))
+        return samples
+
+# ==============================================================================
+# REGISTRY
+# ==============================================================================
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Registry:
+    """Collection of metrics rendered together on /metrics"""
+
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames=(), **kwargs):
+        full_name = self.prefix + name
+        with self._lock:
+            if full_name in self._metrics:
+                return self._metrics[full_name]
+            metric = cls(full_name, documentation, labelnames, **kwargs)
+            self._metrics[full_name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), func=None):
+        return self._register(Gauge, name, documentation, labelnames, func=func)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric._samples():
+                label_text = ""
+                if labels:
+                    label_text = "{" + ",".join(
+                        f'{k}="{_escape(v)}"' for k, v in labels.items()
+                    ) + "}"
+                lines.append(f"{metric.name}{suffix}{label_text} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry(prefix="reality_engine_")
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+🔍 Reality Engine Pre-flight
+============================
+
+Startup checks for the engine, run concurrently:
+
+    docker    asks the daemon for /version over its socket (no `which`,
+              `docker --version` or `docker ps` subprocesses)
+    port      the HTTP port can be bound
+    packages  required modules are installed (found, not imported)
+
+A passing Docker check is cached for a short TTL, so restarting the
+engine during rehearsal doesn't ask the daemon again. The port is always
+re-checked since it changes from run to run.
+
+Environment:
+    PREFLIGHT_TTL   seconds a passing Docker check is reused (default 60, 0 = off)
+
+Usage:
+    report = preflight.run(port=5001)
+    report.print()
+    if not report.ok: sys.exit(1)
+"""
+
+import importlib.util
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+CACHE_FILE = os.path.join(tempfile.gettempdir(), "reality-engine", "preflight.json")
+DEFAULT_TTL = 60
+DEFAULT_PACKAGES = ("flask", "flask_cors", "testcontainers", "psycopg", "redis")
+
+def default_docker_host():
+    """Same default the engine configures for TestContainers"""
+    if os.getenv("DOCKER_HOST"):
+        return os.environ["DOCKER_HOST"]
+    return "tcp://localhost:2375" if sys.platform == "win32" else "unix:///var/run/docker.sock"
+
+class CheckResult:
+    """Outcome of one check; `fixes` are shown when it fails"""
+
+    def __init__(self, name, ok, detail, seconds=0.0, cached=False, fixes=()):
+        self.name = name
+        self.ok = ok
+        self.detail = detail
+        self.seconds = seconds
+        self.cached = cached
+        self.fixes = list(fixes)
+
+    def to_dict(self):
+        return {"name": self.name, "ok": self.ok, "detail": self.detail,
+                "seconds": round(self.seconds, 4), "cached": self.cached}
+
+class PreflightReport:
+    def __init__(self, results, total_seconds):
+        self.results = results
+        self.total_seconds = total_seconds
+
+    @property
+    def ok(self):
+        return all(result.ok for result in self.results)
+
+    def lines(self):
+        lines = []
+        for result in self.results:
+            icon = "✅" if result.ok else "❌"
+            source = "cached" if result.cached else f"{result.seconds * 1000:.0f} ms"
+            lines.append(f"{icon} {result.name}: {result.detail} ({source})")
+            if not result.ok:
+                lines += [f"   • {fix}" for fix in result.fixes]
+        lines.append(f"⏱️  Pre-flight total: {self.total_seconds * 1000:.0f} ms")
+        return lines
+
+    def print(self, out=None):
+        print("\n".join(self.lines()), file=out or sys.stdout)
+
+# ==============================================================================
+# CHECKS
+# ==============================================================================
+
+def docker_request(path, host=None, timeout=2.0):
+    """Minimal HTTP/1.0 GET against the Docker API; returns (status, body)"""
+    url = urlparse(host or default_docker_host())
+    if url.scheme == "unix":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = url.path
+    elif url.scheme in ("tcp", "http"):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = (url.hostname or "localhost", url.port or 2375)
+    else:
+        raise ValueError(f"Unsupported DOCKER_HOST scheme: {url.scheme}")
+
+    with sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall(f"GET {path} HTTP/1.0\r\nHost: docker\r\n\r\n".encode())
+        data = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+
+    head, _, body = data.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1]) if head.startswith(b"HTTP/") else 0
+    return status, body
+
+def _docker_fixes(reason):
+    fixes = ["Run: python3 check_environment.py"]
+    if reason == "permission":
+        fixes.insert(0, "Add your user to the docker group: sudo usermod -aG docker $USER (then log in again)")
+    elif os.getenv("CODESPACES") == "true":
+        fixes.insert(0, "Rebuild your Codespace: F1 → 'Codespaces: Rebuild Container'")
+    else:
+        fixes.insert(0, "Start Docker Desktop (or the Docker daemon)")
+    return fixes
+
+def check_docker(host=None, timeout=2.0):
+    host = host or default_docker_host()
+    start = time.perf_counter()
+    try:
+        status, body = docker_request("/version", host, timeout)
+        if status != 200:
+            return CheckResult("Docker", False, f"daemon answered HTTP {status}",
+                               time.perf_counter() - start, fixes=_docker_fixes("error"))
+        version = json.loads(body).get("Version", "unknown")
+        return CheckResult("Docker", True, f"running (v{version}) at {host}", time.perf_counter() - start)
+    except PermissionError:
+        return CheckResult("Docker", False, f"permission denied on {host}",
+                           time.perf_counter() - start, fixes=_docker_fixes("permission"))
+    except (OSError, ValueError) as e:
+        return CheckResult("Docker", False, f"not reachable at {host} ({e})",
+                           time.perf_counter() - start, fixes=_docker_fixes("down"))
+
+def check_port(port=5001):
+    start = time.perf_counter()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind(("0.0.0.0", port))
+        return CheckResult(f"Port {port}", True, "available", time.perf_counter() - start)
+    except OSError:
+        return CheckResult(f"Port {port}", False, "already in use", time.perf_counter() - start, fixes=[
+            f"Find process: lsof -i :{port}",
+            "Stop old demos cleanly: python3 cleanup.py",
+        ])
+    finally:
+        sock.close()
+
+def check_packages(packages=DEFAULT_PACKAGES):
+    start = time.perf_counter()
+    missing = [name for name in packages if importlib.util.find_spec(name) is None]
+    if missing:
+        return CheckResult("Packages", False, f"missing {', '.join(missing)}", time.perf_counter() - start,
+                           fixes=["pip install -r requirements.txt"])
+    return CheckResult("Packages", True, f"{len(packages)} installed", time.perf_counter() - start)
+
+# ==============================================================================
+# CACHE
+# ==============================================================================
+
+def _load_cached_docker(host, ttl):
+    try:
+        with open(CACHE_FILE) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("host") != host or time.time() - entry.get("checked_at", 0) > ttl:
+        return None
+    return CheckResult("Docker", True, entry["detail"], cached=True)
+
+def _store_cached_docker(host, result):
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        tmp = f"{CACHE_FILE}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump({"host": host, "detail": result.detail, "checked_at": time.time()}, f)
+        os.replace(tmp, CACHE_FILE)
+    except OSError:
+        pass  # caching is an optimization only
+
+def clear_cache():
+    try:
+        os.remove(CACHE_FILE)
+    except OSError:
+        pass
+
+# ==============================================================================
+# ENTRY POINT
+# ==============================================================================
+
+def run(port=5001, docker_host=None, ttl=None, packages=DEFAULT_PACKAGES):
+    """Run all checks concurrently and return a PreflightReport (port=None skips the port)"""
+    start = time.perf_counter()
+    host = docker_host or default_docker_host()
+    ttl = float(os.getenv("PREFLIGHT_TTL", DEFAULT_TTL)) if ttl is None else ttl
+
+    cached = _load_cached_docker(host, ttl) if ttl > 0 else None
+
+    checks = [lambda: check_packages(packages)]
+    if port is not None:
+        checks.insert(0, lambda: check_port(port))
+    if cached is None:
+        checks.insert(0, lambda: check_docker(host))
+
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        results = list(pool.map(lambda check: check(), checks))
+
+    if cached is not None:
+        results.insert(0, cached)
+    elif results[0].ok and ttl > 0:
+        _store_cached_docker(host, results[0])
+
+    return PreflightReport(results, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    report = run(ttl=0)
+    report.print()
+    sys.exit(0 if report.ok else 1)
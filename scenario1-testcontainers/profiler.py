@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+🔥 Reality Engine Sampling Profiler
+===================================
+
+Time-boxed, in-process sampling profiler. The calling thread snapshots
+every other thread's Python stack (sys._current_frames) at a fixed interval and
+aggregates identical stacks. Output is collapsed-stack format - one
+`root;caller;callee count` line per stack - ready for flamegraph.pl or
+speedscope.
+
+Nothing is installed or traced between samples, so the running show is
+only slowed while a profile is being taken.
+
+Usage:
+    from profiler import profile
+    result = profile(seconds=5, interval=0.005)
+    print(result.collapsed())
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_SECONDS = 60
+MIN_INTERVAL = 0.001
+
+# Only one profile at a time - overlapping samplers would double the cost
+_profile_lock = threading.Lock()
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is already running"""
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _thread_label(thread):
+    # "Thread-12 (process_request_thread)" -> "Thread (process_request_thread)"
+    name = thread.name if thread else "unknown"
+    label = "".join(ch for ch in name if not ch.isdigit() and ch != ";")
+    return label.replace("-", "").strip() or "thread"
+
+class ProfileResult:
+    """Aggregated stacks from one profiling session"""
+
+    def __init__(self, stacks, samples, duration, interval, threads_seen):
+        self.stacks = stacks
+        self.samples = samples
+        self.duration = duration
+        self.interval = interval
+        self.threads_seen = threads_seen
+
+    def collapsed(self):
+        """Brendan Gregg collapsed-stack format (flamegraph.pl input)"""
+        return "\n".join(
+            f"{stack} {count}" for stack, count in self.stacks.most_common()
+        ) + ("\n" if self.stacks else "")
+
+    def top_functions(self, limit=20):
+        """Leaf functions by self-sample count"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [{"function": name, "samples": count} for name, count in leaves.most_common(limit)]
+
+    def to_dict(self, limit=20):
+        return {
+            "duration_s": round(self.duration, 3),
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "threads_seen": self.threads_seen,
+            "unique_stacks": len(self.stacks),
+            "top_functions": self.top_functions(limit),
+            "collapsed": self.collapsed(),
+        }
+
+def profile(seconds=5.0, interval=0.005, group_by_thread=True, on_start=None):
+    """
+    Sample all other threads for `seconds` and return a ProfileResult.
+    `on_start()` is called once the arguments are accepted and this is
+    the only profile running, just before sampling begins.
+
+    Raises ProfilerBusy if a profile is already running and ValueError
+    for out-of-range arguments.
+    """
+    if not 0 < seconds <= MAX_SECONDS:
+        raise ValueError(f"seconds must be in (0, {MAX_SECONDS}]")
+    if interval < MIN_INTERVAL:
+        raise ValueError(f"interval must be >= {MIN_INTERVAL}")
+
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+
+    try:
+        if on_start is not None:
+            on_start()
+        stacks = Counter()
+        samples = 0
+        threads_seen = set()
+        sampler_id = threading.get_ident()
+        start = time.perf_counter()
+        deadline = start + seconds
+
+        while time.perf_counter() < deadline:
+            threads = {t.ident: t for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.reverse()
+                if group_by_thread:
+                    thread_label = _thread_label(threads.get(thread_id))
+                    threads_seen.add(thread_label)
+                    labels.insert(0, thread_label)
+                stacks[";".join(labels)] += 1
+            samples += 1
+            time.sleep(interval)
+
+        return ProfileResult(
+            stacks, samples, time.perf_counter() - start, interval, sorted(threads_seen)
+        )
+    finally:
+        _profile_lock.release()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+📈 Reality Engine Vote Rates
+============================
+
+Rolling rate series for the dashboard - votes ingested, duplicates
+caught and requests rate limited - counted per second and per minute:
+
+    second   the last 300 one-second buckets (5 minutes)
+    minute   the last 120 one-minute buckets (2 hours)
+
+Every series is a fixed-size circular array, so recording is O(1) and
+memory never grows however long the show runs. The votes table is only
+aggregated once, at startup, to seed the ingest series from created_at
+(duplicates and 429s are not stored, so their history starts empty).
+
+Counts come from the lifecycle events each process already receives
+(vote_success, vote_blocked, rate_limited), so under serve.py every
+worker sees every worker's votes.
+"""
+
+import json
+import threading
+import time
+
+# Event type -> series it counts towards
+SERIES = {"vote_success": "votes", "vote_blocked": "duplicates", "rate_limited": "rate_limited"}
+
+# Resolution -> (bucket width in seconds, buckets kept)
+RESOLUTIONS = {"second": (1, 300), "minute": (60, 120)}
+HISTORY_SECONDS = max(width * size for width, size in RESOLUTIONS.values())
+
+# Pushed to SSE clients: the last minute, second by second
+LIVE_POINTS = 60
+# Rates are averaged over this many complete buckets
+RATE_BUCKETS = 10
+
+class RingSeries:
+    """Counts per `width`-second bucket for the last `size` buckets"""
+
+    def __init__(self, width, size):
+        self.width = width
+        self.size = size
+        self.counts = [0] * size
+        self.buckets = [-1] * size  # bucket number each slot holds
+
+    def add(self, t, n=1):
+        bucket = int(t // self.width)
+        slot = bucket % self.size
+        held = self.buckets[slot]
+        if held == bucket:
+            self.counts[slot] += n
+        elif held < bucket:
+            # Slot reused: what it held has left the window
+            self.buckets[slot] = bucket
+            self.counts[slot] = n
+        # else: older than the window - dropped
+
+    def window(self, now, points):
+        """Counts of the `points` buckets up to the one holding `now`, oldest first"""
+        current = int(now // self.width)
+        counts = []
+        for bucket in range(current - min(points, self.size) + 1, current + 1):
+            slot = bucket % self.size
+            counts.append(self.counts[slot] if self.buckets[slot] == bucket else 0)
+        return counts
+
+class VoteRates:
+    """All series at all resolutions; thread-safe"""
+
+    def __init__(self, resolutions=RESOLUTIONS, clock=time.time):
+        self.resolutions = resolutions
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rings = self._empty()
+        self._live = (None, None)  # (second, JSON) shared by all SSE streams
+
+    def _empty(self):
+        return {
+            resolution: {name: RingSeries(width, size) for name in SERIES.values()}
+            for resolution, (width, size) in self.resolutions.items()
+        }
+
+    def clear(self):
+        with self._lock:
+            self._rings = self._empty()
+            self._live = (None, None)
+
+    def record(self, series, t=None, n=1):
+        t = self._clock() if t is None else t
+        with self._lock:
+            for rings in self._rings.values():
+                rings[series].add(t, n)
+
+    def record_event(self, event):
+        """Count a lifecycle event if it is one of SERIES"""
+        series = SERIES.get(event.get("type"))
+        if series is not None:
+            self.record(series)
+
+    def seed(self, ages, series="votes"):
+        """Add history as (seconds ago, count) pairs; returns the total added"""
+        now = self._clock()
+        total = 0
+        for age, count in ages:
+            self.record(series, now - max(age, 0), count)
+            total += count
+        return total
+
+    def snapshot(self, resolution="second", points=LIVE_POINTS):
+        """Series for the last `points` buckets (the newest one still filling)"""
+        width, size = self.resolutions[resolution]
+        points = max(1, min(points, size))
+        now = self._clock()
+        with self._lock:
+            series = {name: ring.window(now, points) for name, ring in self._rings[resolution].items()}
+
+        complete = min(RATE_BUCKETS, points - 1)
+        return {
+            "resolution": resolution,
+            "bucket_seconds": width,
+            "start": (int(now // width) - points + 1) * width,
+            "series": series,
+            "per_second": {
+                name: round(sum(counts[-1 - complete:-1]) / (complete * width), 2) if complete else 0.0
+                for name, counts in series.items()
+            },
+        }
+
+    def live_json(self):
+        """The per-second snapshot as JSON, built at most once a second however many clients ask"""
+        second = int(self._clock())
+        built_at, payload = self._live
+        if built_at != second:
+            payload = json.dumps(self.snapshot("second", LIVE_POINTS))
+            self._live = (second, payload)
+        return payload
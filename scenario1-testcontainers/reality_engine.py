@@ -10,129 +10,99 @@ why production-parity testing matters.
 
 Runtime: 8 minutes
 Outcome: Lifelong "aha" moment
+
+Usage:
+    python3 reality_engine.py            # run the show
+    python3 reality_engine.py --check    # pre-flight checks only
+    python3 reality_engine.py --health   # ask a running engine how it is
 """
 
 import os
 import sys
 import time
+
+# Reference point for the startup time logged once the server is up
+IMPORT_STARTED = time.perf_counter()
+
+# ==============================================================================
+# FAST-START CLI (answered before Flask, psycopg or redis are imported)
+# ==============================================================================
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="The Reality Engine - an 8-minute TestContainers show")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="Run the pre-flight checks and exit")
+    mode.add_argument("--health", action="store_true", help="Query a running engine's /api/health and exit")
+    return parser.parse_args(argv)
+
+def query_health(host="127.0.0.1", port=5001, timeout=2.0):
+    """(status, body) of a running engine's /api/health"""
+    import http.client
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request("GET", "/api/health")
+        response = conn.getresponse()
+        return response.status, response.read().decode("utf-8")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    CLI_ARGS = parse_args()
+    if CLI_ARGS.check:
+        import preflight
+        report = preflight.run(port=5001)
+        report.print()
+        sys.exit(0 if report.ok else 1)
+    if CLI_ARGS.health:
+        try:
+            status, body = query_health()
+        except OSError as e:
+            print(f"❌ Reality Engine not reachable on port 5001: {e}")
+            sys.exit(1)
+        print(body)
+        sys.exit(0 if status == 200 else 1)
+
 import uuid
 import json
 import threading
 import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from collections import defaultdict
-from flask import Flask, render_template, jsonify, request, session, Response
+from flask import Flask, render_template, jsonify, request, session, Response, g
 from flask_cors import CORS
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from tracing import TRACER
+import profiler
+import logsink
+import schema
+import shared_state
+import event_bus
+import docker_events
+import telemetry
+import control
+import preflight
+import db
+import rates
+import replica
+import shards
+import leaderboard
+
+# Configure logging (queue-backed: request threads never block on I/O)
+log_sink = logsink.setup_logging()
 logger = logging.getLogger(__name__)
 
+# Lifecycle events are echoed at this level (DEBUG hides them at LOG_LEVEL=INFO)
+event_logger = logging.getLogger(__name__ + ".events")
+EVENT_LOG_LEVEL = logsink.level_from_env("EVENT_LOG_LEVEL")
+
 # ==============================================================================
 # PRE-FLIGHT CHECKS
 # ==============================================================================
 
-def check_docker():
-    """Verify Docker is running and accessible"""
-    # First try to find Docker using which/where
-    docker_cmd = None
-    
-    # Try which command first (works in most environments)
-    try:
-        which_result = subprocess.run(['which', 'docker'], capture_output=True, text=True, timeout=2)
-        if which_result.returncode == 0 and which_result.stdout.strip():
-            docker_cmd = which_result.stdout.strip()
-    except:
-        pass
-    
-    # If which didn't work, try common paths
-    if not docker_cmd:
-        docker_paths = [
-            '/usr/local/bin/docker',  # Codespaces + macOS
-            '/usr/bin/docker',         # Linux
-            '/opt/homebrew/bin/docker', # macOS ARM
-            '/usr/bin/docker.io',      # Some Linux distros
-            'docker'                   # Fallback to PATH
-        ]
-        
-        for path in docker_paths:
-            if path == 'docker':
-                # Try direct command
-                try:
-                    result = subprocess.run(['docker', '--version'], capture_output=True, text=True, timeout=2)
-                    if result.returncode == 0:
-                        docker_cmd = 'docker'
-                        break
-                except:
-                    continue
-            elif os.path.exists(path):
-                docker_cmd = path
-                break
-
-    if not docker_cmd:
-        print("❌ Docker not found!")
-        print()
-        in_codespaces = os.getenv('CODESPACES') == 'true'
-
-        if in_codespaces:
-            print("💡 FIX: Your Codespace needs Docker installed")
-            print()
-            print("   Run this Python script for detailed instructions:")
-            print("   → python3 check_environment.py")
-            print()
-            print("   Quick fix: Rebuild your Codespace")
-            print("   • Press F1 → 'Codespaces: Rebuild Container'")
-        else:
-            print("💡 Solutions:")
-            print("   • Run: python3 check_environment.py")
-            print("   • Install Docker Desktop")
-        sys.exit(1)
-
-    # Test Docker
-    try:
-        result = subprocess.run([docker_cmd, 'ps'], capture_output=True, text=True, timeout=5)
-        if result.returncode != 0:
-            print("❌ Docker not running!")
-            print(f"   Path: {docker_cmd}")
-            print(f"   Error: {result.stderr}")
-            print("\n💡 Solutions:")
-            print("   • Codespaces: Docker should auto-start")
-            print("   • Local: Start Docker Desktop")
-            sys.exit(1)
-
-        logger.info(f"✅ Docker running at {docker_cmd}")
-        return True
-    except Exception as e:
-        print(f"❌ Docker error: {e}")
-        sys.exit(1)
-
-def check_port(port=5001):
-    """Check if port is available"""
-    import socket
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    try:
-        sock.bind(('0.0.0.0', port))
-        sock.close()
-        logger.info(f"✅ Port {port} is available")
-        return True
-    except OSError:
-        print(f"❌ Port {port} is already in use!")
-        print(f"\n💡 Solutions:")
-        print(f"   • Find process: lsof -i :{port}")
-        print(f"   • Kill process: kill -9 <PID>")
-        print(f"   • Or change port in code: app.run(port=5002)")
-        sys.exit(1)
-
-# Run pre-flight checks
-logger.info("🔍 Running pre-flight checks...")
-check_docker()
-check_port()
-
-# Configure TestContainers
+# Configure TestContainers (inherited by test subprocesses and serve.py workers)
 os.environ["TESTCONTAINERS_CLOUD_ENABLED"] = "false"
 
 if sys.platform == "win32":
@@ -140,10 +110,20 @@ if sys.platform == "win32":
 else:
     os.environ["DOCKER_HOST"] = "unix:///var/run/docker.sock"
 
-# Import dependencies
+def run_preflight():
+    """Docker, port and packages, checked in parallel; exits on failure"""
+    logger.info("🔍 Running pre-flight checks...")
+    report = preflight.run(port=5001)
+    if not report.ok:
+        report.print()
+        sys.exit(1)
+    for line in report.lines():
+        logger.info(line)
+    return report
+
+# Import dependencies (testcontainers, with the docker + requests stack under
+# it, is only imported when the first container starts)
 try:
-    from testcontainers.postgres import PostgresContainer
-    from testcontainers.redis import RedisContainer
     import psycopg
     from psycopg import IntegrityError
     import redis
@@ -165,20 +145,100 @@ CORS(app)
 # GLOBAL STATE
 # ==============================================================================
 
-# Container instances
+# Container instances (in multi-worker mode: endpoints owned by the supervisor)
 postgres_container = None
 redis_container = None
+replica_container = None
+shard_containers = []  # shards 1..N-1 (shard 0 is postgres_container)
+postgres_start_lock = threading.Lock()
+
+# (container, db.ConnectionPool) - replaced when the container changes
+_db_pool = (None, None)
+_db_pool_lock = threading.Lock()
+_shard_set = (None, None)  # (shard 0 container, shards.ShardSet)
+_leaderboard = (None, None)  # (Redis container, leaderboard.Leaderboard)
 
-# Feature toggles (controlled by presenter)
-RATE_LIMIT_ENABLED = False
-CHAOS_MODE = False
+# Feature toggles, vote tallies and the event fan-out live here:
+# in-process for `python3 reality_engine.py`, Redis under `python3 serve.py`
+STATE = shared_state.from_env()
 
-# Event stream for lifecycle visualization
+# Event stream for lifecycle visualization (this process's SSE buffer)
 lifecycle_events = []
 event_lock = threading.Lock()
 
-# Vote statistics (for leaderboard)
-vote_stats = defaultdict(int)
+# Rolling vote/duplicate/429 rates, counted from the events this process sees
+VOTE_RATES = rates.VoteRates()
+
+# Set by an orderly shutdown (cleanup.py): SSE streams send what's left and end
+SHUTTING_DOWN = threading.Event()
+
+# Answer repeat votes from the known-voter set (0 = always let Postgres catch them)
+VOTER_CACHE = os.getenv("VOTER_CACHE", "1") != "0"
+
+# Stream the primary to a read replica for stats/polls/export (single process only)
+REPLICA_ENABLED = os.getenv("REPLICA", "0") == "1"
+
+# Spread votes over this many Postgres containers by user_id (single process only)
+SHARD_COUNT = max(1, int(os.getenv("SHARDS", "1")))
+
+# Redis sorted-set standings, reconciled against Postgres every so often
+LEADERBOARD_ENABLED = os.getenv("LEADERBOARD", "0") == "1"
+LEADERBOARD_RECONCILE_INTERVAL = float(os.getenv("LEADERBOARD_RECONCILE_INTERVAL", "30"))
+
+def rate_limit_enabled():
+    """Feature toggle (controlled by presenter)"""
+    return STATE.flag("rate_limit")
+
+def chaos_mode():
+    """Feature toggle (controlled by presenter)"""
+    return STATE.flag("chaos")
+
+# Request tracing (sample rate adjustable at /api/debug/traces)
+TRACER.configure(sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1.0")))
+
+# Long-lived or self-referential routes are not traced
+UNTRACED_ROUTES = {'/api/events', '/metrics', '/api/debug/traces', '/api/debug/profile'}
+
+# ==============================================================================
+# METRICS (scraped at /metrics)
+# ==============================================================================
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route, method and status",
+    ["route", "method", "status"])
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["route"])
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "db_query_duration_seconds", "PostgreSQL query latency", ["query"])
+REDIS_LATENCY = REGISTRY.histogram(
+    "redis_command_duration_seconds", "Redis command latency", ["command"])
+CONTAINER_START = REGISTRY.histogram(
+    "container_start_seconds", "Container start duration", ["container"],
+    buckets=(0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0))
+RATE_LIMIT_DECISIONS = REGISTRY.counter(
+    "rate_limit_decisions_total", "Rate-limit decisions", ["decision"])
+DUPLICATE_VOTES = REGISTRY.counter(
+    "duplicate_votes_total", "Repeat votes by where they were caught", ["source"])
+EXPORTED_ROWS = REGISTRY.counter(
+    "exported_rows_total", "Votes streamed out by /api/export", ["format"])
+DB_READS = REGISTRY.counter(
+    "db_reads_total", "Read-only queries by the database that served them", ["target"])
+STATS_READS = REGISTRY.counter(
+    "stats_reads_total", "Stats answered by the Redis leaderboard or by Postgres", ["source"])
+LEADERBOARD_CORRECTIONS = REGISTRY.counter(
+    "leaderboard_corrected_votes_total", "Votes the leaderboard was missing when reconciled against Postgres")
+DB_POOL_EXHAUSTED = REGISTRY.counter(
+    "db_pool_exhausted_total", "Requests answered 503 because every pooled connection was busy")
+EVENTS_EMITTED = REGISTRY.counter(
+    "events_emitted_total", "Lifecycle events emitted", ["type"])
+SSE_SUBSCRIBERS = REGISTRY.gauge(
+    "sse_subscribers", "Open /api/events streams")
+EVENT_QUEUE_DEPTH = REGISTRY.gauge(
+    "event_queue_depth", "Lifecycle events buffered for SSE clients",
+    func=lambda: len(lifecycle_events))
+LOG_QUEUE_DEPTH = REGISTRY.gauge(
+    "log_queue_depth", "Log records waiting for the log writer thread",
+    func=log_sink.depth)
 
 # ==============================================================================
 # LIFECYCLE EVENT SYSTEM
@@ -186,105 +246,409 @@ vote_stats = defaultdict(int)
 
 def emit_event(event_type, container_name, details=None):
     """Emit lifecycle event for visualization"""
-    event = {
-        "timestamp": datetime.now().isoformat(),
-        "type": event_type,
-        "container": container_name,
-        "details": details or {},
-        "id": str(uuid.uuid4())[:8]
-    }
+    with TRACER.span("emit_event"):
+        _emit_event(event_type, container_name, details)
 
+def _emit_event(event_type, container_name, details):
+    event = shared_state.make_event(event_type, container_name, details)
+
+    # Local mode: straight into our buffer. Shared mode: to every worker.
+    STATE.publish(event)
+
+    EVENTS_EMITTED.labels(event_type).inc()
+
+    if event_logger.isEnabledFor(EVENT_LOG_LEVEL):
+        event_logger.log(
+            EVENT_LOG_LEVEL, "📡 EVENT: %s | %s | %s", event_type, container_name, details,
+            extra={"event": event}
+        )
+
+def _buffer_event(event):
+    """Append an event to this process's SSE buffer"""
     with event_lock:
         lifecycle_events.append(event)
         # Keep only last 50 events
         if len(lifecycle_events) > 50:
             lifecycle_events.pop(0)
+    VOTE_RATES.record_event(event)
+
+def _clear_event_buffer():
+    with event_lock:
+        lifecycle_events.clear()
+    VOTE_RATES.clear()
+
+def _attach_containers(containers):
+    """Multi-worker mode: mirror the endpoints the supervisor publishes"""
+    global postgres_container, redis_container
+    attached = postgres_container is None and containers.get("postgres") is not None
+    postgres_container = containers.get("postgres")
+    redis_container = containers.get("redis")
+    if attached:
+        # Off the listener thread: each worker keeps its own rate history
+        threading.Thread(target=seed_vote_rates, args=(postgres_container,), daemon=True).start()
+        start_leaderboard()
+
+STATE.start(_buffer_event, on_containers=_attach_containers, on_clear=_clear_event_buffer)
+
+# Events from other processes (test runs, scripts) via Postgres NOTIFY.
+# Multi-worker mode: the supervisor runs the one listener instead.
+event_listener = None
+
+def start_event_listener(container):
+    """Relay events other processes NOTIFY on the show's Postgres"""
+    global event_listener
+    if event_listener is None and not STATE.shared:
+        # Resolved on every (re)connect: follows Postgres when the container is replaced
+        event_listener = event_bus.Listener(lambda: postgres_conninfo(postgres_container or container),
+                                            _relay_bus_event)
+        event_listener.start()
+
+def _relay_bus_event(event):
+    EVENTS_EMITTED.labels(event["type"]).inc()
+    STATE.publish(event)
+
+# Real container lifecycle from the Docker daemon (tests, workshop, Ryuk...)
+docker_subscriber = None
+
+def start_docker_events():
+    """Stream TestContainers create/start/health/die/destroy into the dashboard"""
+    global docker_subscriber
+    if os.getenv("DOCKER_EVENTS", "1") == "0" or STATE.shared:
+        return
+    if docker_subscriber is None:
+        docker_subscriber = docker_events.Subscriber(emit_event).start()
+
+# CPU / memory / I/O of the containers we own, from the Docker stats stream
+TELEMETRY = telemetry.Sampler(
+    interval=float(os.getenv("TELEMETRY_INTERVAL", "2")),
+    event_interval=float(os.getenv("TELEMETRY_EVENT_INTERVAL", "10")),
+    on_event=emit_event,
+)
+
+# Routes reads to the replica while it is within REPLICA_MAX_LAG of the primary
+READ_REPLICA = replica.LagMonitor(
+    max_lag=float(os.getenv("REPLICA_MAX_LAG", "2")),
+    interval=float(os.getenv("REPLICA_CHECK_INTERVAL", "0.5")),
+    event_interval=float(os.getenv("REPLICA_EVENT_INTERVAL", "10")),
+    on_event=emit_event,
+)
+REPLICA_STALENESS = REGISTRY.gauge(
+    "replica_staleness_seconds", "How far reads on the replica may lag the primary (-1 = unknown or no replica)",
+    func=lambda: READ_REPLICA.staleness if READ_REPLICA.staleness is not None else -1)
+
+def track_resources(name, container):
+    """Sample a container we just started (multi-worker: the supervisor does)"""
+    if STATE.shared:
+        return
+    try:
+        TELEMETRY.track(name, container.get_wrapped_container())
+    except Exception as e:
+        logger.warning(f"Resource telemetry unavailable for {name}: {e}")
 
-    print(f"📡 EVENT: {event_type} | {container_name} | {details}")
+def event_bus_env():
+    """Environment for child processes so they can publish events"""
+    env = dict(os.environ)
+    if postgres_container is not None:
+        env[event_bus.DSN_ENV] = psycopg.conninfo.make_conninfo(**postgres_conninfo(postgres_container))
+    return env
 
 # ==============================================================================
 # CONTAINER MANAGEMENT
 # ==============================================================================
 
+def postgres_conninfo(container):
+    """psycopg connection arguments for a running Postgres container"""
+    return {
+        "host": container.get_container_host_ip(),
+        "port": container.get_exposed_port(5432),
+        "user": container.username,
+        "password": container.password,
+        "dbname": container.dbname,
+    }
+
 def get_postgres_container():
     """Get or create PostgreSQL container with lifecycle events and error handling"""
     global postgres_container
 
+    if postgres_container is None and STATE.shared:
+        # Workers never own containers - ask the supervisor
+        STATE.request("start_postgres")
+        if postgres_container is None:
+            raise RuntimeError("Supervisor did not publish a PostgreSQL container")
+
     if postgres_container is None:
-        try:
-            emit_event("starting", "postgres", {"image": "postgres:15-alpine"})
-            logger.info("Starting PostgreSQL container...")
-            start_time = time.time()
+        # The pre-start thread and early votes may race here: start it once
+        with postgres_start_lock:
+            if postgres_container is not None:
+                return postgres_container
+            try:
+                from testcontainers.postgres import PostgresContainer
 
-            postgres_container = PostgresContainer("postgres:15-alpine")
-            postgres_container.start()
+                emit_event("starting", "postgres", {"image": "postgres:15-alpine"})
+                logger.info("Starting PostgreSQL container...")
+                start_time = time.time()
 
-            startup_time = time.time() - start_time
-            logger.info(f"PostgreSQL container started in {startup_time:.1f}s")
+                # Extra shards start alongside: each one is a full container start
+                shard_start = None
+                if SHARD_COUNT > 1 and not STATE.shared:
+                    starter = ThreadPoolExecutor(max_workers=1)
+                    shard_start = starter.submit(start_shards, SHARD_COUNT)
+                    starter.shutdown(wait=False)
 
-            emit_event("ready", "postgres", {
-                "startup_time": f"{startup_time:.1f}s",
-                "port": postgres_container.get_exposed_port(5432)
-            })
+                container = PostgresContainer("postgres:15-alpine")
+                try:
+                    container.start()
+                except Exception:
+                    discard_started_shards(shard_start)
+                    raise
 
-            # Initialize schema with error handling
-            try:
-                conn = psycopg.connect(
-                    host=postgres_container.get_container_host_ip(),
-                    port=postgres_container.get_exposed_port(5432),
-                    user=postgres_container.username,
-                    password=postgres_container.password,
-                    dbname=postgres_container.dbname,
-                    connect_timeout=10
-                )
-                cur = conn.cursor()
-
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS votes (
-                        id SERIAL PRIMARY KEY,
-                        user_id VARCHAR(100) UNIQUE NOT NULL,
-                        choice VARCHAR(50) NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                """)
-
-                conn.commit()
-                cur.close()
-                conn.close()
-                logger.info("PostgreSQL schema initialized")
-                emit_event("initialized", "postgres", {"schema": "votes table created"})
+                startup_time = time.time() - start_time
+                CONTAINER_START.labels("postgres").observe(startup_time)
+                logger.info(f"PostgreSQL container started in {startup_time:.1f}s")
+
+                emit_event("ready", "postgres", {
+                    "startup_time": f"{startup_time:.1f}s",
+                    "port": container.get_exposed_port(5432)
+                })
+
+                # Initialize schema with error handling
+                try:
+                    conn = psycopg.connect(**postgres_conninfo(container), connect_timeout=10)
+
+                    with DB_QUERY_LATENCY.labels("create_schema").time():
+                        partitions = schema.init_schema(conn)
+
+                    conn.close()
+                    logger.info(f"PostgreSQL schema initialized ({partitions or 'no'} votes partitions)")
+                    emit_event("initialized", "postgres", {"schema": "votes table created", "partitions": partitions})
+                    if shard_start is not None:
+                        shard_containers[:] = shard_start.result()
+                    seed_voter_cache(container)
+                    seed_vote_rates(container)
+                    start_event_listener(container)
+                    track_resources("postgres", container)
+                    if REPLICA_ENABLED and SHARD_COUNT == 1 and not STATE.shared:
+                        # Reads use the primary until the replica has caught up
+                        threading.Thread(target=start_read_replica, args=(container,),
+                                         name="replica-start", daemon=True).start()
+                    elif REPLICA_ENABLED and SHARD_COUNT > 1:
+                        logger.warning("REPLICA=1 is ignored with SHARDS > 1: reads fan out over the shards")
+
+                except Exception as e:
+                    logger.error(f"Failed to initialize PostgreSQL schema: {e}")
+                    emit_event("error", "postgres", {"error": str(e)})
+                    container.stop()
+                    discard_started_shards(shard_start)
+                    raise
+
+                # Published only once usable: callers outside the lock never see a half-started container
+                postgres_container = container
 
             except Exception as e:
-                logger.error(f"Failed to initialize PostgreSQL schema: {e}")
+                logger.error(f"Failed to start PostgreSQL container: {e}")
                 emit_event("error", "postgres", {"error": str(e)})
-                if postgres_container:
-                    postgres_container.stop()
-                postgres_container = None
-                raise
-
-        except Exception as e:
-            logger.error(f"Failed to start PostgreSQL container: {e}")
-            emit_event("error", "postgres", {"error": str(e)})
-            postgres_container = None
-            raise RuntimeError(
-                f"Could not start PostgreSQL container: {e}\n"
-                "Check Docker is running and has enough resources."
-            )
+                raise RuntimeError(
+                    f"Could not start PostgreSQL container: {e}\n"
+                    "Check Docker is running and has enough resources."
+                )
 
     return postgres_container
 
+def seed_voter_cache(container):
+    """Known voters from the votes table (multi-worker: the supervisor seeds)"""
+    if not VOTER_CACHE or STATE.shared:
+        return
+    # seed_voters() replaces the set: every shard's voters in one call
+    count = STATE.seed_voters(shards.voter_ids(shard_pools(container)))
+    logger.info(f"Voter cache seeded with {count} voter(s)")
+
+def seed_vote_rates(container):
+    """Recent ingest history from created_at, so the rate charts survive a restart"""
+    try:
+        count = 0
+        for pool in shard_pools(container):
+            with pool.connection() as conn:
+                count += VOTE_RATES.seed(db.vote_ages(conn, rates.HISTORY_SECONDS))
+        logger.info(f"Vote rates seeded with {count} recent vote(s)")
+    except Exception as e:
+        # Only the charts' history is missing; live counting still works
+        logger.warning(f"Could not seed vote rates: {e}")
+
+def prestart_postgres():
+    """Start Postgres in the background so the server can accept connections meanwhile"""
+    def run():
+        try:
+            get_postgres_container()
+        except RuntimeError:
+            pass  # already logged and on the event stream; the first vote retries
+    threading.Thread(target=run, name="postgres-prestart", daemon=True).start()
+
+def db_pool(container):
+    """Pooled connections (prepared statements live as long as they do) for this container"""
+    global _db_pool
+    pool_container, pool = _db_pool
+    if pool_container is container:
+        return pool
+    with _db_pool_lock:
+        if _db_pool[0] is not container:
+            if _db_pool[1] is not None:
+                _db_pool[1].close()
+            _db_pool = (container, db.ConnectionPool(postgres_conninfo(container)))
+        return _db_pool[1]
+
+def start_shards(count):
+    """Shards 1..count-1 with their schema, started in parallel (shard 0 is the show's container)"""
+    from testcontainers.postgres import PostgresContainer
+
+    def start(index):
+        name = f"shard-{index}"
+        emit_event("starting", name, {"image": "postgres:15-alpine", "shard": index, "of": count})
+        start_time = time.time()
+        container = PostgresContainer("postgres:15-alpine")
+        container.start()
+        try:
+            with psycopg.connect(**postgres_conninfo(container), connect_timeout=10) as conn:
+                schema.init_schema(conn)
+        except Exception:
+            container.stop()
+            raise
+        startup_time = time.time() - start_time
+        CONTAINER_START.labels("postgres").observe(startup_time)
+        emit_event("ready", name, {"startup_time": f"{startup_time:.1f}s", "port": container.get_exposed_port(5432)})
+        track_resources(name, container)
+        return container
+
+    with ThreadPoolExecutor(max_workers=count - 1) as executor:
+        futures = [executor.submit(start, index) for index in range(1, count)]
+    failed = [f.exception() for f in futures if f.exception() is not None]
+    if failed:
+        for f in futures:
+            if f.exception() is None:
+                f.result().stop()
+        raise RuntimeError(f"{len(failed)} of {count - 1} extra shard(s) failed to start: {failed[0]}")
+    logger.info(f"{count} PostgreSQL shards ready")
+    return [f.result() for f in futures]
+
+def discard_started_shards(shard_start):
+    """The primary failed: stop the shards start_shards() brought up alongside it"""
+    if shard_start is None or shard_start.exception() is not None:
+        return  # nothing started, or start_shards() already stopped its own
+    for shard in shard_start.result():
+        shard.stop()
+    shard_containers.clear()
+
+def stop_shards():
+    """Stop shards 1..N-1 and close every shard pool (shard 0 is the caller's to stop)"""
+    global _shard_set
+    if _shard_set[1] is not None:
+        _shard_set[1].close()
+        _shard_set = (None, None)
+    for shard in shard_containers:
+        shard.stop()
+    shard_containers.clear()
+
+def shard_set(container):
+    """ShardSet over shard 0 (`container`) and shard_containers; None when there is one shard"""
+    global _shard_set
+    if not shard_containers:
+        return None
+    if _shard_set[0] is not container:
+        with _db_pool_lock:
+            if _shard_set[0] is not container:
+                pools = [db.ConnectionPool(postgres_conninfo(c)) for c in [container, *shard_containers]]
+                _shard_set = (container, shards.ShardSet(pools))
+    return _shard_set[1]
+
+def shard_pools(container):
+    """Every shard's pool, shard 0 first (just db_pool(container) when unsharded)"""
+    sharded = shard_set(container)
+    return sharded.pools if sharded else [db_pool(container)]
+
+def vote_pool(container, user_id):
+    """The pool of the shard that owns user_id's votes"""
+    sharded = shard_set(container)
+    return sharded.pool_for(user_id) if sharded else db_pool(container)
+
+def start_read_replica(container):
+    """Clone the primary into a streaming replica and hand it to READ_REPLICA"""
+    global replica_container
+    emit_event("starting", "replica", {"image": replica.REPLICA_IMAGE, "streams_from": "postgres"})
+    logger.info("Starting PostgreSQL read replica...")
+    start_time = time.time()
+    started = None
+    try:
+        with psycopg.connect(**postgres_conninfo(container), autocommit=True) as conn:
+            replica.allow_replication(container, conn)
+        started = replica.start_replica(container)
+        conninfo = dict(postgres_conninfo(container), host=started.get_container_host_ip(),
+                        port=started.get_exposed_port(5432))
+        replica.wait_until_standby(lambda: psycopg.connect(**conninfo, connect_timeout=5))
+    except Exception as e:
+        logger.error(f"Read replica unavailable, reads stay on the primary: {e}")
+        emit_event("error", "replica", {"error": str(e)})
+        if started is not None:
+            started.stop()
+        return
+
+    startup_time = time.time() - start_time
+    CONTAINER_START.labels("replica").observe(startup_time)
+    logger.info(f"Read replica streaming in {startup_time:.1f}s")
+    replica_container = started
+    emit_event("ready", "replica", {"startup_time": f"{startup_time:.1f}s", "port": conninfo["port"]})
+    track_resources("replica", started)
+    READ_REPLICA.attach(db_pool(container), db.ConnectionPool(conninfo), conninfo)
+
+def read_query(container, query, retry_if=None):
+    """
+    query(conn) for a read-only endpoint: on the replica while it is fresh
+    enough, else on the primary. Also on the primary if the replica fails,
+    or if retry_if(result) (e.g. a poll the replica hasn't replayed yet).
+    """
+    pool = READ_REPLICA.pool
+    if pool is not None and READ_REPLICA.use_replica():
+        try:
+            with pool.connection() as conn:
+                result = query(conn)
+            if retry_if is None or not retry_if(result):
+                DB_READS.labels("replica").inc()
+                return result
+        except psycopg.OperationalError as e:
+            READ_REPLICA.mark_down(f"query failed: {e}")
+        except db.PoolExhausted:
+            pass  # replica connections all busy: the primary takes this one
+    DB_READS.labels("primary").inc()
+    with db_pool(container).connection() as conn:
+        return query(conn)
+
+def read_pool(container):
+    """Pool for a streamed read (export): the replica while it is fresh enough"""
+    pool = READ_REPLICA.pool
+    if pool is not None and READ_REPLICA.use_replica():
+        DB_READS.labels("replica").inc()
+        return pool
+    DB_READS.labels("primary").inc()
+    return db_pool(container)
+
 def get_redis_container():
     """Get or create Redis container with lifecycle events"""
     global redis_container
 
+    if redis_container is None and STATE.shared:
+        STATE.request("start_redis")
+        return redis_container
+
     if redis_container is None:
         emit_event("starting", "redis", {"image": "redis:7-alpine"})
         start_time = time.time()
 
+        from testcontainers.redis import RedisContainer
+
         redis_container = RedisContainer("redis:7-alpine")
         redis_container.start()
+        track_resources("redis", redis_container)
 
         startup_time = time.time() - start_time
+        CONTAINER_START.labels("redis").observe(startup_time)
 
         emit_event("ready", "redis", {
             "startup_time": f"{startup_time:.1f}s",
@@ -297,8 +661,13 @@ def kill_redis():
     """Kill Redis container (chaos injection)"""
     global redis_container
 
+    if STATE.shared:
+        STATE.request("kill_redis")
+        return
+
     if redis_container:
         emit_event("chaos", "redis", {"action": "killed"})
+        TELEMETRY.untrack("redis")
         redis_container.stop()
         redis_container = None
         emit_event("terminated", "redis", {"reason": "chaos injection"})
@@ -308,6 +677,82 @@ def restore_redis():
     emit_event("recovering", "redis", {"action": "restart"})
     get_redis_container()
     emit_event("recovered", "redis", {"status": "back online"})
+    if LEADERBOARD_ENABLED:
+        # The new Redis has no boards: rebuild them now rather than on the next stats read
+        try:
+            reconcile_leaderboard("redis restarted")
+        except Exception as e:
+            logger.warning(f"Leaderboard rebuild after restart failed (stats rebuild it lazily): {e}")
+
+def shutdown_engine(sse_drain_timeout=2.0):
+    """
+    Orderly stop requested over the control channel (cleanup.py):
+    drain SSE clients, stop background threads, stop containers in
+    parallel, flush logs. Returns a summary with per-step timings.
+    """
+    global postgres_container, redis_container, replica_container
+    timings = {}
+
+    step = time.perf_counter()
+    emit_event("shutdown", "system", {"reason": "cleanup requested"})
+    SHUTTING_DOWN.set()
+    deadline = time.time() + sse_drain_timeout
+    while SSE_SUBSCRIBERS.value > 0 and time.time() < deadline:
+        time.sleep(0.05)
+    sse_left = int(SSE_SUBSCRIBERS.value)
+    timings["drain_sse"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    for name in TELEMETRY.tracking():
+        TELEMETRY.untrack(name)
+    for worker in (docker_subscriber, event_listener, RANK_FEED):
+        if worker is not None:
+            worker.stop(timeout=2)
+    replica_pool = READ_REPLICA.pool
+    READ_REPLICA.detach()
+    for pool in (replica_pool, _db_pool[1]):
+        if pool is not None:
+            pool.close()
+    if _shard_set[1] is not None:
+        _shard_set[1].close()
+    timings["stop_background"] = time.perf_counter() - step
+
+    # Multi-worker: containers belong to the supervisor
+    step = time.perf_counter()
+    owned = {}
+    if not STATE.shared:
+        owned = {name: c for name, c in (("postgres", postgres_container), ("redis", redis_container),
+                                         ("replica", replica_container)) if c}
+        owned.update((f"shard-{index}", c) for index, c in enumerate(shard_containers, 1))
+    errors = {}
+    if owned:
+        with ThreadPoolExecutor(max_workers=len(owned)) as pool:
+            futures = {name: pool.submit(container.stop) for name, container in owned.items()}
+        for name, future in futures.items():
+            if future.exception():
+                errors[name] = str(future.exception())
+        postgres_container = redis_container = replica_container = None
+        shard_containers.clear()
+    timings["stop_containers"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    log_sink.stop()
+    timings["flush_logs"] = time.perf_counter() - step
+
+    return {
+        "sse_clients_left": sse_left,
+        "containers_stopped": sorted(set(owned) - set(errors)),
+        "container_errors": errors,
+        "timings": {k: round(v, 3) for k, v in timings.items()},
+    }
+
+def start_control_channel(app_name):
+    """Register this process so cleanup.py can shut it down properly"""
+    try:
+        return control.ControlServer(app_name, shutdown_engine, http_port=5001).start()
+    except OSError as e:
+        logger.warning(f"Control channel unavailable: {e}")
+        return None
 
 # ==============================================================================
 # RATE LIMITING
@@ -315,11 +760,13 @@ def restore_redis():
 
 def check_rate_limit(user_id):
     """Check if user is rate-limited (if enabled)"""
-    if not RATE_LIMIT_ENABLED:
+    if not rate_limit_enabled():
+        RATE_LIMIT_DECISIONS.labels("disabled").inc()
         return False, None
 
     if not redis_container:
         # Redis not available - graceful degradation
+        RATE_LIMIT_DECISIONS.labels("degraded").inc()
         return False, "Redis unavailable (graceful degradation)"
 
     try:
@@ -331,25 +778,227 @@ def check_rate_limit(user_id):
 
         # Check rate limit: max 3 requests per minute
         key = f"ratelimit:{user_id}"
-        count = r.incr(key)
+        with REDIS_LATENCY.labels("incr").time():
+            count = r.incr(key)
 
         if count == 1:
-            r.expire(key, 60)  # 1 minute window
+            with REDIS_LATENCY.labels("expire").time():
+                r.expire(key, 60)  # 1 minute window
 
         if count > 3:
+            RATE_LIMIT_DECISIONS.labels("limited").inc()
             emit_event("rate_limited", "redis", {
                 "user_id": user_id[:8],
                 "count": count
             })
             return True, f"Rate limited: {count}/3 requests in 1 minute"
 
+        RATE_LIMIT_DECISIONS.labels("allowed").inc()
         return False, None
 
     except Exception as e:
         # Redis error - graceful degradation
+        RATE_LIMIT_DECISIONS.labels("degraded").inc()
         emit_event("error", "redis", {"error": str(e)})
         return False, f"Redis error (graceful fallback): {str(e)}"
 
+# ==============================================================================
+# LEADERBOARD (Redis sorted sets, LEADERBOARD=1)
+# ==============================================================================
+
+def get_leaderboard():
+    """The boards in the show's Redis; None when disabled or Redis is down"""
+    global _leaderboard
+    container = redis_container
+    if not LEADERBOARD_ENABLED or container is None:
+        return None
+    if _leaderboard[0] is not container:
+        client = redis.Redis(
+            host=container.get_container_host_ip(),
+            port=container.get_exposed_port(6379),
+            decode_responses=True,
+            socket_timeout=2
+        )
+        _leaderboard = (container, leaderboard.Leaderboard(client))
+    return _leaderboard[1]
+
+def leaderboard_client():
+    board = get_leaderboard()
+    return board.client if board else None
+
+# Rank changes from every process (pub/sub), pushed on /api/events
+RANK_FEED = leaderboard.RankFeed(leaderboard_client)
+leaderboard_reconciler = None
+
+def start_leaderboard():
+    """Redis (in the background), the rank-change feed and periodic reconciliation"""
+    global leaderboard_reconciler
+    if not LEADERBOARD_ENABLED or leaderboard_reconciler is not None:
+        return
+    threading.Thread(target=get_redis_container, name="redis-prestart", daemon=True).start()
+    RANK_FEED.start()
+
+    def run():
+        while not SHUTTING_DOWN.wait(LEADERBOARD_RECONCILE_INTERVAL):
+            try:
+                board = get_leaderboard()
+                # Multi-worker: one worker per interval does it
+                if board is not None and board.claim_reconcile(LEADERBOARD_RECONCILE_INTERVAL * 0.9):
+                    reconcile_leaderboard("periodic")
+            except Exception as e:
+                logger.warning(f"Leaderboard reconciliation failed: {e}")
+
+    leaderboard_reconciler = threading.Thread(target=run, name="leaderboard-reconcile", daemon=True)
+    leaderboard_reconciler.start()
+
+def shard_tallies(container, poll_id):
+    """[tally rows] of the primary or of every shard, shard 0 first - never the replica; None if there is no such poll"""
+    sharded = shard_set(container)
+    if sharded:
+        per_shard = sharded.map(lambda conn: db.fetch_stats(conn, poll_id)[0])
+        if not any(per_shard) and shards.get_poll(sharded, poll_id) is None:
+            return None
+        return per_shard
+    with db_pool(container).connection() as conn:
+        found = poll_stats(conn, poll_id)
+    return None if found is None else [found[0]]
+
+def authoritative_stats(container, poll_id):
+    """(rows, total) from the primary or every shard - never the replica; None if there is no such poll"""
+    per_shard = shard_tallies(container, poll_id)
+    return None if per_shard is None else shards.merge_tallies((rows, None) for rows in per_shard)
+
+def vote_shard(container, user_id):
+    """Index of the shard that owns user_id's votes (0 when unsharded)"""
+    sharded = shard_set(container)
+    return shards.shard_index(user_id, len(sharded)) if sharded else 0
+
+def leaderboard_epoch():
+    """The board's epoch to vote under, or None (no leaderboard: don't read the tally back)"""
+    board = get_leaderboard()
+    if board is None:
+        return None
+    try:
+        return board.epoch()
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard unavailable: {e}")
+        return None
+
+def record_on_leaderboard(poll_id, choice, shard, tally, epoch):
+    """Raise the board to a committed vote's tally; Redis trouble only costs the board, never the vote"""
+    board = get_leaderboard()
+    if board is None:
+        return
+    try:
+        with REDIS_LATENCY.labels("leaderboard_record").time():
+            board.record(poll_id, choice, shard, tally, epoch)
+    except Exception as e:
+        logger.warning(f"Leaderboard update failed: {e}")
+        try:
+            board.invalidate(poll_id)  # rebuilt from Postgres on the next read
+        except Exception:
+            pass
+
+def leaderboard_stats(container, poll_id):
+    """
+    (rows, total) from the poll's board, rebuilt from Postgres first if it
+    isn't loaded. None when the board can't answer (disabled, Redis down,
+    no such poll): read Postgres as usual.
+    """
+    board = get_leaderboard()
+    if board is None:
+        return None
+    try:
+        with REDIS_LATENCY.labels("leaderboard_read").time():
+            found = board.standings(poll_id)
+        if found is None:
+            epoch = board.epoch()
+            per_shard = shard_tallies(container, poll_id)
+            if per_shard is None:
+                return None
+            board.load(poll_id, per_shard, epoch)
+            found = shards.merge_tallies((rows, None) for rows in per_shard)
+    except redis.RedisError as e:
+        logger.warning(f"Leaderboard unavailable, reading Postgres: {e}")
+        return None
+    return found
+
+def reconcile_leaderboard(reason):
+    """
+    Load each poll's board from Postgres: build the missing ones, raise the
+    rest by any votes they missed. None if there is nothing to do.
+    """
+    board = get_leaderboard()
+    container = postgres_container
+    if board is None or container is None:
+        return None
+
+    sharded = shard_set(container)
+    if sharded:
+        polls = shards.list_polls(sharded)
+    else:
+        with db_pool(container).connection() as conn:
+            polls = db.list_polls(conn)
+
+    loaded, corrected = [], {}
+    for poll in polls:
+        # The epoch before Postgres: a reset while we read makes the load a no-op
+        epoch = board.epoch()
+        per_shard = shard_tallies(container, poll["id"])
+        result = None if per_shard is None else board.load(poll["id"], per_shard, epoch)
+        if result is None:
+            continue
+        was_loaded, missing = result
+        if not was_loaded:
+            loaded.append(poll["id"])
+        elif missing:
+            corrected[poll["id"]] = missing
+    LEADERBOARD_CORRECTIONS.inc(sum(corrected.values()))
+    if loaded or corrected:
+        emit_event("leaderboard_reconciled", "redis", {"reason": reason, "loaded": loaded, "corrected": corrected})
+    return {"loaded": loaded, "corrected": corrected}
+
+def clear_leaderboard():
+    """After the votes are deleted: every board is rebuilt (empty) on its next read, votes cast before are refused"""
+    board = get_leaderboard()
+    if board is None:
+        return
+    try:
+        board.clear()
+    except redis.RedisError as e:
+        logger.warning(f"Could not clear the leaderboard: {e}")
+
+# ==============================================================================
+# REQUEST INSTRUMENTATION
+# ==============================================================================
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started (for latency histograms)"""
+    g.request_start = time.perf_counter()
+
+    route = request.url_rule.rule if request.url_rule else None
+    if route and route not in UNTRACED_ROUTES:
+        TRACER.start(route, method=request.method)
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and observe its latency, labelled by route template"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_LATENCY.labels(route).observe(time.perf_counter() - start)
+        HTTP_REQUESTS.labels(route, request.method, response.status_code).inc()
+    TRACER.finish(status=response.status_code)
+    return response
+
+@app.errorhandler(db.PoolExhausted)
+def pool_exhausted(e):
+    """Every pooled Postgres connection is busy: shed the request instead of opening more"""
+    DB_POOL_EXHAUSTED.inc()
+    logger.warning(f"Shedding {request.path}: {e}")
+    return jsonify({"status": "busy", "message": "Database busy, try again"}), 503
+
 # ==============================================================================
 # ROUTES
 # ==============================================================================
@@ -379,12 +1028,15 @@ def qr_page():
     return render_template('qr_vote.html')
 
 @app.route('/api/vote', methods=['POST'])
-def vote():
+@app.route('/api/polls/<int:poll_id>/vote', methods=['POST'])
+def vote(poll_id=schema.DEFAULT_POLL_ID):
     """
     Handle votes with:
     - Real database constraints (Postgres)
     - Rate limiting (Redis, if enabled)
     - Lifecycle events
+
+    /api/vote is the show's own poll; /api/polls/<id>/vote any other.
     """
     data = request.json
     choice = data.get('choice')
@@ -401,7 +1053,8 @@ def vote():
         }), 400
 
     # Check rate limit (if enabled)
-    is_limited, limit_msg = check_rate_limit(user_id)
+    with TRACER.span("check_rate_limit"):
+        is_limited, limit_msg = check_rate_limit(user_id)
     if is_limited:
         return jsonify({
             "status": "rate_limited",
@@ -410,36 +1063,53 @@ def vote():
             "learning": "This is Redis enforcing rate limits - testable with TestContainers!"
         }), 429
 
-    # Get PostgreSQL container
-    container = get_postgres_container()
-
     emit_event("vote_attempt", "postgres", {
         "user_id": user_id[:8],
-        "choice": choice
+        "choice": choice,
+        "poll_id": poll_id
     })
 
-    conn = psycopg.connect(
-        host=container.get_container_host_ip(),
-        port=container.get_exposed_port(5432),
-        user=container.username,
-        password=container.password,
-        dbname=container.dbname
-    )
-    cur = conn.cursor()
+    # A known voter is a definite duplicate; anyone else goes to Postgres
+    voter = db.voter_key(poll_id, user_id)
+    with TRACER.span("voter_cache"):
+        known, voters_epoch = STATE.voter_status(voter) if VOTER_CACHE else (False, None)
+    if known:
+        return jsonify(duplicate_vote(user_id, choice, "voter_cache")), 400
 
-    try:
-        cur.execute(
-            "INSERT INTO votes (user_id, choice) VALUES (%s, %s)",
-            (user_id, choice)
-        )
-        conn.commit()
+    # Get PostgreSQL container
+    with TRACER.span("get_postgres_container"):
+        container = get_postgres_container()
 
-        vote_stats[choice] += 1
+    # LEADERBOARD=1: the epoch before the INSERT, the tally back with it
+    with TRACER.span("leaderboard_epoch"):
+        epoch = leaderboard_epoch()
+
+    try:
+        with TRACER.span("insert"), DB_QUERY_LATENCY.labels("insert_vote").time():
+            with vote_pool(container, user_id).connection() as conn:
+                if epoch is None:
+                    recorded = db.insert_vote(conn, user_id, choice, poll_id)
+                else:
+                    tally = db.insert_counted_vote(conn, user_id, choice, poll_id)
+                    recorded = tally is not None
+                # Rare: closed or unknown poll, or a choice it doesn't offer
+                poll = None if recorded else db.get_poll(conn, poll_id)
+        if not recorded:
+            status, message = db.poll_rejection(poll, choice)
+            return jsonify({"status": "error", "message": message}), status
+        if VOTER_CACHE:
+            STATE.mark_voted(voter, voters_epoch)
+
+        total_votes = STATE.record_vote(choice, poll_id)
+        if epoch is not None:
+            with TRACER.span("leaderboard"):
+                record_on_leaderboard(poll_id, choice, vote_shard(container, user_id), tally, epoch)
 
         emit_event("vote_success", "postgres", {
             "user_id": user_id[:8],
             "choice": choice,
-            "total_votes": sum(vote_stats.values())
+            "poll_id": poll_id,
+            "total_votes": total_votes
         })
 
         return jsonify({
@@ -451,77 +1121,257 @@ def vote():
         })
 
     except IntegrityError:
-        conn.rollback()
+        if VOTER_CACHE:
+            STATE.mark_voted(voter, voters_epoch)
+        return jsonify(duplicate_vote(user_id, choice, "postgres")), 400
+
+def duplicate_vote(user_id, choice, source):
+    """Event, metric and response body for a repeat vote (source: postgres or voter_cache)"""
+    DUPLICATE_VOTES.labels(source).inc()
+    emit_event("vote_blocked", "postgres", {
+        "user_id": user_id[:8],
+        "choice": choice,
+        "reason": "UNIQUE constraint",
+        "caught_by": source
+    })
 
-        emit_event("vote_blocked", "postgres", {
-            "user_id": user_id[:8],
-            "choice": choice,
-            "reason": "UNIQUE constraint"
-        })
+    if source == "postgres":
+        detail = "Real database UNIQUE constraint prevented duplicate"
+    else:
+        detail = "Postgres already holds your vote (UNIQUE constraint) - answered without asking it again"
+    return {
+        "status": "duplicate",
+        "message": "🎯 You already voted!",
+        "detail": detail,
+        "magic_moment": "This is TestContainers magic!",
+        "learning": "Mocks would have allowed this. Reality didn't.",
+        "demo_note": "Open in incognito to vote as a different user"
+    }
+
+def poll_stats(conn, poll_id):
+    """db.fetch_stats(), or None if there is no such poll"""
+    rows, total = db.fetch_stats(conn, poll_id)
+    if not rows and db.get_poll(conn, poll_id) is None:
+        return None
+    return rows, total
 
+@app.route('/api/stats')
+@app.route('/api/polls/<int:poll_id>/stats')
+def stats(poll_id=schema.DEFAULT_POLL_ID):
+    """Get voting statistics (leaderboard) for the show's poll or any other"""
+    with TRACER.span("get_postgres_container"):
+        container = get_postgres_container()
+
+    # The poll's running tallies: a few rows, however many votes
+    # LEADERBOARD=1: one Redis round trip instead
+    with TRACER.span("leaderboard"):
+        found = leaderboard_stats(container, poll_id)
+    if found is not None:
+        STATS_READS.labels("leaderboard").inc()
+    else:
+        STATS_READS.labels("postgres").inc()
+        with TRACER.span("query"), DB_QUERY_LATENCY.labels("stats").time():
+            sharded = shard_set(container)
+            if sharded:
+                # Every shard's tallies in parallel, summed
+                found = authoritative_stats(container, poll_id)
+            else:
+                found = read_query(container, lambda conn: poll_stats(conn, poll_id), retry_if=lambda r: r is None)
+    if found is None:
+        return jsonify({"status": "error", "message": "No such poll"}), 404
+    rows, total = found
+    results = [{"choice": choice, "count": count} for choice, count in rows]
+
+    return jsonify({
+        "poll_id": poll_id,
+        "results": results,
+        "total_votes": total,
+        "rate_limit_enabled": rate_limit_enabled(),
+        "chaos_mode": chaos_mode()
+    })
+
+# ==============================================================================
+# POLLS
+# ==============================================================================
+
+@app.route('/api/polls', methods=['GET'])
+def list_polls():
+    """Every poll with its status and vote total"""
+    container = get_postgres_container()
+    sharded = shard_set(container)
+    return jsonify({"polls": shards.list_polls(sharded) if sharded else read_query(container, db.list_polls)})
+
+@app.route('/api/polls', methods=['POST'])
+def create_poll():
+    """New poll: {"question": ..., "choices": [...]} (no choices = any choice)"""
+    data = request.get_json(silent=True) or {}
+    question = (data.get('question') or '').strip()
+    choices = data.get('choices') or []
+    if not question or not isinstance(choices, list) or not all(isinstance(c, str) and c for c in choices):
         return jsonify({
-            "status": "duplicate",
-            "message": "🎯 You already voted!",
-            "detail": "Real database UNIQUE constraint prevented duplicate",
-            "magic_moment": "This is TestContainers magic!",
-            "learning": "Mocks would have allowed this. Reality didn't.",
-            "demo_note": "Open in incognito to vote as a different user"
+            "status": "error",
+            "message": "Expected {\"question\": \"...\", \"choices\": [\"...\", ...]}"
         }), 400
 
-    finally:
-        cur.close()
-        conn.close()
+    container = get_postgres_container()
+    sharded = shard_set(container)
+    if sharded:
+        poll = shards.create_poll(sharded, question, choices)
+    else:
+        with db_pool(container).connection() as conn:
+            poll = db.create_poll(conn, question, choices)
+    emit_event("poll_created", "postgres", {"poll_id": poll["id"], "question": question})
+    return jsonify(poll), 201
+
+@app.route('/api/polls/<int:poll_id>')
+def poll_detail(poll_id):
+    """One poll with its current results"""
+    def query(conn):
+        poll = db.get_poll(conn, poll_id)
+        return poll, (db.fetch_stats(conn, poll_id) if poll else None)
 
-@app.route('/api/stats')
-def stats():
-    """Get voting statistics (leaderboard)"""
     container = get_postgres_container()
+    sharded = shard_set(container)
+    if sharded:
+        poll = shards.get_poll(sharded, poll_id)
+        found = shards.fetch_stats(sharded, poll_id) if poll else None
+    else:
+        poll, found = read_query(container, query, retry_if=lambda r: r[0] is None)
+    if poll is None:
+        return jsonify({"status": "error", "message": "No such poll"}), 404
+    rows, total = found
+    poll["results"] = [{"choice": choice, "count": count} for choice, count in rows]
+    poll["total_votes"] = total
+    return jsonify(poll)
+
+@app.route('/api/polls/<int:poll_id>/close', methods=['POST'])
+def close_poll(poll_id):
+    """Stop accepting votes (presenter control); results stay readable"""
+    container = get_postgres_container()
+    sharded = shard_set(container)
+    if sharded:
+        poll = shards.close_poll(sharded, poll_id)
+    else:
+        with db_pool(container).connection() as conn:
+            poll = db.close_poll(conn, poll_id)
+    if poll is None:
+        return jsonify({"status": "error", "message": "No such poll"}), 404
+    emit_event("poll_closed", "postgres", {"poll_id": poll_id})
+    return jsonify(poll)
+
+def parse_export_args(args):
+    """(format, filters) from /api/export query args; ValueError on bad input"""
+    fmt = args.get("format", "csv")
+    if fmt not in db.EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(db.EXPORT_FORMATS)}")
+
+    filters = {"choice": args.get("choice") or None}
+    try:
+        filters["poll_id"] = int(args["poll"]) if args.get("poll") else None
+    except ValueError:
+        raise ValueError("poll must be a poll id")
+    for name in ("since", "until"):
+        value = args.get(name)
+        try:
+            filters[name] = datetime.fromisoformat(value) if value else None
+        except ValueError:
+            raise ValueError(f"{name} must be an ISO 8601 timestamp, got {value!r}")
+    return fmt, filters
 
-    conn = psycopg.connect(
-        host=container.get_container_host_ip(),
-        port=container.get_exposed_port(5432),
-        user=container.username,
-        password=container.password,
-        dbname=container.dbname
-    )
-    cur = conn.cursor()
+def export_headers(fmt):
+    return {"Content-Disposition": f"attachment; filename=votes.{fmt}"}
 
-    cur.execute("""
-        SELECT choice, COUNT(*) as count
-        FROM votes
-        GROUP BY choice
-        ORDER BY count DESC
-    """)
+@app.route('/api/export')
+def export():
+    """
+    Stream raw votes as CSV or NDJSON (chunked, constant memory).
 
-    results = [{"choice": row[0], "count": row[1]} for row in cur.fetchall()]
+    Query args: format=csv|ndjson, since/until (ISO 8601, [since, until)),
+    choice, poll.
+    """
+    try:
+        fmt, filters = parse_export_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
-    cur.execute("SELECT COUNT(*) FROM votes")
-    total = cur.fetchone()[0]
+    with TRACER.span("get_postgres_container"):
+        container = get_postgres_container()
+    # Sharded: one shard after another
+    pools = shard_pools(container) if shard_set(container) else [read_pool(container)]
 
-    cur.close()
-    conn.close()
+    def generate():
+        exported = 0
+        try:
+            yield db.export_header(fmt)
+            for pool in pools:
+                with pool.connection() as conn:
+                    for rows in db.export_batches(conn, **filters):
+                        exported += len(rows)
+                        yield db.encode_rows(rows, fmt)
+        finally:
+            # Also on client disconnect: the cursor, transaction and connection are released
+            EXPORTED_ROWS.labels(fmt).inc(exported)
+
+    return Response(generate(), content_type=db.EXPORT_FORMATS[fmt], headers=export_headers(fmt))
+
+def rates_snapshot(args):
+    """/api/rates body from its query args; ValueError on bad input"""
+    resolution = args.get("resolution", "second")
+    if resolution not in rates.RESOLUTIONS:
+        raise ValueError(f"resolution must be one of: {', '.join(rates.RESOLUTIONS)}")
+    try:
+        points = int(args.get("points", rates.LIVE_POINTS))
+    except ValueError:
+        raise ValueError("points must be an integer")
+    return VOTE_RATES.snapshot(resolution, points)
 
-    return jsonify({
-        "results": results,
-        "total_votes": total,
-        "rate_limit_enabled": RATE_LIMIT_ENABLED,
-        "chaos_mode": CHAOS_MODE
-    })
+@app.route('/api/rates')
+def vote_rates():
+    """
+    Rolling vote rates: votes, duplicates and rate_limited per bucket.
+
+    Query args: resolution=second|minute, points (buckets, newest last).
+    Also pushed every second on /api/events as `event: rates`.
+    """
+    try:
+        return jsonify(rates_snapshot(request.args))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
 @app.route('/api/events')
 def events():
     """Server-Sent Events stream for lifecycle visualization"""
     def generate():
-        last_sent = 0
-        while True:
-            with event_lock:
-                events_to_send = lifecycle_events[last_sent:]
-                last_sent = len(lifecycle_events)
-
-            for event in events_to_send:
-                yield f"data: {json.dumps(event)}\n\n"
-
-            time.sleep(0.5)
+        SSE_SUBSCRIBERS.inc()
+        try:
+            last_sent = 0
+            last_rates = None
+            last_rank = RANK_FEED.sequence
+            while True:
+                stopping = SHUTTING_DOWN.is_set()
+                with event_lock:
+                    events_to_send = lifecycle_events[last_sent:]
+                    last_sent = len(lifecycle_events)
+
+                for event in events_to_send:
+                    yield f"data: {json.dumps(event)}\n\n"
+
+                # Named events: existing onmessage handlers never see them
+                live_rates = VOTE_RATES.live_json()
+                if live_rates is not last_rates:
+                    last_rates = live_rates
+                    yield f"event: rates\ndata: {live_rates}\n\n"
+
+                last_rank, changes = RANK_FEED.since(last_rank)
+                for change in changes:
+                    yield f"event: rank_change\ndata: {change}\n\n"
+
+                if stopping:
+                    return
+                time.sleep(0.5)
+        finally:
+            # Client disconnected (GeneratorExit) or server shutting down
+            SSE_SUBSCRIBERS.dec()
 
     return Response(generate(), mimetype='text/event-stream')
 
@@ -532,11 +1382,9 @@ def events():
 @app.route('/api/control/rate-limit', methods=['POST'])
 def toggle_rate_limit():
     """Toggle rate limiting (presenter control)"""
-    global RATE_LIMIT_ENABLED
-
-    RATE_LIMIT_ENABLED = not RATE_LIMIT_ENABLED
+    enabled = STATE.toggle("rate_limit")
 
-    if RATE_LIMIT_ENABLED:
+    if enabled:
         # Ensure Redis is running
         get_redis_container()
         emit_event("feature_enabled", "redis", {"feature": "rate_limiting"})
@@ -545,52 +1393,46 @@ def toggle_rate_limit():
 
     return jsonify({
         "status": "success",
-        "rate_limit_enabled": RATE_LIMIT_ENABLED,
-        "message": "Rate limiting " + ("enabled" if RATE_LIMIT_ENABLED else "disabled")
+        "rate_limit_enabled": enabled,
+        "message": "Rate limiting " + ("enabled" if enabled else "disabled")
     })
 
 @app.route('/api/control/chaos', methods=['POST'])
 def toggle_chaos():
     """Toggle chaos mode (kill/restore Redis)"""
-    global CHAOS_MODE
+    active = STATE.toggle("chaos")
 
-    CHAOS_MODE = not CHAOS_MODE
-
-    if CHAOS_MODE:
+    if active:
         kill_redis()
     else:
         restore_redis()
 
     return jsonify({
         "status": "success",
-        "chaos_mode": CHAOS_MODE,
-        "message": "Chaos mode " + ("activated" if CHAOS_MODE else "deactivated")
+        "chaos_mode": active,
+        "message": "Chaos mode " + ("activated" if active else "deactivated")
     })
 
 @app.route('/api/control/reset', methods=['POST'])
 def reset():
     """Reset everything (presenter control)"""
-    global vote_stats, lifecycle_events
-
     container = get_postgres_container()
 
-    conn = psycopg.connect(
-        host=container.get_container_host_ip(),
-        port=container.get_exposed_port(5432),
-        user=container.username,
-        password=container.password,
-        dbname=container.dbname
-    )
-    cur = conn.cursor()
-    cur.execute("DELETE FROM votes")
-    conn.commit()
-    cur.close()
-    conn.close()
-
-    vote_stats.clear()
+    with DB_QUERY_LATENCY.labels("reset").time():
+        sharded = shard_set(container)
+        if sharded:
+            shards.delete_votes(sharded)
+        else:
+            with db_pool(container).connection() as conn:
+                db.delete_votes(conn)
+    # After the DELETE: votes that started before it can no longer be remembered
+    STATE.clear_voters()
 
-    with event_lock:
-        lifecycle_events.clear()
+    STATE.clear_tallies()
+    clear_leaderboard()
+
+    _clear_event_buffer()
+    STATE.clear_events()
 
     emit_event("reset", "system", {"action": "all data cleared"})
 
@@ -610,9 +1452,33 @@ def containers():
         "redis": {
             "running": redis_container is not None,
             "port": redis_container.get_exposed_port(6379) if redis_container else None
-        }
+        },
+        "replica": dict(READ_REPLICA.status(), running=replica_container is not None,
+                        port=replica_container.get_exposed_port(5432) if replica_container else None),
+        "shards": [
+            {"shard": index, "port": c.get_exposed_port(5432)}
+            for index, c in enumerate([postgres_container, *shard_containers]) if c
+        ] if shard_containers else None
     })
 
+@app.route('/api/containers/stats')
+def container_stats():
+    """Resource time series per container (?container=postgres&since=<epoch>)"""
+    name = request.args.get('container')
+    since = request.args.get('since')
+    try:
+        since = float(since) if since else None
+    except ValueError:
+        return jsonify({"error": "since must be a unix timestamp"}), 400
+
+    if name and name not in TELEMETRY.series:
+        return jsonify({"error": f"No telemetry for container '{name}'"}), 404
+
+    result = TELEMETRY.snapshot(name, since)
+    if STATE.shared:
+        result["note"] = "Multi-worker mode: the supervisor samples containers; watch the event stream"
+    return jsonify(result)
+
 @app.route('/api/health')
 def health():
     """Health check"""
@@ -621,14 +1487,85 @@ def health():
         "reality_engine": "online",
         "containers": {
             "postgres": postgres_container is not None,
-            "redis": redis_container is not None
+            "redis": redis_container is not None,
+            "replica": replica_container is not None
         },
+        "starting": {"postgres": postgres_start_lock.locked()},
+        "replica": READ_REPLICA.status(),
+        "shards": 1 + len(shard_containers),
         "features": {
-            "rate_limit": RATE_LIMIT_ENABLED,
-            "chaos": CHAOS_MODE
+            "rate_limit": rate_limit_enabled(),
+            "chaos": chaos_mode(),
+            "leaderboard": LEADERBOARD_ENABLED
         }
     })
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics (request latency, DB/Redis latency, SSE, containers)"""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/api/debug/traces', methods=['GET', 'POST'])
+def debug_traces():
+    """
+    Slowest recent requests with per-stage breakdowns.
+
+    GET  ?limit=20&route=/api/vote   - list traces (slowest first)
+    POST {"sample_rate": 0.1}        - change sampling (0.0 = off)
+    POST {"clear": true}             - drop buffered traces
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            TRACER.configure(
+                sample_rate=float(data["sample_rate"]) if "sample_rate" in data else None,
+                capacity=int(data["capacity"]) if "capacity" in data else None
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        if data.get("clear"):
+            TRACER.clear()
+
+    limit = request.args.get('limit', default=20, type=int)
+    return jsonify({
+        "sample_rate": TRACER.sample_rate,
+        "capacity": TRACER.capacity,
+        "buffered": len(TRACER),
+        "traces": TRACER.slowest(limit, name=request.args.get('route'))
+    })
+
+@app.route('/api/debug/profile', methods=['POST'])
+def debug_profile():
+    """
+    Sample every thread (request workers, SSE generators) for a few seconds.
+
+    POST ?seconds=5&interval=0.005&format=collapsed|json
+    collapsed -> text for flamegraph.pl / speedscope
+    json      -> top functions + collapsed stacks
+    """
+    data = request.get_json(silent=True) or {}
+    output = data.get('format', request.args.get('format', 'collapsed'))
+
+    try:
+        seconds = float(data.get('seconds', request.args.get('seconds', 5)))
+        interval = float(data.get('interval', request.args.get('interval', 0.005)))
+        # Announced only once the profile is really running: not for bad arguments or a busy profiler
+        result = profiler.profile(seconds=seconds, interval=interval, on_start=lambda: emit_event(
+            "profiling", "system", {"seconds": seconds, "interval": interval}))
+    except profiler.ProfilerBusy as e:
+        return jsonify({"status": "busy", "message": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    emit_event("profiled", "system", {
+        "samples": result.samples,
+        "unique_stacks": len(result.stacks)
+    })
+
+    if output == 'json':
+        return jsonify(result.to_dict())
+    return Response(result.collapsed(), mimetype='text/plain')
+
 @app.route('/api/demo/test-comparison', methods=['POST'])
 def run_test_comparison():
     """Run mock vs TestContainers test comparison"""
@@ -640,6 +1577,9 @@ def run_test_comparison():
         "testcontainers": {"status": "running", "output": [], "passed": 0, "failed": 0, "time": 0}
     }
 
+    # Test runs publish their own progress over the event bus
+    env = event_bus_env()
+
     # Run mock test
     emit_event("test_starting", "mock", {"test": "test_with_mock.py"})
     mock_start = time.time()
@@ -650,7 +1590,8 @@ def run_test_comparison():
             capture_output=True,
             text=True,
             timeout=10,
-            cwd=os.path.dirname(__file__)
+            cwd=os.path.dirname(__file__),
+            env=env
         )
         mock_time = time.time() - mock_start
 
@@ -684,7 +1625,8 @@ def run_test_comparison():
             capture_output=True,
             text=True,
             timeout=60,
-            cwd=os.path.dirname(__file__)
+            cwd=os.path.dirname(__file__),
+            env=env
         )
         tc_time = time.time() - tc_start
 
@@ -712,6 +1654,8 @@ def run_test_comparison():
 # ==============================================================================
 
 if __name__ == '__main__':
+    run_preflight()
+
     print("\n" + "🔥" * 30)
     print("\n" + " " * 20 + "THE REALITY ENGINE")
     print(" " * 15 + '"If your tests don\'t face reality,')
@@ -723,18 +1667,30 @@ if __name__ == '__main__':
     print("   ✅ Real-time lifecycle event stream")
     print("   ✅ Redis rate limiting (toggle on/off)")
     print("   ✅ Chaos injection (kill/restore containers)")
+    print("   ✅ Live Docker events for every TestContainers container")
     print("   ✅ Presenter control dashboard")
 
     print("\n🎯 Endpoints:")
     print("   📊 Main:      http://localhost:5001")
     print("   📱 QR Page:   http://localhost:5001/qr")
     print("   📡 Events:    http://localhost:5001/api/events")
+    print("   📈 Metrics:   http://localhost:5001/metrics")
+    print("   🔬 Traces:    http://localhost:5001/api/debug/traces")
+    print("   🖥️  Resources: http://localhost:5001/api/containers/stats")
+
+    start_docker_events()
+    start_control_channel("reality_engine")
 
-    print("\n🚀 Pre-starting PostgreSQL container...")
-    get_postgres_container()
+    print("\n🚀 Pre-starting PostgreSQL container (in the background)...")
+    prestart_postgres()
+    if LEADERBOARD_ENABLED:
+        print("🏆 Starting Redis for the leaderboard (in the background)...")
+        start_leaderboard()
 
     print("\n✅ Reality Engine online!")
     print("🎬 Ready for your 8-minute show!")
     print("\n" + "🔥" * 30 + "\n")
 
+    logger.info(f"⚡ Serving {time.perf_counter() - IMPORT_STARTED:.2f}s after start")
+
     app.run(host='0.0.0.0', port=5001, debug=False, threaded=True)
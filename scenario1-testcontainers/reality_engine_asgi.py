@@ -0,0 +1,627 @@
+#!/usr/bin/env python3
+"""
+⚡ THE REALITY ENGINE - ASGI MODE ⚡
+===================================
+
+Same show, same routes - served by asyncio instead of one OS thread per
+connection. Every open /api/events stream is a coroutine rather than a
+pinned thread, so thousands of idle SSE subscribers and a burst of
+concurrent voters share a single event-loop thread.
+
+Hot paths (vote, stats, events, export, rate limiting) use async psycopg and
+redis.asyncio clients; Postgres connections come from db.AsyncConnectionPool
+(long-lived, statements prepared server-side, at most DB_POOL_MAX_SIZE per
+database - a request that can't get one is answered 503). Rarely used presenter/debug routes run the Flask
+views from reality_engine.py in a worker thread, so their behaviour is
+identical in both modes. Containers, lifecycle events, feature toggles,
+metrics and traces are shared with reality_engine.py.
+
+Usage:
+    pip install starlette uvicorn
+    python3 reality_engine_asgi.py
+
+Compare with the threaded Flask server:
+    python3 benchmark.py serving
+"""
+
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+import uuid
+
+try:
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.concurrency import run_in_threadpool
+    from starlette.middleware import Middleware
+    from starlette.middleware.sessions import SessionMiddleware
+    from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+    from starlette.routing import Route
+except ImportError as e:
+    print(f"❌ Missing packages for ASGI mode: {e}")
+    print("\n💡 Solution:")
+    print("   pip install starlette uvicorn")
+    print("   (or use the threaded server: python3 reality_engine.py)")
+    sys.exit(1)
+
+# Shared engine: containers, events, toggles, metrics (pre-flight runs in main)
+import reality_engine as engine
+from reality_engine import (
+    TRACER, emit_event, logger,
+    HTTP_REQUESTS, HTTP_LATENCY, DB_QUERY_LATENCY, REDIS_LATENCY,
+    RATE_LIMIT_DECISIONS, SSE_SUBSCRIBERS, EXPORTED_ROWS, DB_READS, STATS_READS, REGISTRY, METRICS_CONTENT_TYPE,
+)
+import db
+import leaderboard
+import shards
+
+import psycopg
+from psycopg import IntegrityError
+import redis.asyncio as aioredis
+
+TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# ==============================================================================
+# CONNECTION CACHES (looked up once per container, not per request)
+# ==============================================================================
+
+_pg_target = (None, None)      # (container, db.AsyncConnectionPool)
+_async_pools = {}              # replica / shard conninfo -> db.AsyncConnectionPool
+_redis_target = (None, None)   # (container, client)
+_record_script = (None, None)  # (client, leaderboard.RECORD registered on it)
+
+def postgres_pool(container):
+    """The primary's async pool, one per container (avoids Docker API calls per vote)"""
+    global _pg_target
+    if _pg_target[0] is not container:
+        retired = _pg_target[1]
+        _pg_target = (container, db.AsyncConnectionPool(engine.postgres_conninfo(container)))
+        if retired is not None:
+            asyncio.get_running_loop().create_task(retired.close())
+    return _pg_target[1]
+
+def async_pool(conninfo):
+    """The async pool of a shard or the replica, by its connection kwargs"""
+    key = tuple(sorted(conninfo.items()))
+    if key not in _async_pools:
+        _async_pools[key] = db.AsyncConnectionPool(conninfo)
+    return _async_pools[key]
+
+def redis_client():
+    """Shared async Redis client for the current container (None if down)"""
+    global _redis_target
+    container = engine.redis_container
+    if container is None:
+        return None
+    if _redis_target[0] is not container:
+        _redis_target = (container, aioredis.Redis(
+            host=container.get_container_host_ip(),
+            port=container.get_exposed_port(6379),
+            decode_responses=True
+        ))
+    return _redis_target[1]
+
+async def get_postgres_container():
+    """Container start is blocking - do it in a worker thread, once"""
+    return engine.postgres_container or await run_in_threadpool(engine.get_postgres_container)
+
+def read_pool(container):
+    """Async twin of engine.read_pool(): the replica's pool while it is fresh enough (REPLICA=1), else the primary's"""
+    conninfo = engine.READ_REPLICA.conninfo
+    if conninfo is not None and engine.READ_REPLICA.use_replica():
+        DB_READS.labels("replica").inc()
+        return async_pool(conninfo)
+    DB_READS.labels("primary").inc()
+    return postgres_pool(container)
+
+async def read_query(container, query, retry_if=None):
+    """Async twin of engine.read_query(): await query(conn) on the replica or the primary"""
+    conninfo = engine.READ_REPLICA.conninfo
+    if conninfo is not None and engine.READ_REPLICA.use_replica():
+        try:
+            async with async_pool(conninfo).connection() as conn:
+                result = await query(conn)
+            if retry_if is None or not retry_if(result):
+                DB_READS.labels("replica").inc()
+                return result
+        except psycopg.OperationalError as e:
+            engine.READ_REPLICA.mark_down(f"query failed: {e}")
+        except db.PoolExhausted:
+            pass  # replica connections all busy: the primary takes this one
+    DB_READS.labels("primary").inc()
+    async with postgres_pool(container).connection() as conn:
+        return await query(conn)
+
+# ==============================================================================
+# HELPERS
+# ==============================================================================
+
+def instrumented(route, traced=True):
+    """Record the same per-route metrics/traces as the Flask hooks"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            start = time.perf_counter()
+            if traced:
+                TRACER.start(route, method=request.method)
+            status = 500
+            try:
+                try:
+                    response = await handler(request)
+                except db.PoolExhausted as e:
+                    response = pool_exhausted(request, e)
+                status = response.status_code
+                return response
+            finally:
+                HTTP_LATENCY.labels(route).observe(time.perf_counter() - start)
+                HTTP_REQUESTS.labels(route, request.method, status).inc()
+                if traced:
+                    TRACER.finish(status=status)
+        return wrapper
+    return decorator
+
+def pool_exhausted(request, e):
+    """Async twin of the Flask engine's PoolExhausted handler"""
+    engine.DB_POOL_EXHAUSTED.inc()
+    logger.warning(f"Shedding {request.url.path}: {e}")
+    return JSONResponse({"status": "busy", "message": "Database busy, try again"}, status_code=503)
+
+def ensure_user_id(request):
+    """Same anonymous per-browser identity as the Flask session"""
+    if 'user_id' not in request.session:
+        request.session['user_id'] = str(uuid.uuid4())[:8]
+    return request.session['user_id']
+
+def flask_view(view):
+    """Serve a (rarely used) Flask view from a worker thread"""
+    async def endpoint(request):
+        body = await request.body()
+
+        def call():
+            with engine.app.test_request_context(
+                request.url.path,
+                method=request.method,
+                query_string=request.url.query,
+                data=body,
+                headers={k: v for k, v in request.headers.items() if k.lower() != 'host'}
+            ):
+                response = engine.app.make_response(view(**request.path_params))
+                return response.get_data(), response.status_code, response.headers.get('Content-Type')
+
+        data, status, content_type = await run_in_threadpool(call)
+        return Response(data, status_code=status, headers={'content-type': content_type})
+    return endpoint
+
+def page(route, template):
+    @instrumented(route)
+    async def endpoint(request):
+        ensure_user_id(request)
+        return FileResponse(os.path.join(TEMPLATES, template))
+    return Route(route, endpoint)
+
+# ==============================================================================
+# RATE LIMITING (async Redis)
+# ==============================================================================
+
+async def check_rate_limit(user_id):
+    """Async twin of reality_engine.check_rate_limit()"""
+    if not engine.rate_limit_enabled():
+        RATE_LIMIT_DECISIONS.labels("disabled").inc()
+        return False, None
+
+    r = redis_client()
+    if r is None:
+        # Redis not available - graceful degradation
+        RATE_LIMIT_DECISIONS.labels("degraded").inc()
+        return False, "Redis unavailable (graceful degradation)"
+
+    try:
+        # Check rate limit: max 3 requests per minute
+        key = f"ratelimit:{user_id}"
+        with REDIS_LATENCY.labels("incr").time():
+            count = await r.incr(key)
+
+        if count == 1:
+            with REDIS_LATENCY.labels("expire").time():
+                await r.expire(key, 60)  # 1 minute window
+
+        if count > 3:
+            RATE_LIMIT_DECISIONS.labels("limited").inc()
+            emit_event("rate_limited", "redis", {
+                "user_id": user_id[:8],
+                "count": count
+            })
+            return True, f"Rate limited: {count}/3 requests in 1 minute"
+
+        RATE_LIMIT_DECISIONS.labels("allowed").inc()
+        return False, None
+
+    except Exception as e:
+        # Redis error - graceful degradation
+        RATE_LIMIT_DECISIONS.labels("degraded").inc()
+        emit_event("error", "redis", {"error": str(e)})
+        return False, f"Redis error (graceful fallback): {str(e)}"
+
+# ==============================================================================
+# LEADERBOARD (async Redis, LEADERBOARD=1)
+# ==============================================================================
+
+async def leaderboard_epoch():
+    """Async twin of reality_engine.leaderboard_epoch()"""
+    r = redis_client() if engine.LEADERBOARD_ENABLED else None
+    if r is None:
+        return None
+    try:
+        return leaderboard.to_epoch(await r.get(leaderboard.EPOCH_KEY))
+    except Exception as e:
+        logger.warning(f"Leaderboard unavailable: {e}")
+        return None
+
+async def record_on_leaderboard(poll_id, choice, shard, tally, epoch):
+    """Async twin of reality_engine.record_on_leaderboard()"""
+    global _record_script
+    r = redis_client() if engine.LEADERBOARD_ENABLED else None
+    if r is None:
+        return
+    if _record_script[0] is not r:
+        _record_script = (r, r.register_script(leaderboard.RECORD))
+    keys, args = leaderboard.record_args(poll_id, choice, shard, tally, epoch)
+    try:
+        with REDIS_LATENCY.labels("leaderboard_record").time():
+            await _record_script[1](keys=keys, args=args)
+    except Exception as e:
+        logger.warning(f"Leaderboard update failed: {e}")
+        try:
+            await r.delete(leaderboard.board_keys(poll_id)[2])  # rebuilt from Postgres on the next read
+        except Exception:
+            pass
+
+async def leaderboard_stats(container, poll_id):
+    """The board in one round trip; a board that isn't loaded is rebuilt by the engine in a thread"""
+    r = redis_client() if engine.LEADERBOARD_ENABLED else None
+    if r is None:
+        return None
+    board, _, loaded = leaderboard.board_keys(poll_id)
+    try:
+        with REDIS_LATENCY.labels("leaderboard_read").time():
+            async with r.pipeline(transaction=True) as pipe:
+                pipe.exists(loaded)
+                pipe.zrevrange(board, 0, -1, withscores=True)
+                found = leaderboard.to_standings(*await pipe.execute())
+    except Exception as e:
+        logger.warning(f"Leaderboard unavailable, reading Postgres: {e}")
+        return None
+    if found is None:
+        found = await run_in_threadpool(engine.leaderboard_stats, container, poll_id)
+    return found
+
+# ==============================================================================
+# ROUTES
+# ==============================================================================
+
+@instrumented('/api/vote')
+async def vote(request):
+    """Async /api/vote (and /api/polls/{id}/vote) - same responses as the Flask view"""
+    poll_id = request.path_params.get('poll_id', db.DEFAULT_POLL_ID)
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    choice = (data or {}).get('choice')
+    user_id = ensure_user_id(request)
+
+    if not choice:
+        return JSONResponse({
+            "status": "error",
+            "message": "Please select a choice"
+        }, status_code=400)
+
+    with TRACER.span("check_rate_limit"):
+        is_limited, limit_msg = await check_rate_limit(user_id)
+    if is_limited:
+        return JSONResponse({
+            "status": "rate_limited",
+            "message": "⏱️ Slow down! Too many requests.",
+            "detail": limit_msg,
+            "learning": "This is Redis enforcing rate limits - testable with TestContainers!"
+        }, status_code=429)
+
+    emit_event("vote_attempt", "postgres", {
+        "user_id": user_id[:8],
+        "choice": choice,
+        "poll_id": poll_id
+    })
+
+    # A known voter is a definite duplicate; anyone else goes to Postgres
+    voter = db.voter_key(poll_id, user_id)
+    with TRACER.span("voter_cache"):
+        known, voters_epoch = engine.STATE.voter_status(voter) if engine.VOTER_CACHE else (False, None)
+    if known:
+        return JSONResponse(engine.duplicate_vote(user_id, choice, "voter_cache"), status_code=400)
+
+    with TRACER.span("get_postgres_container"):
+        container = await get_postgres_container()
+
+    # Sharded: the shard that owns this user's votes
+    sharded = engine.shard_set(container)
+    pool = async_pool(sharded.conninfo_for(user_id)) if sharded else postgres_pool(container)
+    # LEADERBOARD=1: the epoch before the INSERT, the tally back with it
+    with TRACER.span("leaderboard_epoch"):
+        epoch = await leaderboard_epoch()
+
+    async with pool.connection() as conn:
+        try:
+            with TRACER.span("insert"), DB_QUERY_LATENCY.labels("insert_vote").time():
+                async with conn.cursor() as cur:
+                    # Autocommit: the INSERT alone is one round trip; with its tally, one transaction
+                    async with conn.transaction() if epoch is not None else contextlib.nullcontext():
+                        await cur.execute(db.INSERT_VOTE, {"poll_id": poll_id, "user_id": user_id, "choice": choice})
+                        recorded = cur.rowcount == 1
+                        if recorded and epoch is not None:
+                            await cur.execute(db.TALLY_COUNT, {"poll_id": poll_id, "choice": choice})
+                            tally = (await cur.fetchone())[0]
+                    if not recorded:
+                        await cur.execute(db.GET_POLL, (poll_id,))
+                        row = await cur.fetchone()
+        except IntegrityError:
+            if engine.VOTER_CACHE:
+                engine.STATE.mark_voted(voter, voters_epoch)
+            return JSONResponse(engine.duplicate_vote(user_id, choice, "postgres"), status_code=400)
+
+        if not recorded:
+            status, message = db.poll_rejection(db.poll_dict(row) if row else None, choice)
+            return JSONResponse({"status": "error", "message": message}, status_code=status)
+        if engine.VOTER_CACHE:
+            engine.STATE.mark_voted(voter, voters_epoch)
+        total_votes = engine.STATE.record_vote(choice, poll_id)
+        if epoch is not None:
+            with TRACER.span("leaderboard"):
+                await record_on_leaderboard(poll_id, choice, engine.vote_shard(container, user_id), tally, epoch)
+
+        emit_event("vote_success", "postgres", {
+            "user_id": user_id[:8],
+            "choice": choice,
+            "poll_id": poll_id,
+            "total_votes": total_votes
+        })
+
+        return JSONResponse({
+            "status": "success",
+            "message": f"✅ Vote for {choice} recorded!",
+            "user_id": user_id[:8] + "...",
+            "learning": "Real database constraint = one vote per user",
+            "try_again": "Try voting again to see the constraint catch it!"
+        })
+
+@instrumented('/api/stats')
+async def stats(request):
+    """Async leaderboard from the poll's running tallies"""
+    poll_id = request.path_params.get('poll_id', db.DEFAULT_POLL_ID)
+    with TRACER.span("get_postgres_container"):
+        container = await get_postgres_container()
+
+    async def query(conn):
+        """The poll's tally rows, or None if there is no such poll"""
+        async with conn.cursor() as cur:
+            await cur.execute(db.POLL_TALLIES, (poll_id,))
+            rows = await cur.fetchall()
+            if not rows:
+                await cur.execute(db.GET_POLL, (poll_id,))
+                if await cur.fetchone() is None:
+                    return None
+            return rows
+
+    async def on_shard(conninfo):
+        async with async_pool(conninfo).connection() as conn:
+            return await query(conn)
+
+    # LEADERBOARD=1: one Redis round trip instead
+    with TRACER.span("leaderboard"):
+        found = await leaderboard_stats(container, poll_id)
+    if found is not None:
+        STATS_READS.labels("leaderboard").inc()
+        rows = found[0]
+    else:
+        STATS_READS.labels("postgres").inc()
+        with TRACER.span("query"), DB_QUERY_LATENCY.labels("stats").time():
+            sharded = engine.shard_set(container)
+            if sharded:
+                # Every shard at once; a poll unknown to all of them is unknown
+                per_shard = await asyncio.gather(*(on_shard(pool.conninfo) for pool in sharded.pools))
+                found = [shard_rows for shard_rows in per_shard if shard_rows is not None]
+                rows = shards.merge_tallies((shard_rows, None) for shard_rows in found)[0] if found else None
+            else:
+                rows = await read_query(container, query, retry_if=lambda rows: rows is None)
+    if rows is None:
+        return JSONResponse({"status": "error", "message": "No such poll"}, status_code=404)
+
+    results = [{"choice": choice, "count": count} for choice, count in rows]
+    return JSONResponse({
+        "poll_id": poll_id,
+        "results": results,
+        "total_votes": sum(count for _, count in rows),
+        "rate_limit_enabled": engine.rate_limit_enabled(),
+        "chaos_mode": engine.chaos_mode()
+    })
+
+@instrumented('/api/export')
+async def export(request):
+    """Stream raw votes as CSV or NDJSON from an async server-side cursor"""
+    try:
+        fmt, filters = engine.parse_export_args(request.query_params)
+    except ValueError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+
+    with TRACER.span("get_postgres_container"):
+        container = await get_postgres_container()
+    sql, params = db.export_query(**filters)
+
+    sharded = engine.shard_set(container)
+
+    # Sharded: one shard after another
+    pools = [async_pool(pool.conninfo) for pool in sharded.pools] if sharded else [read_pool(container)]
+
+    async def generate():
+        exported = 0
+        try:
+            yield db.export_header(fmt)
+            for pool in pools:
+                # Named cursors live inside a transaction; pooled connections are autocommit
+                async with pool.connection() as conn, conn.transaction(), conn.cursor(name="vote_export") as cur:
+                    await cur.execute(sql, params)
+                    while True:
+                        rows = await cur.fetchmany(db.EXPORT_BATCH)
+                        if not rows:
+                            break
+                        exported += len(rows)
+                        yield db.encode_rows(rows, fmt)
+        finally:
+            EXPORTED_ROWS.labels(fmt).inc(exported)
+
+    return StreamingResponse(generate(), media_type=db.EXPORT_FORMATS[fmt],
+                             headers=engine.export_headers(fmt))
+
+@instrumented('/api/events', traced=False)
+async def events(request):
+    """SSE stream - a coroutine per subscriber, no thread"""
+    async def generate():
+        SSE_SUBSCRIBERS.inc()
+        try:
+            last_sent = 0
+            last_rates = None
+            last_rank = engine.RANK_FEED.sequence
+            while True:
+                stopping = engine.SHUTTING_DOWN.is_set()
+                with engine.event_lock:
+                    events_to_send = engine.lifecycle_events[last_sent:]
+                    last_sent = len(engine.lifecycle_events)
+
+                for event in events_to_send:
+                    yield f"data: {json.dumps(event)}\n\n"
+
+                live_rates = engine.VOTE_RATES.live_json()
+                if live_rates is not last_rates:
+                    last_rates = live_rates
+                    yield f"event: rates\ndata: {live_rates}\n\n"
+
+                last_rank, changes = engine.RANK_FEED.since(last_rank)
+                for change in changes:
+                    yield f"event: rank_change\ndata: {change}\n\n"
+
+                if stopping:
+                    return
+                await asyncio.sleep(0.5)
+        finally:
+            # Client disconnected (task cancelled) or server shutting down
+            SSE_SUBSCRIBERS.dec()
+
+    return StreamingResponse(generate(), media_type='text/event-stream')
+
+@instrumented('/api/rates')
+async def vote_rates(request):
+    """Rolling vote rates (in memory - no thread hop needed)"""
+    try:
+        return JSONResponse(engine.rates_snapshot(request.query_params))
+    except ValueError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+
+@instrumented('/api/health')
+async def health(request):
+    """Health check"""
+    return JSONResponse({
+        "status": "healthy",
+        "reality_engine": "online",
+        "mode": "asgi",
+        "containers": {
+            "postgres": engine.postgres_container is not None,
+            "redis": engine.redis_container is not None
+        },
+        "starting": {"postgres": engine.postgres_start_lock.locked()},
+        "features": {
+            "rate_limit": engine.rate_limit_enabled(),
+            "chaos": engine.chaos_mode(),
+            "leaderboard": engine.LEADERBOARD_ENABLED
+        }
+    })
+
+@instrumented('/metrics', traced=False)
+async def metrics(request):
+    """Prometheus metrics (shared registry)"""
+    return Response(REGISTRY.render(), headers={'content-type': METRICS_CONTENT_TYPE})
+
+def delegated(route, view, methods, traced=True):
+    return Route(route, instrumented(route, traced)(flask_view(view)), methods=methods)
+
+routes = [
+    page('/', 'theater.html'),
+    page('/old', 'reality_engine.html'),
+    page('/qr', 'qr_vote.html'),
+    Route('/api/vote', vote, methods=['POST']),
+    Route('/api/stats', stats),
+    # Same handlers, labelled with the Flask route templates
+    Route('/api/polls/{poll_id:int}/vote', instrumented('/api/polls/<int:poll_id>/vote')(vote.__wrapped__),
+          methods=['POST']),
+    Route('/api/polls/{poll_id:int}/stats', instrumented('/api/polls/<int:poll_id>/stats')(stats.__wrapped__)),
+    Route('/api/export', export),
+    Route('/api/rates', vote_rates),
+    Route('/api/events', events),
+    Route('/api/health', health),
+    Route('/metrics', metrics),
+    # Presenter controls and debug tools: rare, blocking, shared with Flask
+    delegated('/api/control/rate-limit', engine.toggle_rate_limit, ['POST']),
+    delegated('/api/control/chaos', engine.toggle_chaos, ['POST']),
+    delegated('/api/control/reset', engine.reset, ['POST']),
+    # Poll management: occasional, and the Flask views already validate
+    delegated('/api/polls', engine.list_polls, ['GET']),
+    delegated('/api/polls', engine.create_poll, ['POST']),
+    delegated('/api/polls/{poll_id:int}', engine.poll_detail, ['GET']),
+    delegated('/api/polls/{poll_id:int}/close', engine.close_poll, ['POST']),
+    delegated('/api/containers', engine.containers, ['GET']),
+    delegated('/api/containers/stats', engine.container_stats, ['GET']),
+    delegated('/api/debug/traces', engine.debug_traces, ['GET', 'POST'], traced=False),
+    delegated('/api/debug/profile', engine.debug_profile, ['POST'], traced=False),
+    delegated('/api/demo/test-comparison', engine.run_test_comparison, ['POST']),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(SessionMiddleware, secret_key=engine.app.secret_key, session_cookie='reality_session'),
+    ],
+)
+
+# ==============================================================================
+# MAIN
+# ==============================================================================
+
+if __name__ == '__main__':
+    engine.run_preflight()
+
+    print("\n" + "⚡" * 30)
+    print("\n" + " " * 14 + "THE REALITY ENGINE - ASGI MODE")
+    print("\n" + "⚡" * 30)
+
+    print("\n🎯 Endpoints:")
+    print("   📊 Main:      http://localhost:5001")
+    print("   📱 QR Page:   http://localhost:5001/qr")
+    print("   📡 Events:    http://localhost:5001/api/events")
+    print("   📈 Metrics:   http://localhost:5001/metrics")
+
+    engine.start_docker_events()
+    engine.start_control_channel("reality_engine_asgi")
+
+    print("\n🚀 Pre-starting PostgreSQL container (in the background)...")
+    engine.prestart_postgres()
+    if engine.LEADERBOARD_ENABLED:
+        print("🏆 Starting Redis for the leaderboard (in the background)...")
+        engine.start_leaderboard()
+
+    print("\n✅ Reality Engine (asyncio) online!")
+    print("\n" + "⚡" * 30 + "\n")
+
+    logger.info("Serving with uvicorn (single event loop)")
+    uvicorn.run(app, host='0.0.0.0', port=5001, log_level='warning')
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+🪞 Reality Engine Read Replica
+==============================
+
+Optional (REPLICA=1): a second Postgres container, cloned from the
+primary with pg_basebackup and kept current by streaming replication.
+It serves the read-only endpoints (stats, poll list and detail, export),
+so hundreds of browsers polling results don't compete with votes for
+the primary.
+
+Bounded staleness: every `interval` the monitor asks the primary for its
+current WAL position and how far the replica has replayed. It remembers
+when it saw each position, so "has replayed everything the primary had
+at time T" means a staleness of now - T on our own clock - a stalled
+replica keeps ageing even when nothing new reaches it. Reads go to the
+replica only while it is
+
+    streaming   listed in the primary's pg_stat_replication
+    reachable   answering queries
+    fresh       staleness <= max_lag
+    checked     the last verdict is at most 3 intervals old
+
+so a read is never more than max_lag + interval behind. Otherwise - and
+straight away when a replica query fails - reads go to the primary, and
+move back once the replica is within half the bound again.
+
+Lifecycle stream:
+    replication        periodic summary (event_interval)
+    replica_lagging    staleness over max_lag: reads on the primary
+    replica_down       not streaming or unreachable: reads on the primary
+    replica_caught_up  within the bound: reads on the replica
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+REPLICA_IMAGE = "postgres:15-alpine"
+
+# Replication connections from any address on the Docker network
+HBA_REPLICATION = "host replication all all scram-sha-256"
+
+# Runs in the replica container: clone the primary (retrying until it
+# accepts replication connections), then start as a hot standby.
+# -R writes standby.signal and primary_conninfo; the entrypoint sees an
+# existing data directory and skips initdb.
+BOOTSTRAP = """
+until pg_basebackup -h "$PRIMARY_HOST" -U "$POSTGRES_USER" -D "$PGDATA" -R -X stream -c fast; do
+    rm -rf "$PGDATA"/*
+    sleep 1
+done
+exec docker-entrypoint.sh postgres
+"""
+
+# (primary WAL position, replica replay position) in bytes; replay is
+# NULL when no replica is streaming
+LAG_QUERY = """
+    SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '0/0')::bigint,
+           (SELECT pg_wal_lsn_diff(replay_lsn, '0/0')::bigint FROM pg_stat_replication
+            WHERE state = 'streaming' ORDER BY replay_lsn DESC NULLS LAST LIMIT 1)
+"""
+
+# Reads return to the replica below max_lag * RECOVERY_RATIO
+RECOVERY_RATIO = 0.5
+
+# ==============================================================================
+# CONTAINERS
+# ==============================================================================
+
+def container_ip(container):
+    """Address other containers reach `container` at (its Docker bridge IP)"""
+    wrapped = container.get_wrapped_container()
+    wrapped.reload()
+    settings = wrapped.attrs["NetworkSettings"]
+    if settings.get("IPAddress"):
+        return settings["IPAddress"]
+    return next(network["IPAddress"] for network in settings["Networks"].values() if network.get("IPAddress"))
+
+def allow_replication(primary, conn):
+    """Let replicas stream from `primary`: a pg_hba.conf entry, then a config reload"""
+    result = primary.exec(["sh", "-c", f'echo "{HBA_REPLICATION}" >> "$PGDATA/pg_hba.conf"'])
+    if result.exit_code != 0:
+        raise RuntimeError(f"Could not edit pg_hba.conf: {result.output!r}")
+    conn.execute("SELECT pg_reload_conf()")
+
+def start_replica(primary, image=REPLICA_IMAGE):
+    """Start a container that clones `primary` and streams from it (a started PostgresContainer)"""
+    from testcontainers.core.container import DockerContainer
+
+    replica = (
+        DockerContainer(image)
+        .with_env("PRIMARY_HOST", container_ip(primary))
+        .with_env("POSTGRES_USER", primary.username)
+        .with_env("POSTGRES_PASSWORD", primary.password)
+        .with_env("PGPASSWORD", primary.password)
+        .with_exposed_ports(5432)
+        .with_kwargs(entrypoint=["sh", "-c", BOOTSTRAP])
+    )
+    replica.start()
+    return replica
+
+def wait_until_standby(connect, timeout=60.0):
+    """Poll until the replica accepts queries as a standby; raises TimeoutError"""
+    deadline = time.time() + timeout
+    last_error = None
+    while time.time() < deadline:
+        try:
+            with connect() as conn:
+                if conn.execute("SELECT pg_is_in_recovery()").fetchone()[0]:
+                    return
+                last_error = "not in recovery"
+        except Exception as e:
+            last_error = e
+        time.sleep(0.5)
+    raise TimeoutError(f"Replica not ready after {timeout:.0f}s: {last_error}")
+
+# ==============================================================================
+# LAG MONITOR
+# ==============================================================================
+
+class LagMonitor:
+    """Decides, check by check, whether reads may go to the replica"""
+
+    def __init__(self, max_lag=2.0, interval=0.5, event_interval=10.0, retry_after=5.0,
+                 on_event=None, clock=time.time, history=1000):
+        self.max_lag = max_lag
+        self.interval = interval
+        self.event_interval = event_interval
+        self.retry_after = retry_after
+        self.on_event = on_event
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._positions = deque(maxlen=history)  # (seen at, primary WAL position)
+        self._stop = None
+        self.pool = None
+        self.conninfo = None
+        self.state = "off"  # off | starting | healthy | lagging | down
+        self.staleness = None
+        self.lag_bytes = None
+        self.reason = None
+        self._checked_at = 0.0
+        self._down_until = 0.0
+
+    def attach(self, primary_pool, replica_pool, conninfo):
+        """Start checking; reads stay on the primary until the first fresh verdict"""
+        self.detach()
+        with self._lock:
+            self.pool = replica_pool
+            self.conninfo = conninfo
+            self.state = "starting"
+            self._positions.clear()
+        stop = threading.Event()
+        self._stop = stop
+        threading.Thread(
+            target=self._run, args=(primary_pool, replica_pool, stop), name="replica-monitor", daemon=True
+        ).start()
+
+    def detach(self):
+        """Stop checking; every read goes to the primary"""
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+        with self._lock:
+            self.state = "off"
+            self.pool = self.conninfo = None
+
+    def use_replica(self):
+        """True while the latest verdict (taken recently enough) says the replica is fresh"""
+        with self._lock:
+            return self.state == "healthy" and self._clock() - self._checked_at <= 3 * self.interval
+
+    def mark_down(self, reason):
+        """A replica query failed: reads go to the primary for at least retry_after seconds"""
+        with self._lock:
+            self._down_until = self._clock() + self.retry_after
+        self._transition("down", reason)
+
+    def observe(self, primary_lsn, replay_lsn, reachable=True, reason=None):
+        """Feed one check; returns the resulting state"""
+        now = self._clock()
+        with self._lock:
+            self._checked_at = now
+            self._positions.append((now, primary_lsn))
+            if replay_lsn is None:
+                self.staleness = self.lag_bytes = None
+            else:
+                self.lag_bytes = max(0, primary_lsn - replay_lsn)
+                self.staleness = self._staleness(now, replay_lsn)
+            held_down = now < self._down_until
+
+        if not reachable or replay_lsn is None:
+            state, reason = "down", reason or "not streaming from the primary"
+        elif held_down:
+            state, reason = "down", self.reason
+        elif self.staleness is None or self.staleness > self.max_lag:
+            state, reason = "lagging", None
+        elif self.state != "healthy" and self.staleness > self.max_lag * RECOVERY_RATIO:
+            state, reason = self.state, self.reason  # not caught up enough to switch back yet
+        else:
+            state, reason = "healthy", None
+        self._transition(state, reason)
+        return state
+
+    def _staleness(self, now, replay_lsn):
+        """now - (when the primary was last seen at a position the replica has replayed); None if unknown"""
+        positions = self._positions
+        if replay_lsn >= positions[-1][1]:
+            # Caught up with the latest check: older positions are no longer needed
+            latest = positions[-1]
+            positions.clear()
+            positions.append(latest)
+            return 0.0
+        while len(positions) > 1 and positions[1][1] <= replay_lsn:
+            positions.popleft()
+        seen_at, lsn = positions[0]
+        return now - seen_at if lsn <= replay_lsn else None
+
+    def status(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "reads_on": "replica" if self.state == "healthy" else "primary",
+                "staleness_s": round(self.staleness, 3) if self.staleness is not None else None,
+                "lag_bytes": self.lag_bytes,
+                "max_lag_s": self.max_lag,
+                "reason": self.reason,
+            }
+
+    def _transition(self, state, reason=None):
+        with self._lock:
+            previous = self.state
+            if previous == "off" or state == previous:
+                return
+            self.state = state
+            self.reason = reason
+        details = self.status()
+        if state == "healthy":
+            self._emit("replica_caught_up", details)
+        elif state == "lagging":
+            self._emit("replica_lagging", details)
+        elif state == "down":
+            self._emit("replica_down", details)
+
+    def _check(self, primary_pool, replica_pool):
+        with primary_pool.connection() as conn:
+            primary_lsn, replay_lsn = conn.execute(LAG_QUERY).fetchone()
+        try:
+            with replica_pool.connection() as conn:
+                conn.execute("SELECT 1")
+        except Exception as e:
+            return self.observe(primary_lsn, replay_lsn, reachable=False, reason=f"unreachable: {e}")
+        return self.observe(primary_lsn, replay_lsn)
+
+    def _run(self, primary_pool, replica_pool, stop):
+        last_event = self._clock()
+        while not stop.wait(self.interval):
+            try:
+                self._check(primary_pool, replica_pool)
+            except Exception as e:
+                # The primary didn't answer: no verdict, and use_replica() expires
+                logger.debug(f"Replica lag check failed: {e}")
+                continue
+            now = self._clock()
+            if self.event_interval and now - last_event >= self.event_interval:
+                last_event = now
+                self._emit("replication", self.status())
+
+    def _emit(self, event_type, details):
+        if self.on_event is not None:
+            try:
+                self.on_event(event_type, "replica", details)
+            except Exception as e:
+                logger.error(f"Replica event handler failed: {e}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+🗄️ Reality Engine Schema
+========================
+
+The votes schema, shared by the engine (get_postgres_container) and the
+multi-worker supervisor (serve.py), which bootstraps Postgres before any
+worker process exists.
+
+    polls         one row per poll; poll 1 is the show's own poll
+    votes         UNIQUE (poll_id, user_id): one vote per user per poll
+    poll_tallies  running (poll_id, choice) counts, kept by statement
+                  triggers on votes - stats read a poll's few tally rows
+                  instead of counting its votes (or anyone else's)
+
+The triggers see every write path: single INSERTs, COPY bulk loads,
+DELETE and TRUNCATE.
+
+Partitioned layout (VOTES_PARTITIONS=N, default 0 = one plain table):
+votes is hash-partitioned on user_id into N tables, each with its own
+slice of the unique index, so big loads and concurrent voters don't all
+contend on one heap and one B-tree. A vote touches exactly one
+partition. Partitioned tables can't have a primary key without the
+partition key, so id is indexed instead (export still streams in id
+order). Containers are fresh per run, so the layout is chosen at
+bootstrap - compare the two with `python3 benchmark.py partitions`.
+"""
+
+import os
+
+DEFAULT_POLL_ID = 1
+DEFAULT_QUESTION = "Which language should we use?"
+VOTES_PARTITIONS = int(os.getenv("VOTES_PARTITIONS", "0"))
+
+POLLS_DDL = """
+    CREATE TABLE IF NOT EXISTS polls (
+        id SERIAL PRIMARY KEY,
+        question TEXT NOT NULL,
+        choices TEXT[] NOT NULL DEFAULT '{}',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        closed_at TIMESTAMP
+    );
+"""
+
+VOTE_COLUMNS = """
+        poll_id INTEGER NOT NULL DEFAULT 1 REFERENCES polls (id),
+        user_id VARCHAR(100) NOT NULL,
+        choice VARCHAR(50) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (poll_id, user_id)"""
+
+# Time-range reads: rate history at startup, /api/export since/until
+VOTE_INDEXES = """
+    CREATE INDEX IF NOT EXISTS votes_created_at ON votes (created_at);
+"""
+
+def votes_ddl(partitions=0):
+    """votes as one table, or hash-partitioned on user_id into `partitions` tables"""
+    if partitions <= 0:
+        return f"""
+    CREATE TABLE IF NOT EXISTS votes (
+        id SERIAL PRIMARY KEY,{VOTE_COLUMNS}
+    );""" + VOTE_INDEXES
+
+    ddl = f"""
+    CREATE TABLE IF NOT EXISTS votes (
+        id SERIAL,{VOTE_COLUMNS}
+    ) PARTITION BY HASH (user_id);
+    CREATE INDEX IF NOT EXISTS votes_id ON votes (id);""" + VOTE_INDEXES
+    for remainder in range(partitions):
+        ddl += (f"    CREATE TABLE IF NOT EXISTS votes_p{remainder} PARTITION OF votes"
+                f" FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder});\n")
+    return ddl
+
+TALLIES_DDL = """
+    CREATE TABLE IF NOT EXISTS poll_tallies (
+        poll_id INTEGER NOT NULL,
+        choice VARCHAR(50) NOT NULL,
+        count BIGINT NOT NULL,
+        PRIMARY KEY (poll_id, choice)
+    );
+"""
+
+# One trigger run per statement: a 1M-row COPY updates each tally once.
+# Rows are locked in (poll_id, choice) order so concurrent loads can't deadlock.
+TALLY_TRIGGERS_DDL = """
+    CREATE OR REPLACE FUNCTION tally_inserted_votes() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO poll_tallies (poll_id, choice, count)
+        SELECT poll_id, choice, COUNT(*) FROM inserted
+        GROUP BY poll_id, choice ORDER BY poll_id, choice
+        ON CONFLICT (poll_id, choice) DO UPDATE SET count = poll_tallies.count + EXCLUDED.count;
+        RETURN NULL;
+    END $$;
+
+    CREATE OR REPLACE FUNCTION untally_deleted_votes() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE poll_tallies t SET count = t.count - d.count
+        FROM (SELECT poll_id, choice, COUNT(*) AS count FROM deleted GROUP BY poll_id, choice) d
+        WHERE t.poll_id = d.poll_id AND t.choice = d.choice;
+        RETURN NULL;
+    END $$;
+
+    CREATE OR REPLACE FUNCTION clear_tallies() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        DELETE FROM poll_tallies;
+        RETURN NULL;
+    END $$;
+
+    CREATE OR REPLACE TRIGGER votes_tally_insert AFTER INSERT ON votes
+        REFERENCING NEW TABLE AS inserted
+        FOR EACH STATEMENT EXECUTE FUNCTION tally_inserted_votes();
+    CREATE OR REPLACE TRIGGER votes_tally_delete AFTER DELETE ON votes
+        REFERENCING OLD TABLE AS deleted
+        FOR EACH STATEMENT EXECUTE FUNCTION untally_deleted_votes();
+    CREATE OR REPLACE TRIGGER votes_tally_truncate AFTER TRUNCATE ON votes
+        FOR EACH STATEMENT EXECUTE FUNCTION clear_tallies();
+"""
+
+DEFAULT_POLL_DML = """
+    INSERT INTO polls (question)
+    SELECT %s WHERE NOT EXISTS (SELECT 1 FROM polls)
+"""
+
+PARTITION_COUNT = """
+    SELECT COUNT(*) FROM pg_inherits WHERE inhparent = 'votes'::regclass
+"""
+
+def init_schema(conn, partitions=None):
+    """
+    Create tables, tally triggers and the show's poll (idempotent) and
+    commit. Returns the number of votes partitions (0 = plain table).
+    """
+    partitions = VOTES_PARTITIONS if partitions is None else partitions
+    with conn.cursor() as cur:
+        cur.execute(POLLS_DDL)
+        cur.execute(votes_ddl(partitions))
+        cur.execute(TALLIES_DDL)
+        cur.execute(TALLY_TRIGGERS_DDL)
+        cur.execute(DEFAULT_POLL_DML, (DEFAULT_QUESTION,))
+        cur.execute(PARTITION_COUNT)
+        layout = cur.fetchone()[0]
+    conn.commit()
+    return layout
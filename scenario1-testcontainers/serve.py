@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+🏭 THE REALITY ENGINE - MULTI-WORKER MODE
+=========================================
+
+`python3 reality_engine.py` is one Flask dev-server process on one core.
+This runs the same app under gunicorn with N worker processes.
+
+    supervisor (this process)
+      ├── owns every container: state Redis, Postgres, rate-limit Redis
+      ├── serves container requests from workers (chaos kill/restore, ...)
+      ├── relays events other processes NOTIFY on Postgres (event_bus.py)
+      ├── streams Docker lifecycle events to the dashboard (docker_events.py)
+      └── gunicorn master
+            ├── worker 1  ┐  reality_engine:app, SHARED_STATE_URL set:
+            ├── worker 2  │  toggles/tallies in Redis, events over pub/sub,
+            └── worker N  ┘  container endpoints mirrored from the supervisor
+
+The state Redis is separate from the rate-limit Redis, so "Inject Chaos"
+still only kills the rate limiter.
+
+Usage:
+    pip install gunicorn          (Linux / macOS)
+    python3 serve.py              # one worker per CPU core
+    python3 serve.py --workers 4 --threads 32
+
+Compare with the single-process modes:
+    python3 benchmark.py serving --modes threaded multiworker --workers 1 2 4
+"""
+
+import argparse
+import importlib.util
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PORT = 5001
+
+# Configure TestContainers (inherited by workers)
+os.environ["TESTCONTAINERS_CLOUD_ENABLED"] = "false"
+
+if sys.platform == "win32":
+    os.environ["DOCKER_HOST"] = "tcp://localhost:2375"
+else:
+    os.environ["DOCKER_HOST"] = "unix:///var/run/docker.sock"
+
+try:
+    from testcontainers.postgres import PostgresContainer
+    from testcontainers.redis import RedisContainer
+    import psycopg
+except ImportError as e:
+    print(f"❌ Missing packages: {e}")
+    print("\n💡 Solution:")
+    print("   pip install -r requirements.txt")
+    sys.exit(1)
+
+import control
+import db
+import docker_events
+import event_bus
+import preflight
+import schema
+import shared_state
+import telemetry
+
+# ==============================================================================
+# PRE-FLIGHT
+# ==============================================================================
+
+def run_preflight():
+    """Docker reachable, port free, gunicorn installed"""
+    report = preflight.run(port=PORT)
+    report.print()
+    if not report.ok:
+        sys.exit(1)
+
+    if importlib.util.find_spec("gunicorn") is None:
+        print("❌ gunicorn is not installed")
+        print("\n💡 Solution:")
+        print("   pip install gunicorn   (Linux / macOS only)")
+        print("   or run single-process: python3 reality_engine.py")
+        sys.exit(1)
+
+# ==============================================================================
+# SUPERVISOR
+# ==============================================================================
+
+class Supervisor:
+    """Single owner of all containers; workers only ever attach to them"""
+
+    def __init__(self):
+        self.state_redis = None
+        self.postgres = None
+        self.redis = None
+        self.owner = None
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.stop_lock = threading.Lock()
+        self.stopped = False
+        self.command_thread = None
+        self.event_listener = None
+        self.docker_subscriber = None
+        self.telemetry = None
+
+    @property
+    def state_url(self):
+        host = self.state_redis.get_container_host_ip()
+        port = self.state_redis.get_exposed_port(6379)
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        print("🚀 Starting shared-state Redis...")
+        self.state_redis = RedisContainer("redis:7-alpine")
+        self.state_redis.start()
+
+        self.owner = shared_state.StateOwner(self.state_url)
+        self.owner.reset()
+
+        # Resource samples reach workers as lifecycle events
+        self.telemetry = telemetry.Sampler(
+            interval=float(os.getenv("TELEMETRY_INTERVAL", "2")),
+            event_interval=float(os.getenv("TELEMETRY_EVENT_INTERVAL", "10")),
+            on_event=self.owner.emit,
+        )
+
+        if os.getenv("DOCKER_EVENTS", "1") != "0":
+            self.docker_subscriber = docker_events.Subscriber(self.owner.emit).start()
+
+        self.start_postgres()
+
+        # The one LISTEN connection for all workers; events go out via Redis
+        self.event_listener = event_bus.Listener(self.postgres_conninfo, self.owner.publish).start()
+
+        self.command_thread = threading.Thread(
+            target=self.owner.serve_commands,
+            args=({
+                "start_postgres": self.start_postgres,
+                "start_redis": self.start_redis,
+                "kill_redis": self.kill_redis,
+            }, self.stopping),
+            name="supervisor-commands",
+            daemon=True,
+        )
+        self.command_thread.start()
+
+    def postgres_conninfo(self):
+        return {
+            "host": self.postgres.get_container_host_ip(),
+            "port": self.postgres.get_exposed_port(5432),
+            "user": self.postgres.username,
+            "password": self.postgres.password,
+            "dbname": self.postgres.dbname,
+        }
+
+    def start_postgres(self):
+        with self.lock:
+            if self.postgres is not None:
+                return
+            self.owner.emit("starting", "postgres", {"image": "postgres:15-alpine"})
+            start_time = time.time()
+
+            container = PostgresContainer("postgres:15-alpine")
+            container.start()
+            startup_time = time.time() - start_time
+            self.owner.emit("ready", "postgres", {
+                "startup_time": f"{startup_time:.1f}s",
+                "port": container.get_exposed_port(5432)
+            })
+
+            # A container that can't be set up is stopped here, or the next request would start another
+            conn = None
+            try:
+                info = shared_state.describe_container(
+                    container, 5432,
+                    username=container.username,
+                    password=container.password,
+                    dbname=container.dbname,
+                )
+                conn = psycopg.connect(
+                    host=info["host"], port=info["ports"]["5432"], user=container.username,
+                    password=container.password, dbname=container.dbname, connect_timeout=10
+                )
+                partitions = schema.init_schema(conn)
+                voters = self.owner.seed_voters(db.voter_ids(conn))
+            except Exception as e:
+                self.owner.emit("error", "postgres", {"error": str(e)})
+                container.stop()
+                raise
+            finally:
+                if conn is not None:
+                    conn.close()
+
+            self.postgres = container
+            self.telemetry.track("postgres", container.get_wrapped_container())
+            self.owner.set_container("postgres", info)
+            self.owner.emit("initialized", "postgres", {"schema": "votes table created", "partitions": partitions,
+                                                      "known_voters": voters})
+
+    def start_redis(self):
+        with self.lock:
+            if self.redis is not None:
+                return
+            self.owner.emit("starting", "redis", {"image": "redis:7-alpine"})
+            start_time = time.time()
+
+            container = RedisContainer("redis:7-alpine")
+            container.start()
+            startup_time = time.time() - start_time
+
+            self.redis = container
+            self.telemetry.track("redis", container.get_wrapped_container())
+            self.owner.set_container("redis", shared_state.describe_container(container, 6379))
+            self.owner.emit("ready", "redis", {
+                "startup_time": f"{startup_time:.1f}s",
+                "port": container.get_exposed_port(6379)
+            })
+
+    def kill_redis(self):
+        with self.lock:
+            if self.redis is None:
+                return
+            self.owner.emit("chaos", "redis", {"action": "killed"})
+            self.owner.set_container("redis", None)
+            self.telemetry.untrack("redis")
+            self.redis.stop()
+            self.redis = None
+            self.owner.emit("terminated", "redis", {"reason": "chaos injection"})
+
+    def stop(self):
+        """Idempotent: Ctrl+C and a cleanup.py shutdown can race"""
+        with self.stop_lock:
+            if self.stopped:
+                return
+            self.stopped = True
+            self._stop()
+
+    def _stop(self):
+        self.stopping.set()
+        if self.command_thread:
+            self.command_thread.join(timeout=5)
+        if self.event_listener:
+            self.event_listener.stop()
+        if self.docker_subscriber:
+            self.docker_subscriber.stop()
+        for container in (self.redis, self.postgres, self.state_redis):
+            if container is not None:
+                try:
+                    container.stop()
+                except Exception as e:
+                    print(f"   Warning: could not stop container: {e}")
+
+# ==============================================================================
+# MAIN
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Reality Engine with multiple worker processes")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2)),
+                        help="Worker processes (default: CPU cores)")
+    parser.add_argument("--threads", type=int, default=32,
+                        help="Threads per worker (each open SSE stream holds one)")
+    args = parser.parse_args()
+
+    print("\n" + "🏭" * 30)
+    print("\n" + " " * 12 + "THE REALITY ENGINE - MULTI-WORKER MODE")
+    print("\n" + "🏭" * 30 + "\n")
+
+    run_preflight()
+    if os.getenv("REPLICA", "0") == "1":
+        print("⚠️  REPLICA=1 is single-process only (reality_engine.py / reality_engine_asgi.py):")
+        print("   workers read from the primary\n")
+    if int(os.getenv("SHARDS", "1")) > 1:
+        print("⚠️  SHARDS is single-process only (reality_engine.py / reality_engine_asgi.py):")
+        print("   workers share one Postgres container\n")
+
+    supervisor = Supervisor()
+    processes = {}
+
+    def stop_workers():
+        gunicorn = processes.get("gunicorn")
+        if gunicorn is not None and gunicorn.poll() is None:
+            gunicorn.send_signal(signal.SIGTERM)
+            try:
+                gunicorn.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                gunicorn.kill()
+
+    def shutdown():
+        """cleanup.py: graceful worker stop, then containers"""
+        step = time.perf_counter()
+        stop_workers()
+        workers_s = time.perf_counter() - step
+        step = time.perf_counter()
+        supervisor.stop()
+        return {"timings": {"stop_workers": round(workers_s, 3),
+                            "stop_containers": round(time.perf_counter() - step, 3)}}
+
+    # Main thread exits by itself once gunicorn is gone
+    channel = control.ControlServer("serve", shutdown, exit_process=False, http_port=PORT).start()
+
+    try:
+        supervisor.start()
+
+        env = dict(os.environ, SHARED_STATE_URL=supervisor.state_url)
+        gunicorn = processes["gunicorn"] = subprocess.Popen([
+            sys.executable, "-m", "gunicorn",
+            "--bind", f"0.0.0.0:{PORT}",
+            "--workers", str(args.workers),
+            "--worker-class", "gthread",
+            "--threads", str(args.threads),
+            "--timeout", "120",
+            "--graceful-timeout", "10",
+            "reality_engine:app",
+        ], cwd=HERE, env=env)
+
+        print(f"\n✅ {args.workers} workers × {args.threads} threads on http://localhost:{PORT}")
+        print("   Press Ctrl+C to stop (containers are cleaned up)\n")
+        gunicorn.wait()
+
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down...")
+    finally:
+        stop_workers()
+        supervisor.stop()
+        channel.close()
+        print("✅ Containers stopped")
+
+if __name__ == "__main__":
+    main()
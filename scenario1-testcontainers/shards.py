@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+🧱 Reality Engine Shards
+========================
+
+Optional (SHARDS=N, default 1): votes spread over N Postgres containers,
+so one container's WAL, locks and CPU stop capping write throughput.
+
+    vote     crc32(user_id) % N picks the shard. A user always lands on
+             the same shard, so each shard's UNIQUE (poll_id, user_id)
+             is the global one-vote-per-user guarantee.
+    stats    every shard's tally rows, read in parallel and summed
+    polls    every shard holds the whole polls table (a vote is checked
+             against its own shard's copy); shard 0 hands out the ids
+             and is asked first about a poll
+    export   shard after shard (ids are per shard)
+
+Shard 0 is the show's own container (get_postgres_container()); it also
+carries the event bus. Each shard has the full schema, triggers and
+VOTES_PARTITIONS layout.
+
+Compare shard counts with `python3 benchmark.py shards`.
+"""
+
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import db
+
+# Polls are copied to shards 1..N-1 under shard 0's id
+COPY_POLL = """
+    INSERT INTO polls (id, question, choices, created_at, closed_at) VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT (id) DO NOTHING
+"""
+
+def shard_index(user_id, shards):
+    """Stable across processes and restarts (unlike hash(), which is salted per process)"""
+    return zlib.crc32(user_id.encode("utf-8")) % shards
+
+def merge_tallies(results):
+    """[(rows, total), ...] per shard -> one (rows, total), most votes first"""
+    counts = Counter()
+    for rows, _ in results:
+        for choice, count in rows:
+            counts[choice] += count
+    rows = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return rows, sum(counts.values())
+
+class ShardSet:
+    """One connection pool per shard, and threads to query them all at once"""
+
+    def __init__(self, pools):
+        self.pools = list(pools)
+        self._executor = ThreadPoolExecutor(max_workers=len(self.pools), thread_name_prefix="shard")
+
+    def __len__(self):
+        return len(self.pools)
+
+    def pool_for(self, user_id):
+        return self.pools[shard_index(user_id, len(self.pools))]
+
+    def conninfo_for(self, user_id):
+        return self.pool_for(user_id).conninfo
+
+    def map(self, query, pools=None):
+        """[query(conn) per shard], in shard order, run in parallel"""
+        def run(pool):
+            with pool.connection() as conn:
+                return query(conn)
+        return list(self._executor.map(run, self.pools if pools is None else pools))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for pool in self.pools:
+            pool.close()
+
+# ==============================================================================
+# QUERIES ACROSS SHARDS
+# ==============================================================================
+
+def fetch_stats(shard_set, poll_id):
+    """db.fetch_stats() summed over every shard"""
+    return merge_tallies(shard_set.map(lambda conn: db.fetch_stats(conn, poll_id)))
+
+def get_poll(shard_set, poll_id):
+    with shard_set.pools[0].connection() as conn:
+        return db.get_poll(conn, poll_id)
+
+def create_poll(shard_set, question, choices=()):
+    """Create on shard 0, then copy to the others under the same id"""
+    with shard_set.pools[0].connection() as conn:
+        poll = db.create_poll(conn, question, choices)
+    row = (poll["id"], question, list(choices), datetime.fromisoformat(poll["created_at"]), None)
+    shard_set.map(lambda conn: conn.execute(COPY_POLL, row), shard_set.pools[1:])
+    return poll
+
+def close_poll(shard_set, poll_id):
+    """Close on every shard (so no shard accepts another vote); None if there is no such poll"""
+    return shard_set.map(lambda conn: db.close_poll(conn, poll_id))[0]
+
+def list_polls(shard_set):
+    """Shard 0's polls with vote totals summed over every shard"""
+    per_shard = shard_set.map(db.list_polls)
+    totals = Counter()
+    for polls in per_shard:
+        for poll in polls:
+            totals[poll["id"]] += poll["total_votes"]
+    return [dict(poll, total_votes=totals[poll["id"]]) for poll in per_shard[0]]
+
+def voter_ids(pools):
+    """db.voter_ids() of every pool in turn, as one stream (seed the voter cache once, not per shard)"""
+    for pool in pools:
+        with pool.connection() as conn:
+            yield from db.voter_ids(conn)
+
+def delete_votes(shard_set):
+    shard_set.map(db.delete_votes)
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+🔗 Reality Engine Shared State
+==============================
+
+Where the engine keeps its cross-request state: feature toggles, vote
+tallies, known voters, lifecycle events and container endpoints.
+
+    LocalState   one process (python3 reality_engine.py) - plain memory
+    RedisState   many worker processes (python3 serve.py) - a dedicated
+                 Redis owned by the supervisor; toggles and tallies live
+                 in hashes, events fan out over pub/sub, container
+                 endpoints are published by the supervisor
+
+Reads of toggles and container endpoints are served from a local mirror
+kept fresh by a pub/sub listener thread, so the vote path never pays a
+Redis round trip just to learn whether rate limiting is on.
+
+Workers never start or stop containers themselves: they `request()` an
+action and the supervisor (see serve.py) performs it.
+
+Known voters are user_ids Postgres is known to hold a vote for, so a
+repeat vote can be answered without a DB round trip. Postgres stays the
+source of truth: the set only ever holds a subset of the votes table
+(capped at VOTER_CACHE_LIMIT; an id that isn't in it goes to Postgres).
+Each reset bumps an epoch, and `mark_voted()` ignores votes that started
+before the latest reset, so a deleted vote can't sneak back in.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+from schema import DEFAULT_POLL_ID
+
+logger = logging.getLogger(__name__)
+
+FLAGS = ("rate_limit", "chaos")
+RECENT_EVENTS = 50
+VOTER_CACHE_LIMIT = int(os.getenv("VOTER_CACHE_LIMIT", "2000000"))
+
+# Redis keys / channels
+PREFIX = "reality:"
+FLAGS_KEY = PREFIX + "flags"
+TALLIES_KEY = PREFIX + "tallies"       # hash: "<poll_id>:<choice>" -> votes
+TOTAL_KEY = PREFIX + "total_votes"     # hash: poll_id -> votes
+RECENT_KEY = PREFIX + "events:recent"
+CONTAINERS_KEY = PREFIX + "containers"
+COMMANDS_KEY = PREFIX + "commands"
+VOTERS_KEY = PREFIX + "voters"
+VOTERS_EPOCH_KEY = PREFIX + "voters:epoch"
+EVENTS_CHANNEL = PREFIX + "events"
+CONTROL_CHANNEL = PREFIX + "control"
+
+def make_event(event_type, container_name, details=None):
+    """Lifecycle event dict (same shape everywhere)"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "type": event_type,
+        "container": container_name,
+        "details": details or {},
+        "id": str(uuid.uuid4())[:8]
+    }
+
+class AttachedContainer:
+    """
+    A container owned by the supervisor, seen from a worker.
+
+    Quacks like the testcontainers objects the engine uses
+    (host/port/credentials) but can't be stopped from here.
+    """
+
+    def __init__(self, name, info):
+        self.name = name
+        self.info = info
+        self.username = info.get("username")
+        self.password = info.get("password")
+        self.dbname = info.get("dbname")
+
+    def get_container_host_ip(self):
+        return self.info["host"]
+
+    def get_exposed_port(self, port):
+        return self.info["ports"][str(port)]
+
+    def stop(self):
+        raise RuntimeError(f"{self.name} container is owned by the supervisor")
+
+def describe_container(container, *ports, **credentials):
+    """Supervisor side: endpoint info published to workers"""
+    return {
+        "host": container.get_container_host_ip(),
+        "ports": {str(port): int(container.get_exposed_port(port)) for port in ports},
+        **credentials,
+    }
+
+# ==============================================================================
+# SINGLE PROCESS
+# ==============================================================================
+
+class LocalState:
+    """In-memory state for the single-process engine"""
+
+    shared = False
+
+    def __init__(self):
+        self._flags = {name: False for name in FLAGS}
+        self._tallies = defaultdict(lambda: defaultdict(int))  # poll_id -> choice -> votes
+        self._voters = set()
+        self._voters_epoch = 0
+        self._lock = threading.Lock()
+        self._on_event = None
+
+    def start(self, on_event, on_containers=None, on_clear=None):
+        """Register the callback that buffers events for SSE clients"""
+        self._on_event = on_event
+
+    def flag(self, name):
+        return self._flags[name]
+
+    def toggle(self, name):
+        with self._lock:
+            self._flags[name] = not self._flags[name]
+            return self._flags[name]
+
+    def record_vote(self, choice, poll_id=DEFAULT_POLL_ID):
+        """Count a vote; returns the poll's new total"""
+        with self._lock:
+            tallies = self._tallies[poll_id]
+            tallies[choice] += 1
+            return sum(tallies.values())
+
+    def tallies(self, poll_id=DEFAULT_POLL_ID):
+        with self._lock:
+            return dict(self._tallies.get(poll_id, {}))
+
+    def clear_tallies(self):
+        with self._lock:
+            self._tallies.clear()
+
+    def voter_status(self, user_id):
+        """(known voter?, epoch) - hand the epoch back to mark_voted()"""
+        with self._lock:
+            return user_id in self._voters, self._voters_epoch
+
+    def mark_voted(self, user_id, epoch):
+        """Remember a voter Postgres holds a row for, unless reset since `epoch`"""
+        with self._lock:
+            if epoch == self._voters_epoch and len(self._voters) < VOTER_CACHE_LIMIT:
+                self._voters.add(user_id)
+
+    def seed_voters(self, user_ids):
+        """Replace the known voters (startup: from the votes table); returns the count"""
+        voters = set()
+        for user_id in user_ids:
+            if len(voters) >= VOTER_CACHE_LIMIT:
+                break
+            voters.add(user_id)
+        with self._lock:
+            self._voters = voters
+            return len(voters)
+
+    def clear_voters(self):
+        with self._lock:
+            self._voters.clear()
+            self._voters_epoch += 1
+
+    def publish(self, event):
+        self._on_event(event)
+
+    def clear_events(self):
+        """Nothing to broadcast - the caller clears its own buffer"""
+
+    def containers(self):
+        return {}
+
+    def request(self, action, timeout=None):
+        raise RuntimeError("Container actions need the multi-worker supervisor")
+
+# ==============================================================================
+# MULTI PROCESS (Redis)
+# ==============================================================================
+
+def _publish_event(client, event):
+    """Keep the last events for late joiners and fan out to all workers"""
+    raw = json.dumps(event)
+    pipe = client.pipeline(transaction=False)
+    pipe.rpush(RECENT_KEY, raw)
+    pipe.ltrim(RECENT_KEY, -RECENT_EVENTS, -1)
+    pipe.publish(EVENTS_CHANNEL, raw)
+    pipe.execute()
+
+# Add only if no reset happened since the vote started, and below the cap
+_MARK_VOTED = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[2] and redis.call('SCARD', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('SADD', KEYS[1], ARGV[1])
+end
+"""
+
+def _seed_voters(client, user_ids, chunk=10_000):
+    """DEL + chunked SADD; returns the number of voters stored"""
+    client.delete(VOTERS_KEY)
+    count = 0
+    batch = []
+    for user_id in user_ids:
+        if count + len(batch) >= VOTER_CACHE_LIMIT:
+            break
+        batch.append(user_id)
+        if len(batch) == chunk:
+            count += client.sadd(VOTERS_KEY, *batch)
+            batch = []
+    if batch:
+        count += client.sadd(VOTERS_KEY, *batch)
+    return count
+
+class RedisState:
+    """Shared state in the supervisor's Redis; one listener thread per worker"""
+
+    shared = True
+
+    def __init__(self, url):
+        import redis
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self._mark_voted = self.redis.register_script(_MARK_VOTED)
+        self._flags = {name: False for name in FLAGS}
+        self._containers = {}
+        self._callbacks = {}
+        self._listener = None
+
+    # -- lifecycle ------------------------------------------------------------
+
+    def start(self, on_event, on_containers=None, on_clear=None):
+        """Load the mirrors, replay recent events and start listening"""
+        self._callbacks = {"event": on_event, "containers": on_containers, "clear": on_clear}
+        self._refresh()
+        for raw in self.redis.lrange(RECENT_KEY, 0, -1):
+            on_event(json.loads(raw))
+
+        self._listener = threading.Thread(target=self._listen, name="shared-state-listener", daemon=True)
+        self._listener.start()
+
+    def _refresh(self):
+        flags = self.redis.hgetall(FLAGS_KEY)
+        self._flags = {name: int(flags.get(name, 0)) % 2 == 1 for name in FLAGS}
+        self._containers = {
+            name: json.loads(info) for name, info in self.redis.hgetall(CONTAINERS_KEY).items()
+        }
+        if self._callbacks.get("containers"):
+            self._callbacks["containers"](self.containers())
+
+    def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(EVENTS_CHANNEL, CONTROL_CHANNEL)
+                self._refresh()  # catch up on anything missed while disconnected
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    if message["channel"] == EVENTS_CHANNEL:
+                        self._callbacks["event"](payload)
+                    else:
+                        self._handle_control(payload)
+            except Exception as e:
+                logger.warning(f"Shared state listener reconnecting: {e}")
+                time.sleep(1)
+            finally:
+                pubsub.close()
+
+    def _handle_control(self, payload):
+        kind = payload.get("kind")
+        if kind == "flags":
+            # Re-read rather than trust message order under concurrent toggles
+            flags = self.redis.hgetall(FLAGS_KEY)
+            self._flags = {name: int(flags.get(name, 0)) % 2 == 1 for name in FLAGS}
+        elif kind == "containers":
+            self._containers = payload["containers"]
+            if self._callbacks.get("containers"):
+                self._callbacks["containers"](self.containers())
+        elif kind == "clear_events" and self._callbacks.get("clear"):
+            self._callbacks["clear"]()
+
+    # -- toggles & tallies ----------------------------------------------------
+
+    def flag(self, name):
+        return self._flags[name]
+
+    def toggle(self, name):
+        """Atomic across workers: the flag is the parity of a counter"""
+        value = self.redis.hincrby(FLAGS_KEY, name, 1) % 2 == 1
+        self._flags[name] = value
+        self.redis.publish(CONTROL_CHANNEL, json.dumps({"kind": "flags", "flags": {name: value}}))
+        return value
+
+    def record_vote(self, choice, poll_id=DEFAULT_POLL_ID):
+        """One round trip: bump the choice and the poll's total"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hincrby(TALLIES_KEY, f"{poll_id}:{choice}", 1)
+        pipe.hincrby(TOTAL_KEY, poll_id, 1)
+        return pipe.execute()[1]
+
+    def tallies(self, poll_id=DEFAULT_POLL_ID):
+        prefix = f"{poll_id}:"
+        return {field[len(prefix):]: int(count) for field, count in self.redis.hgetall(TALLIES_KEY).items()
+                if field.startswith(prefix)}
+
+    def clear_tallies(self):
+        self.redis.delete(TALLIES_KEY, TOTAL_KEY)
+
+    # -- known voters ---------------------------------------------------------
+
+    def voter_status(self, user_id):
+        """One round trip: membership and the current epoch"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.sismember(VOTERS_KEY, user_id)
+        pipe.get(VOTERS_EPOCH_KEY)
+        member, epoch = pipe.execute()
+        return bool(member), int(epoch or 0)
+
+    def mark_voted(self, user_id, epoch):
+        self._mark_voted(keys=[VOTERS_KEY, VOTERS_EPOCH_KEY], args=[user_id, epoch, VOTER_CACHE_LIMIT])
+
+    def seed_voters(self, user_ids):
+        return _seed_voters(self.redis, user_ids)
+
+    def clear_voters(self):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(VOTERS_KEY)
+        pipe.incr(VOTERS_EPOCH_KEY)
+        pipe.execute()
+
+    # -- events ---------------------------------------------------------------
+
+    def publish(self, event):
+        _publish_event(self.redis, event)
+
+    def clear_events(self):
+        self.redis.delete(RECENT_KEY)
+        self.redis.publish(CONTROL_CHANNEL, json.dumps({"kind": "clear_events"}))
+
+    # -- containers -----------------------------------------------------------
+
+    def containers(self):
+        """{name: AttachedContainer} for containers the supervisor runs"""
+        return {name: AttachedContainer(name, info) for name, info in self._containers.items()}
+
+    def request(self, action, timeout=120):
+        """Ask the supervisor to do something with a container and wait"""
+        reply_key = f"{PREFIX}reply:{uuid.uuid4().hex}"
+        self.redis.rpush(COMMANDS_KEY, json.dumps({"action": action, "reply": reply_key}))
+        reply = self.redis.blpop(reply_key, timeout=timeout)
+        if reply is None:
+            raise TimeoutError(f"Supervisor did not answer '{action}' within {timeout}s")
+
+        payload = json.loads(reply[1])
+        self._containers = payload.get("containers", self._containers)
+        if self._callbacks.get("containers"):
+            self._callbacks["containers"](self.containers())
+        if payload.get("error"):
+            raise RuntimeError(payload["error"])
+        return payload
+
+# ==============================================================================
+# SUPERVISOR SIDE
+# ==============================================================================
+
+class StateOwner:
+    """Used by the supervisor: resets state, publishes containers, serves commands"""
+
+    def __init__(self, url):
+        import redis
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.containers = {}
+
+    def reset(self):
+        self.redis.delete(
+            FLAGS_KEY, TALLIES_KEY, TOTAL_KEY, RECENT_KEY, CONTAINERS_KEY, COMMANDS_KEY,
+            VOTERS_KEY, VOTERS_EPOCH_KEY,
+        )
+
+    def seed_voters(self, user_ids):
+        """Known voters from the votes table, before any worker serves a vote"""
+        return _seed_voters(self.redis, user_ids)
+
+    def publish(self, event):
+        _publish_event(self.redis, event)
+
+    def emit(self, event_type, container_name, details=None):
+        self.publish(make_event(event_type, container_name, details))
+
+    def set_container(self, name, info):
+        """Publish (info) or withdraw (None) a container endpoint"""
+        if info is None:
+            self.containers.pop(name, None)
+            self.redis.hdel(CONTAINERS_KEY, name)
+        else:
+            self.containers[name] = info
+            self.redis.hset(CONTAINERS_KEY, name, json.dumps(info))
+        self.redis.publish(CONTROL_CHANNEL, json.dumps({"kind": "containers", "containers": self.containers}))
+
+    def serve_commands(self, handlers, stop_event):
+        """Run worker requests one at a time until stop_event is set"""
+        while not stop_event.is_set():
+            item = self.redis.blpop(COMMANDS_KEY, timeout=1)
+            if item is None:
+                continue
+            command = json.loads(item[1])
+            reply = {}
+            try:
+                handler = handlers[command["action"]]
+                handler()
+            except Exception as e:
+                logger.error(f"Supervisor action {command.get('action')} failed: {e}")
+                reply["error"] = str(e)
+            reply["containers"] = self.containers
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.rpush(command["reply"], json.dumps(reply))
+            pipe.expire(command["reply"], 60)
+            pipe.execute()
+
+def from_env():
+    """RedisState when launched by serve.py (SHARED_STATE_URL), else LocalState"""
+    url = os.getenv("SHARED_STATE_URL")
+    return RedisState(url) if url else LocalState()
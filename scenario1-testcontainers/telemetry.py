@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+📊 Container Resource Telemetry
+===============================
+
+CPU, memory, block I/O and network for the containers the engine owns,
+read from the Docker stats stream (one long-lived API stream per
+container - no `docker stats` subprocesses). Each container keeps a
+bounded time series, so a vote latency spike can be lined up with what
+Postgres was doing at that moment.
+
+The daemon pushes a stats frame about once a second; the sampler keeps
+one every `interval` seconds and derives per-second rates for the
+cumulative I/O counters.
+
+Lifecycle stream:
+    resources           periodic summary per container (event_interval)
+    resource_pressure   CPU or memory crossed the threshold
+    resource_recovered  back below it
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Pressure is reported above the threshold and cleared below 90% of it
+RECOVERY_RATIO = 0.9
+
+def _cpu_percent(stats):
+    """Same formula as `docker stats`: share of the host's CPUs used"""
+    cpu = stats.get("cpu_stats", {})
+    pre = stats.get("precpu_stats", {})
+    cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - pre.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - pre.get("system_cpu_usage", 0)
+    online = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    if cpu_delta <= 0 or system_delta <= 0:
+        return 0.0
+    return cpu_delta / system_delta * online * 100.0
+
+def _memory(stats):
+    """(used, limit) in bytes; page cache is not counted as used"""
+    memory = stats.get("memory_stats", {})
+    usage = memory.get("usage", 0)
+    details = memory.get("stats", {})
+    cache = details.get("inactive_file", details.get("total_inactive_file", details.get("cache", 0)))
+    return max(0, usage - cache), memory.get("limit", 0)
+
+def _block_io(stats):
+    read = write = 0
+    for entry in stats.get("blkio_stats", {}).get("io_service_bytes_recursive") or []:
+        op = entry.get("op", "").lower()
+        if op == "read":
+            read += entry.get("value", 0)
+        elif op == "write":
+            write += entry.get("value", 0)
+    return read, write
+
+def _network(stats):
+    rx = tx = 0
+    for interface in (stats.get("networks") or {}).values():
+        rx += interface.get("rx_bytes", 0)
+        tx += interface.get("tx_bytes", 0)
+    return rx, tx
+
+def make_sample(stats, previous=None, now=None):
+    """One point of the series from a raw stats frame"""
+    now = now or time.time()
+    mem_used, mem_limit = _memory(stats)
+    blk_read, blk_write = _block_io(stats)
+    net_rx, net_tx = _network(stats)
+
+    sample = {
+        "ts": now,
+        "cpu_percent": round(_cpu_percent(stats), 2),
+        "mem_bytes": mem_used,
+        "mem_limit": mem_limit,
+        "mem_percent": round(mem_used / mem_limit * 100, 2) if mem_limit else None,
+        "blk_read_bytes": blk_read,
+        "blk_write_bytes": blk_write,
+        "net_rx_bytes": net_rx,
+        "net_tx_bytes": net_tx,
+        "pids": stats.get("pids_stats", {}).get("current"),
+    }
+
+    # Counters are cumulative; rates make spikes visible
+    if previous is not None and now > previous["ts"]:
+        elapsed = now - previous["ts"]
+        for counter in ("blk_read", "blk_write", "net_rx", "net_tx"):
+            delta = sample[f"{counter}_bytes"] - previous[f"{counter}_bytes"]
+            sample[f"{counter}_bps"] = round(max(0, delta) / elapsed, 1)
+    return sample
+
+class Sampler:
+    """Per-container stats streams feeding bounded series"""
+
+    def __init__(self, interval=2.0, history=300, on_event=None, event_interval=10.0,
+                 cpu_threshold=80.0, mem_threshold=80.0):
+        self.interval = interval
+        self.history = history
+        self.on_event = on_event
+        self.event_interval = event_interval
+        self.thresholds = {"cpu_percent": cpu_threshold, "mem_percent": mem_threshold}
+        self.series = {}
+        self._streams = {}
+        self._pressure = {}
+        self._lock = threading.Lock()
+
+    def track(self, name, container):
+        """Start sampling a docker SDK container under `name`"""
+        stop = threading.Event()
+        with self._lock:
+            if name in self._streams:
+                self._streams[name].set()
+            self._streams[name] = stop
+            # A restarted container (chaos recovery) continues its series
+            self.series.setdefault(name, deque(maxlen=self.history))
+            self._pressure[name] = set()
+        threading.Thread(
+            target=self._run, args=(name, container, stop), name=f"telemetry-{name}", daemon=True
+        ).start()
+
+    def untrack(self, name):
+        """Stop sampling (the series is kept for post-mortems)"""
+        with self._lock:
+            stop = self._streams.pop(name, None)
+        if stop is not None:
+            stop.set()
+
+    def tracking(self):
+        with self._lock:
+            return sorted(self._streams)
+
+    def snapshot(self, name=None, since=None):
+        """{"interval_s", "containers": {name: {"tracking", "latest", "series"}}}"""
+        with self._lock:
+            names = [name] if name else sorted(self.series)
+            containers = {}
+            for key in names:
+                points = list(self.series.get(key, ()))
+                if since is not None:
+                    points = [p for p in points if p["ts"] > since]
+                containers[key] = {
+                    "tracking": key in self._streams,
+                    "latest": points[-1] if points else None,
+                    "series": points,
+                }
+        return {"interval_s": self.interval, "history": self.history, "containers": containers}
+
+    def _run(self, name, container, stop):
+        previous = None
+        last_kept = 0.0
+        last_event = time.time()
+        try:
+            for stats in container.stats(stream=True, decode=True):
+                if stop.is_set():
+                    break
+                now = time.time()
+                if now - last_kept < self.interval:
+                    continue
+                last_kept = now
+
+                sample = make_sample(stats, previous, now)
+                previous = sample
+                with self._lock:
+                    self.series[name].append(sample)
+
+                self._check_pressure(name, sample)
+                if self.event_interval and now - last_event >= self.event_interval:
+                    last_event = now
+                    self._emit("resources", name, self._summary(sample))
+        except Exception as e:
+            # Stats stream ends with an error when the container goes away
+            if not stop.is_set():
+                logger.debug(f"Stats stream for {name} ended: {e}")
+        finally:
+            with self._lock:
+                if self._streams.get(name) is stop:
+                    del self._streams[name]
+
+    def _check_pressure(self, name, sample):
+        active = self._pressure[name]
+        for metric, threshold in self.thresholds.items():
+            value = sample.get(metric)
+            if value is None:
+                continue
+            if metric not in active and value >= threshold:
+                active.add(metric)
+                self._emit("resource_pressure", name, {"metric": metric, "value": value, "threshold": threshold})
+            elif metric in active and value < threshold * RECOVERY_RATIO:
+                active.discard(metric)
+                self._emit("resource_recovered", name, {"metric": metric, "value": value})
+
+    @staticmethod
+    def _summary(sample):
+        summary = {
+            "cpu_percent": sample["cpu_percent"],
+            "mem_mb": round(sample["mem_bytes"] / 1e6, 1),
+        }
+        for key in ("blk_read_bps", "blk_write_bps", "net_rx_bps", "net_tx_bps"):
+            if key in sample:
+                summary[key] = sample[key]
+        return summary
+
+    def _emit(self, event_type, name, details):
+        if self.on_event is not None:
+            try:
+                self.on_event(event_type, name, details)
+            except Exception as e:
+                logger.error(f"Telemetry event handler failed: {e}")
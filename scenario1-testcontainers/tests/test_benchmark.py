@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+📏 Benchmark Comparison Tests
+=============================
+
+The regression gate in benchmark.py must flag real slowdowns and
+stay quiet on noise; the startup audit must read -X importtime output; the round-trip proxy
+must count flights, not packets; export streams are measured chunk by chunk; serving workers get a
+thread for every SSE stream. No Docker needed.
+"""
+
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import (
+    RoundTripProxy, compare_results, missing_baselines, parse_importtime, require_baselines, stream_export,
+    summarize, summarize_imports, welch_p_slower, worker_threads,
+)
+
+
+BASELINE = summarize([1.00, 1.10, 0.90, 1.05, 0.95] * 10)
+
+
+def test_significant_slowdown_is_a_regression():
+    """30% slower with tight spread = regression"""
+    current = summarize([1.30, 1.40, 1.20, 1.35, 1.25] * 10)
+
+    verdict = compare_results({"vote": BASELINE}, {"vote": current})[0]
+
+    assert verdict["status"] == "regression"
+    assert verdict["p_value"] < 0.01
+
+
+def test_noise_is_not_a_regression():
+    """Same distribution = ok"""
+    current = summarize([1.02, 1.08, 0.92, 1.04, 0.96] * 10)
+
+    verdict = compare_results({"vote": BASELINE}, {"vote": current})[0]
+
+    assert verdict["status"] == "ok"
+
+
+def test_small_but_significant_change_is_ignored():
+    """Significant but below the minimum slowdown threshold = ok"""
+    current = summarize([x * 1.03 for x in [1.00, 1.10, 0.90, 1.05, 0.95] * 200])
+    baseline = summarize([1.00, 1.10, 0.90, 1.05, 0.95] * 200)
+
+    verdict = compare_results({"vote": baseline}, {"vote": current})[0]
+
+    assert verdict["status"] == "ok"
+
+
+def test_faster_is_an_improvement():
+    """Halving the mean = improvement"""
+    current = summarize([0.50, 0.55, 0.45, 0.52, 0.48] * 10)
+
+    verdict = compare_results({"vote": BASELINE}, {"vote": current})[0]
+
+    assert verdict["status"] == "improvement"
+
+
+def test_missing_baseline_is_new():
+    """compare_results() reports benchmarks without a baseline; `compare` refuses them unless --allow-new"""
+    verdict = compare_results({}, {"stats_1m": BASELINE})[0]
+
+    assert verdict["status"] == "new"
+
+
+def test_compare_fails_without_baselines():
+    """An empty baseline file must not pass every benchmark"""
+    assert missing_baselines({"vote": BASELINE}, ["vote", "stats_1m"]) == ["stats_1m"]
+
+    with pytest.raises(SystemExit) as exit_info:
+        require_baselines({}, ["vote"], "baselines.json")
+    assert exit_info.value.code == 2
+    require_baselines({"vote": BASELINE}, ["vote"], "baselines.json")
+
+
+def test_welch_matches_students_t():
+    """One-sided p for identical spreads is symmetric around 0.5"""
+    shifted = dict(BASELINE, mean=BASELINE["mean"] + 0.01)
+
+    p_slower = welch_p_slower(BASELINE, shifted)
+    p_faster = welch_p_slower(shifted, BASELINE)
+
+    assert abs(p_slower + p_faster - 1.0) < 1e-9
+
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 | encodings
+import time:       300 |        300 |     psycopg.pq
+import time:      5000 |       5300 |   psycopg
+import time:      1000 |       1000 |   flask
+import time:       700 |       7000 | reality_engine
+2025-01-01 12:00:00,000 - reality_engine - INFO - unrelated log line
+"""
+
+
+def test_importtime_rows_keep_nesting():
+    rows = parse_importtime(IMPORTTIME)
+
+    assert rows[0] == (120, 120, 0, "encodings")
+    assert rows[1] == (300, 300, 2, "psycopg.pq")
+    assert rows[-1] == (700, 7000, 0, "reality_engine")
+
+
+def test_import_summary_ranks_packages_by_self_time():
+    summary = summarize_imports(parse_importtime(IMPORTTIME), "reality_engine", top=2)
+
+    assert summary["total_s"] == 0.007
+    assert summary["modules_loaded"] == 5
+    assert summary["packages"] == [
+        {"package": "psycopg", "self_s": 0.0053},
+        {"package": "flask", "self_s": 0.001},
+    ]
+
+
+def test_round_trip_proxy_counts_flights_not_packets():
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def answer_twice():
+        conn, _ = server.accept()
+        with conn:
+            for expected in (b"ping", b"onetwo"):
+                data = b""
+                while len(data) < len(expected):
+                    data += conn.recv(64)
+                conn.sendall(b"ok")
+
+    threading.Thread(target=answer_twice, daemon=True).start()
+    proxy = RoundTripProxy("127.0.0.1", server.getsockname()[1])
+    try:
+        with socket.create_connection(("127.0.0.1", proxy.port)) as client:
+            client.sendall(b"ping")
+            assert client.recv(2) == b"ok"
+            client.sendall(b"one")  # one flight in two packets
+            client.sendall(b"two")
+            assert client.recv(2) == b"ok"
+    finally:
+        proxy.close()
+        server.close()
+
+    assert proxy.round_trips == 2
+    assert proxy.connections == 1
+
+
+def test_export_stream_counts_bytes_lines_and_chunks():
+    from flask import Flask, Response
+
+    app = Flask(__name__)
+    served = []
+
+    @app.route("/api/export")
+    def export():
+        def generate():
+            for i in range(50):
+                served.append(i)
+                yield "x" * 99 + "\n"
+        return Response(generate())
+
+    size, lines, largest = stream_export(app.test_client(), "csv")
+
+    assert (size, lines, largest) == (5000, 50, 100)
+    assert len(served) == 50
+
+
+def test_workers_get_a_thread_per_sse_stream_plus_the_voters():
+    assert worker_threads(200, 32, 2) == 132
+    assert worker_threads(10, 4, 4) == 32  # never below serve.py's default
+    assert worker_threads(200, 32, 2, threads=150) == 150
+
+    with pytest.raises(ValueError, match="at least 132 threads"):
+        worker_threads(200, 32, 2, threads=100)  # the streams alone fill every thread
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+📦 Bulk Loader Tests
+====================
+
+Synthetic votes (determinism, uniqueness, skew), CSV/JSONL round trips
+and the COPY stream against a fake connection. No Docker needed.
+"""
+
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_load
+
+
+class FakeCopy:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write_row(self, row):
+        self.rows.append(row)
+
+
+class FakeConnection:
+    """Records statements and COPY rows"""
+
+    def __init__(self):
+        self.statements = []
+        self.rows = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def copy(self, sql):
+        self.statements.append(sql)
+        return FakeCopy(self.rows)
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_synthetic_votes_are_seeded_and_unique():
+    start = datetime(2026, 1, 1)
+    first = list(bulk_load.synthetic_votes(5000, seed=3, start=start))
+    again = list(bulk_load.synthetic_votes(5000, seed=3, start=start))
+    other = list(bulk_load.synthetic_votes(5000, seed=4, start=start))
+
+    assert first == again
+    assert first != other
+    assert len({user_id for user_id, _, _ in first}) == 5000
+
+
+def test_created_at_spreads_over_the_window():
+    start = datetime(2026, 1, 1)
+    votes = list(bulk_load.synthetic_votes(100, start=start, span=timedelta(minutes=10), batch=7))
+
+    stamps = [created_at for _, _, created_at in votes]
+    assert stamps == sorted(stamps)
+    assert stamps[0] == start
+    assert start + timedelta(minutes=9) < stamps[-1] < start + timedelta(minutes=10)
+
+
+def test_skew_orders_choice_popularity():
+    skewed = Counter(choice for _, choice, _ in bulk_load.synthetic_votes(20_000, skew=1.5))
+    uniform = Counter(choice for _, choice, _ in bulk_load.synthetic_votes(20_000, skew=0))
+
+    assert [choice for choice, _ in skewed.most_common()] == list(bulk_load.DEFAULT_CHOICES)
+    assert max(uniform.values()) - min(uniform.values()) < 20_000 * 0.05
+
+
+def test_explicit_weights():
+    choices, weights = bulk_load.parse_weights(["Python=3", "Go=1"])
+    counts = Counter(choice for _, choice, _ in bulk_load.synthetic_votes(8000, choices, weights))
+
+    assert choices == ("Python", "Go")
+    assert set(counts) == {"Python", "Go"}
+    assert 2.5 < counts["Python"] / counts["Go"] < 3.5
+
+    with pytest.raises(ValueError):
+        bulk_load.parse_weights(["Python"])
+
+
+@pytest.mark.parametrize("name", ["votes.csv", "votes.jsonl"])
+def test_files_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    votes = list(bulk_load.synthetic_votes(50, start=datetime(2026, 1, 1)))
+
+    assert bulk_load.write_file(votes, path) == 50
+    reader = bulk_load.read_jsonl if name.endswith(".jsonl") else bulk_load.read_csv
+    assert list(reader(path)) == votes
+
+
+def test_missing_created_at_defaults_to_load_time(tmp_path):
+    path = tmp_path / "votes.csv"
+    path.write_text("alice,Python\nbob,Go,2026-01-01T12:00:00\n")
+
+    (alice, bob) = bulk_load.read_csv(str(path))
+
+    assert alice[:2] == ("alice", "Python")
+    assert datetime.now() - alice[2] < timedelta(minutes=1)
+    assert bob == ("bob", "Go", datetime(2026, 1, 1, 12))
+
+
+def test_copy_streams_rows_in_one_statement():
+    conn = FakeConnection()
+    votes = list(bulk_load.synthetic_votes(1000))
+
+    count = bulk_load.copy_votes(conn, iter(votes), truncate=True)
+
+    assert count == 1000
+    assert conn.rows == votes
+    assert conn.statements == ["TRUNCATE votes RESTART IDENTITY", bulk_load.COPY_VOTES, "ANALYZE votes"]
+    assert conn.commits == 1
+
+
+def test_copy_into_a_poll_adds_the_poll_column():
+    conn = FakeConnection()
+    votes = list(bulk_load.synthetic_votes(3))
+
+    bulk_load.copy_votes(conn, votes, analyze=False, poll_id=7)
+
+    assert conn.statements == [bulk_load.COPY_POLL_VOTES]
+    assert conn.rows == [(7, *vote) for vote in votes]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+📦 Bulk Load Integration Tests
+==============================
+
+bulk_load.copy_votes() against a real PostgreSQL container: a 200k-row
+COPY counted exactly, and a repeat voter rejecting the whole load.
+Needs Docker; kept out of the demo script so the dashboard's test
+comparison stays quick.
+"""
+
+import os
+import sys
+import time
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configure TestContainers
+os.environ["TESTCONTAINERS_CLOUD_ENABLED"] = "false"
+if sys.platform == "win32":
+    os.environ["DOCKER_HOST"] = "tcp://localhost:2375"
+else:
+    os.environ["DOCKER_HOST"] = "unix:///var/run/docker.sock"
+
+from testcontainers.postgres import PostgresContainer
+import psycopg
+from psycopg import IntegrityError
+
+import bulk_load
+import schema
+
+
+class TestBulkLoadWithTestContainers(unittest.TestCase):
+    """COPY into the engine's real schema"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.postgres = PostgresContainer("postgres:15-alpine")
+        cls.postgres.start()
+        cls.conninfo = {
+            "host": cls.postgres.get_container_host_ip(),
+            "port": cls.postgres.get_exposed_port(5432),
+            "user": cls.postgres.username,
+            "password": cls.postgres.password,
+            "dbname": cls.postgres.dbname,
+        }
+        with psycopg.connect(**cls.conninfo, autocommit=True) as conn:
+            schema.init_schema(conn)
+
+    @classmethod
+    def tearDownClass(cls):
+        if hasattr(cls, 'postgres'):
+            cls.postgres.stop()
+
+    def setUp(self):
+        self.conn = psycopg.connect(**self.conninfo)
+        with self.conn.cursor() as cur:
+            cur.execute("DELETE FROM votes")
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_stats_at_scale_match_generator(self):
+        """Leaderboard over 200k skewed votes (bulk-loaded with COPY) is exact"""
+        rows = 200_000
+        expected = Counter(choice for _, choice, _ in bulk_load.synthetic_votes(rows, skew=1.2, seed=7))
+
+        start = time.time()
+        loaded = bulk_load.copy_votes(self.conn, bulk_load.synthetic_votes(rows, skew=1.2, seed=7))
+        print(f"\n📦 COPY {loaded:,} votes: {time.time() - start:.1f}s")
+        self.assertEqual(loaded, rows)
+
+        cur = self.conn.cursor()
+        cur.execute("SELECT choice, COUNT(*) FROM votes GROUP BY choice ORDER BY COUNT(*) DESC")
+        leaderboard = cur.fetchall()
+        cur.close()
+        self.assertEqual(dict(leaderboard), dict(expected))
+        self.assertEqual(leaderboard[0][0], "Python", "Most skewed-to choice should lead")
+
+    def test_bulk_load_enforces_constraints(self):
+        """A repeat voter inside a COPY rejects the whole load"""
+        votes = list(bulk_load.synthetic_votes(100, seed=1))
+        votes.append(votes[0])
+
+        with self.assertRaises(IntegrityError):
+            bulk_load.copy_votes(self.conn, votes)
+        self.conn.rollback()
+
+        cur = self.conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM votes")
+        count = cur.fetchone()[0]
+        cur.close()
+        self.assertEqual(count, 0, "Nothing from the failed COPY should be visible")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
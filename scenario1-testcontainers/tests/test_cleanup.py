@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+🧹 Cleanup Tests
+================
+
+Selection by label, image and age, concurrent removal and dry runs,
+against a fake Docker API. No Docker needed.
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docker.errors import NotFound
+
+import cleanup
+
+
+NOW = 1_700_000_000
+
+
+class FakeAPI:
+    """Just enough of docker.APIClient for cleanup.py"""
+
+    def __init__(self):
+        self.by_label = {
+            "org.testcontainers=true": [
+                {"Id": "a" * 64, "Names": ["/tc_old"], "Image": "postgres:15-alpine", "Created": NOW - 7200},
+                {"Id": "b" * 64, "Names": ["/tc_new"], "Image": "redis:7-alpine", "Created": NOW - 60},
+            ],
+        }
+        self.by_image = {
+            "postgres:15-alpine": [
+                {"Id": "a" * 64, "Names": ["/tc_old"], "Image": "postgres:15-alpine", "Created": NOW - 7200},
+                {"Id": "c" * 64, "Names": ["/manual_pg"], "Image": "postgres:15-alpine", "Created": NOW - 3600},
+            ],
+        }
+        self.removed = []
+        self.lock = threading.Lock()
+        # Both real removals must be in flight together to get past this
+        self.barrier = threading.Barrier(2, timeout=2)
+
+    def containers(self, all=False, filters=None):
+        filters = filters or {}
+        if "label" in filters:
+            return list(self.by_label.get(filters["label"], []))
+        return list(self.by_image.get(filters.get("ancestor"), []))
+
+    def remove_container(self, container_id, force=False, v=False):
+        if container_id.startswith("c"):
+            raise NotFound("already reaped")
+        self.barrier.wait()
+        with self.lock:
+            self.removed.append(container_id)
+
+
+def test_parse_age():
+    """Units and plain seconds are accepted; junk is rejected"""
+    assert cleanup.parse_age("90s") == 90
+    assert cleanup.parse_age("10m") == 600
+    assert cleanup.parse_age("2h") == 7200
+    assert cleanup.parse_age("1d") == 86400
+    assert cleanup.parse_age("45") == 45
+    with pytest.raises(argparse.ArgumentTypeError):
+        cleanup.parse_age("soon")
+
+
+def test_selection_deduplicates_labels_and_images():
+    """A container matched by label and image is removed once"""
+    selected = cleanup.select_containers(FakeAPI(), cleanup.DEFAULT_LABELS, ["postgres:15-alpine"], now=NOW)
+    assert [c["Names"][0] for c in selected] == ["/tc_old", "/manual_pg", "/tc_new"]
+
+
+def test_selection_by_age():
+    """--older-than keeps young containers (a test run in progress)"""
+    selected = cleanup.select_containers(FakeAPI(), cleanup.DEFAULT_LABELS, ["postgres:15-alpine"],
+                                         min_age=1800, now=NOW)
+    assert sorted(c["Names"][0] for c in selected) == ["/manual_pg", "/tc_old"]
+
+
+def test_created_at_parses_network_and_volume_times():
+    """Networks/volumes report ISO strings with ns precision or offsets"""
+    assert cleanup.created_at({"Created": "2024-01-02T03:04:05.123456789Z"}) == pytest.approx(1704164645.123456)
+    assert cleanup.created_at({"CreatedAt": "2024-01-02T04:04:05+01:00"}) == 1704164645
+    assert cleanup.created_at({"Created": "garbage"}) is None
+
+
+def test_concurrent_removal_counts_already_gone_as_removed():
+    """Removals overlap; NotFound means someone else removed it"""
+    api = FakeAPI()
+    items = cleanup.select_containers(api, cleanup.DEFAULT_LABELS, ["postgres:15-alpine"], now=NOW)
+
+    removed, failed = cleanup.remove_all(items, lambda c: api.remove_container(c["Id"], force=True), workers=8)
+
+    assert removed == 3 and failed == []
+    assert len(api.removed) == 2
+
+
+def test_failures_are_reported_not_raised():
+    """One stuck container doesn't abort the sweep"""
+    def remove(item):
+        if item == "stuck":
+            raise RuntimeError("device busy")
+
+    removed, failed = cleanup.remove_all(["ok", "stuck", "ok2"], remove)
+    assert removed == 2
+    assert [(item, str(error)) for item, error in failed] == [("stuck", "device busy")]
+
+
+def test_dry_run_removes_nothing(capsys):
+    """Dry run lists the selection and calls no remover"""
+    calls = []
+    phase = cleanup.run_phase("Containers", [{"Id": "d" * 64, "Names": ["/x"], "Image": "i", "State": "exited"}],
+                              cleanup.describe_container, calls.append, dry_run=True)
+    assert calls == []
+    assert phase.found == 1 and phase.removed == 0
+    assert "would remove x (i, exited)" in capsys.readouterr().out
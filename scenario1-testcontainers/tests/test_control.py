@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+🎛️ Control Channel Tests
+========================
+
+cleanup.py must get an orderly shutdown from a healthy engine, escalate
+on a hung one, and never signal a PID whose registration is stale.
+Uses real subprocesses on loopback. No Docker needed.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+import control
+
+
+def spawn(tmp_path, shutdown_body):
+    """Start a process with a control channel; wait until it registers"""
+    script = textwrap.dedent(f"""
+        import sys, time
+        sys.path.insert(0, {HERE!r})
+        import control
+
+        def on_shutdown():
+        {textwrap.indent(textwrap.dedent(shutdown_body), '    ')}
+
+        control.ControlServer("fake_engine", on_shutdown).start()
+        while True:
+            time.sleep(0.1)
+    """)
+    env = dict(os.environ, TMPDIR=str(tmp_path), TEMP=str(tmp_path), TMP=str(tmp_path))
+    proc = subprocess.Popen([sys.executable, "-c", script], env=env)
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        entries = [e for e in control.registered() if e["pid"] == proc.pid]
+        if entries:
+            return proc, entries[0]
+        time.sleep(0.05)
+    proc.kill()
+    pytest.fail("control channel never registered")
+
+
+@pytest.fixture(autouse=True)
+def run_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(control, "RUN_DIR", os.path.join(str(tmp_path), "reality-engine"))
+
+
+def test_ping_requires_token(tmp_path):
+    """Commands without the PID file's token are refused"""
+    proc, entry = spawn(tmp_path, "return {}")
+    try:
+        assert control.request(entry, "ping")["app"] == "fake_engine"
+        assert control.request(dict(entry, token="wrong"), "ping") == {"ok": False, "error": "bad token"}
+        assert oct(os.stat(control.pid_file_path(proc.pid)).st_mode & 0o777) == "0o600"
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_graceful_shutdown_returns_summary(tmp_path):
+    """The engine's own cleanup runs, then the process exits by itself"""
+    proc, entry = spawn(tmp_path, 'return {"containers_stopped": ["postgres"]}')
+
+    outcome = control.stop(entry, timeout=5)
+
+    assert outcome["method"] == "graceful"
+    assert outcome["summary"] == {"containers_stopped": ["postgres"]}
+    assert proc.wait(timeout=5) == 0
+    assert not os.path.exists(control.pid_file_path(proc.pid))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX signals")
+def test_hung_shutdown_escalates(tmp_path):
+    """A shutdown that overruns the timeout ends in SIGTERM"""
+    proc, entry = spawn(tmp_path, "time.sleep(60)")
+
+    outcome = control.stop(entry, timeout=0.5, grace=3)
+
+    assert outcome["method"] == "terminated"
+    assert proc.wait(timeout=5) != 0
+
+
+def test_stale_registration_is_not_signalled(tmp_path):
+    """Nothing listening on the port: remove the file, send no signal"""
+    sleeper = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        os.makedirs(control.RUN_DIR, exist_ok=True)
+        with open(control.pid_file_path(sleeper.pid), "w") as f:
+            json.dump({"pid": sleeper.pid, "app": "gone", "port": 1, "token": "x"}, f)
+
+        outcome = control.stop(control.registered()[0], timeout=1)
+
+        assert outcome["method"] == "stale"
+        assert sleeper.poll() is None  # untouched
+        assert control.registered() == []
+    finally:
+        sleeper.kill()
+        sleeper.wait()
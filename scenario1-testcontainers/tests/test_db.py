@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+🔌 DB Layer Tests
+=================
+
+Connection pooling (reuse, discard, close), the query helpers and the
+streaming export, against fake psycopg connections. No Docker needed.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from psycopg import pq
+
+import db
+import schema
+
+
+class FakeCursor:
+    def __init__(self, rows, rowcount=1):
+        self.rows = rows
+        self.rowcount = rowcount
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0]
+
+
+class FakeConnection:
+    """Records statements; just enough of psycopg.Connection for db.py"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.executed = []
+        self.inserted = 1
+        self.closed = False
+        self.broken = False
+        self.info = type("Info", (), {"transaction_status": pq.TransactionStatus.IDLE})()
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if sql == db.INSERT_VOTE:
+            return FakeCursor([], rowcount=self.inserted)
+        return FakeCursor([("Python", 4), ("Go", 3)])
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool():
+    opened = []
+
+    def connect(**kwargs):
+        opened.append(FakeConnection(**kwargs))
+        return opened[-1]
+
+    pool = db.ConnectionPool({"host": "h", "port": 1}, max_idle=2, connect=connect)
+    pool.opened_connections = opened
+    return pool
+
+
+def test_connections_are_reused_with_prepared_statements(pool):
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert first.kwargs == {"host": "h", "port": 1, "autocommit": True, "prepare_threshold": 0}
+    assert pool.stats() == {"opened": 1, "reused": 1, "idle": 1, "in_use": 0, "max_size": db.POOL_MAX_SIZE}
+
+
+def test_broken_or_mid_transaction_connections_are_discarded(pool):
+    with pool.connection() as conn:
+        conn.broken = True
+    with pool.connection() as other:
+        other.info.transaction_status = pq.TransactionStatus.INERROR
+
+    assert conn.closed and other.closed
+    assert pool.stats()["idle"] == 0
+
+
+def test_connection_is_released_when_the_query_fails(pool):
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            raise RuntimeError("duplicate vote")
+
+    assert pool.stats()["idle"] == 1
+
+
+def test_idle_connections_are_capped(pool):
+    barrier = threading.Barrier(3, timeout=2)
+
+    def hold():
+        with pool.connection():
+            barrier.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.stats() == {"opened": 3, "reused": 0, "idle": 2, "in_use": 0, "max_size": db.POOL_MAX_SIZE}
+    assert sum(conn.closed for conn in pool.opened_connections) == 1
+
+
+def test_checkouts_beyond_max_size_wait_then_fail():
+    pool = db.ConnectionPool({}, max_idle=1, max_size=2, timeout=0.05, connect=FakeConnection)
+
+    with pool.connection(), pool.connection():
+        assert pool.stats()["in_use"] == 2
+        with pytest.raises(db.PoolExhausted):
+            with pool.connection():
+                pass
+    with pool.connection():  # handed back: free again
+        pass
+    assert pool.stats()["opened"] == 2
+
+
+def test_a_failed_connect_gives_its_slot_back():
+    def refuse(**kwargs):
+        raise OSError("connection refused")
+
+    pool = db.ConnectionPool({}, max_size=1, timeout=0.05, connect=refuse)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            with pool.connection():
+                pass
+
+
+class FakeAsyncConnection(FakeConnection):
+    async def close(self):
+        self.closed = True
+
+
+def test_async_pool_reuses_and_caps_connections():
+    async def connect(**kwargs):
+        return FakeAsyncConnection(**kwargs)
+
+    async def run():
+        pool = db.AsyncConnectionPool({"host": "h"}, max_idle=1, max_size=2, timeout=0.05, connect=connect)
+        async with pool.connection() as first:
+            pass
+        async with pool.connection() as second, pool.connection() as third:
+            with pytest.raises(db.PoolExhausted):
+                async with pool.connection():
+                    pass
+            third.broken = True
+        assert first is second and third.closed
+        assert first.kwargs == {"host": "h", "autocommit": True, "prepare_threshold": 0}
+        assert pool.stats() == {"opened": 2, "reused": 1, "idle": 1, "in_use": 0, "max_size": 2}
+        await pool.close()
+        assert first.closed
+
+    asyncio.run(run())
+
+
+def test_close_closes_idle_and_later_released_connections(pool):
+    with pool.connection() as busy:
+        with pool.connection() as idle:
+            pass
+        pool.close()
+        assert idle.closed and not busy.closed
+
+    assert busy.closed
+
+
+def test_stats_read_one_polls_tallies(pool):
+    with pool.connection() as conn:
+        rows, total = db.fetch_stats(conn, poll_id=3)
+
+    assert rows == [("Python", 4), ("Go", 3)]
+    assert total == 7
+    assert conn.executed == [(db.POLL_TALLIES, (3,))]
+
+
+def test_vote_is_a_single_statement(pool):
+    with pool.connection() as conn:
+        assert db.insert_vote(conn, "u1", "Rust")
+
+    assert conn.executed == [(db.INSERT_VOTE, {"poll_id": db.DEFAULT_POLL_ID, "user_id": "u1", "choice": "Rust"})]
+
+
+def test_vote_refused_by_the_poll_is_reported(pool):
+    with pool.connection() as conn:
+        conn.inserted = 0
+        assert not db.insert_vote(conn, "u1", "Rust", poll_id=9)
+
+
+def test_counted_vote_reads_its_tally_in_the_same_transaction():
+    conn = ExportConnection([(12,)])
+    conn.execute = lambda sql, params=None: (conn.log.append(sql), FakeCursor(conn.rows))[1]
+
+    assert db.insert_counted_vote(conn, "u1", "Go", poll_id=2) == 12
+    assert conn.log == ["begin", db.INSERT_VOTE, db.TALLY_COUNT, "commit"]
+
+    refused = ExportConnection([])
+    refused.execute = lambda sql, params=None: (refused.log.append(sql), FakeCursor([], rowcount=0))[1]
+    assert db.insert_counted_vote(refused, "u1", "Go", poll_id=9) is None
+    assert refused.log == ["begin", db.INSERT_VOTE, "commit"]
+
+
+def test_poll_rejections_explain_why():
+    open_poll = db.poll_dict((2, "Tabs or spaces?", ["Tabs", "Spaces"], None, None))
+    closed_poll = db.poll_dict((3, "Vim or Emacs?", [], None, datetime(2026, 1, 1)))
+
+    assert db.poll_rejection(None, "Go") == (404, "No such poll")
+    assert db.poll_rejection(closed_poll, "Vim") == (409, "This poll is closed")
+    status, message = db.poll_rejection(open_poll, "Both")
+    assert status == 400 and "Tabs, Spaces" in message
+    assert open_poll["open"] and not closed_poll["open"]
+    assert closed_poll["closed_at"] == "2026-01-01T00:00:00"
+
+
+def test_voter_keys_are_per_poll():
+    assert db.voter_key(1, "abc") != db.voter_key(2, "abc")
+    assert db.voter_key(1, "abc") == "1:abc"
+
+
+class FakeNamedCursor:
+    """Server-side cursor serving `rows` through fetchmany()"""
+
+    def __init__(self, conn, name, rows):
+        self.conn = conn
+        self.name = name
+        self.rows = rows
+        self.fetches = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.log.append("close cursor")
+        return False
+
+    def execute(self, sql, params):
+        self.conn.log.append(("declare", self.name, sql, params))
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        self.fetches.append(len(batch))
+        return batch
+
+
+class ExportConnection:
+    def __init__(self, rows):
+        self.log = []
+        self.rows = rows
+        self.cursors = []
+
+    def transaction(self):
+        conn = self
+
+        class Transaction:
+            def __enter__(self):
+                conn.log.append("begin")
+
+            def __exit__(self, *exc):
+                conn.log.append("rollback" if exc[0] else "commit")
+                return False
+
+        return Transaction()
+
+    def execute(self, sql, params=None):
+        self.log.append(sql)
+        return FakeCursor(self.rows)
+
+    def cursor(self, name=None):
+        self.cursors.append(FakeNamedCursor(self, name, self.rows))
+        return self.cursors[-1]
+
+
+def test_export_query_filters():
+    since = datetime(2026, 1, 1)
+
+    assert db.export_query() == ("SELECT id, poll_id, user_id, choice, created_at FROM votes ORDER BY id", [])
+    sql, params = db.export_query(since=since, choice="Go", poll_id=2)
+    assert sql.endswith("WHERE poll_id = %s AND created_at >= %s AND choice = %s ORDER BY id")
+    assert params == [2, since, "Go"]
+
+
+def test_export_fetches_in_batches_from_a_server_side_cursor():
+    conn = ExportConnection([(i, 1, f"u{i}", "Go", None) for i in range(5)])
+
+    batches = list(db.export_batches(conn, choice="Go", batch=2))
+
+    assert [len(rows) for rows in batches] == [2, 2, 1]
+    assert conn.cursors[0].name == "vote_export"
+    assert conn.cursors[0].fetches == [2, 2, 1, 0]
+    assert conn.log[0] == "begin"
+    assert conn.log[1][3] == ["Go"]
+    assert conn.log[2:] == ["close cursor", "commit"]
+
+
+def test_abandoned_export_releases_cursor_and_transaction():
+    conn = ExportConnection([(i, 1, f"u{i}", "Go", None) for i in range(10)])
+
+    batches = db.export_batches(conn, batch=2)
+    next(batches)
+    batches.close()  # client went away mid-stream
+
+    assert conn.log[-2:] == ["close cursor", "rollback"]
+
+
+def test_rows_encode_as_csv_and_ndjson():
+    rows = [(1, 1, "alice", "Python", datetime(2026, 1, 1, 12)), (2, 1, 'bo,"b', "Go", None)]
+
+    assert db.export_header("csv") == "id,poll_id,user_id,choice,created_at\n"
+    assert db.encode_rows(rows, "csv") == '1,1,alice,Python,2026-01-01T12:00:00\n2,1,"bo,""b",Go,\n'
+
+    assert db.export_header("ndjson") == ""
+    lines = db.encode_rows(rows, "ndjson").splitlines()
+    assert json.loads(lines[0]) == {"id": 1, "poll_id": 1, "user_id": "alice", "choice": "Python",
+                                    "created_at": "2026-01-01T12:00:00"}
+    assert json.loads(lines[1])["created_at"] is None
+
+
+def test_rate_history_is_one_grouped_query(pool):
+    with pool.connection() as conn:
+        db.vote_ages(conn, 7200)
+
+    assert conn.executed == [(db.VOTE_AGES, (7200,))]
+
+
+def test_recount_aggregates_partitionwise_in_a_transaction():
+    conn = ExportConnection([("Python", 4), ("Go", 3)])
+
+    assert db.count_votes(conn, poll_id=2) == ([("Python", 4), ("Go", 3)], 7)
+    assert conn.log == ["begin", db.PARTITIONWISE, db.COUNT_VOTES, "commit"]
+
+
+def test_votes_table_is_plain_or_hash_partitioned():
+    plain = schema.votes_ddl(0)
+    partitioned = schema.votes_ddl(4)
+
+    assert "PRIMARY KEY" in plain and "PARTITION" not in plain
+    assert "PARTITION BY HASH (user_id)" in partitioned
+    assert "PRIMARY KEY" not in partitioned  # would have to include user_id
+    assert "UNIQUE (poll_id, user_id)" in partitioned
+    assert [f"votes_p{i}" in partitioned for i in range(5)] == [True] * 4 + [False]
+    assert "(MODULUS 4, REMAINDER 3)" in partitioned
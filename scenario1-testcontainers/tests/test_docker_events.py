@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+🐳 Docker Event Tracking Tests
+==============================
+
+The container table must follow create/start/die/destroy exactly,
+including containers that live for milliseconds. Events are built by
+hand in the daemon's format. No Docker needed.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docker_events import ContainerTable, Subscriber, action_of, is_testcontainer, short_image, translate
+
+
+def docker_event(action, container_id="abc123def456789", at=100.0, **attributes):
+    attributes.setdefault("name", "brave_turing")
+    attributes.setdefault("image", "postgres:15-alpine")
+    return {
+        "Type": "container",
+        "Action": action,
+        "Actor": {"ID": container_id, "Attributes": attributes},
+        "time": int(at),
+        "timeNano": int(at * 1e9),
+    }
+
+
+def test_short_lived_container_lifetime():
+    """A 250ms container is tracked from start to removal"""
+    table = ContainerTable()
+    table.apply(docker_event("create", at=100.0))
+    table.apply(docker_event("start", at=100.0))
+    assert [r.name for r in table.running()] == ["brave_turing"]
+
+    action, record = table.apply(docker_event("die", at=100.25, exitCode="0"))
+    assert action == "die"
+    assert abs(record.lifetime() - 0.25) < 1e-6
+    assert record.exit_code == 0
+
+    table.apply(docker_event("destroy", at=100.3))
+    assert table.running() == []
+    assert table.live == {}
+
+    stats = table.stats()
+    assert stats["started"] == 1 and stats["finished"] == 1
+    assert abs(stats["lifetime_mean"] - 0.25) < 1e-6
+
+
+def test_destroy_without_die_still_finishes():
+    """docker rm -f can skip a separate die in the stream we see"""
+    table = ContainerTable()
+    table.apply(docker_event("start", at=10.0))
+    table.apply(docker_event("destroy", at=12.0))
+    assert table.stats()["finished"] == 1
+    assert table.recent()[0].lifetime() == 2.0
+
+
+def test_irrelevant_events_are_ignored():
+    """exec/attach events and unknown containers don't touch the table"""
+    table = ContainerTable()
+    assert table.apply(docker_event("exec_start: sh")) is None
+    assert table.apply(docker_event("die", container_id="unseen")) is None
+    assert table.apply({"Type": "network", "Action": "connect"}) is None
+    assert table.live == {}
+
+
+def test_health_status_is_recorded():
+    """'health_status: healthy' is split into action and value"""
+    assert action_of({"Action": "health_status: healthy"}) == ("health_status", "healthy")
+
+    table = ContainerTable()
+    table.apply(docker_event("start"))
+    table.apply(docker_event("health_status: healthy"))
+    assert table.running()[0].health == "healthy"
+
+
+def test_history_is_bounded():
+    """Finished containers beyond the history size are forgotten"""
+    table = ContainerTable(history=3)
+    for i in range(5):
+        cid = f"container{i:02d}"
+        table.apply(docker_event("start", container_id=cid, at=i))
+        table.apply(docker_event("destroy", container_id=cid, at=i + 1))
+    assert len(table.recent(10)) == 3
+    assert table.stats()["finished"] == 5
+
+
+def test_testcontainer_detection():
+    """Labels, Ryuk and the workshop images count; other images don't"""
+    assert is_testcontainer({"image": "nginx", "org.testcontainers.lang": "python"})
+    assert is_testcontainer({"image": "testcontainers/ryuk:0.5.1"})
+    assert is_testcontainer({"image": "redis:7-alpine"})
+    assert not is_testcontainer({"image": "nginx"})
+
+
+def test_translate_reports_durations():
+    """Dashboard events carry the daemon's timing, not ours"""
+    table = ContainerTable()
+    table.apply(docker_event("create", at=100.0))
+    _, record = table.apply(docker_event("start", at=100.5))
+
+    event_type, container, details = translate("start", record, 100.5)
+    assert (event_type, container) == ("docker_started", "postgres")
+    assert details["create_to_start_ms"] == 500.0
+
+    _, record = table.apply(docker_event("die", at=103.0, exitCode="137"))
+    event_type, _, details = translate("die", record, 103.0)
+    assert event_type == "docker_died"
+    assert details["lifetime_ms"] == 2500.0
+    assert details["exit_code"] == 137
+
+
+def test_subscriber_filters_and_deduplicates():
+    """Only TestContainers/workshop containers reach the callback, once each"""
+    received = []
+    subscriber = Subscriber(lambda *event: received.append(event))
+
+    subscriber._handle(docker_event("start", at=1.0, image="nginx", name="web"))
+    subscriber._handle(docker_event("start", container_id="tc1", at=2.0, image="redis:7-alpine"))
+    subscriber._handle(docker_event("start", container_id="tc1", at=2.0, image="redis:7-alpine"))
+
+    assert [(t, c) for t, c, _ in received] == [("docker_started", "redis")]
+    assert short_image("testcontainers/ryuk:0.5.1") == "ryuk"
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+📣 Event Bus Tests
+==================
+
+Payloads must fit in a NOTIFY, junk on the channel must be ignored and
+publishing must never break the caller. No Docker needed.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import event_bus
+from shared_state import make_event
+
+
+def test_round_trip():
+    """decode(encode(event)) gives the event back"""
+    event = make_event("test_complete", "testcontainers", {"time": 1.5})
+    assert event_bus.decode(event_bus.encode(event)) == event
+
+
+def test_oversized_details_are_summarized():
+    """Payloads stay under the Postgres NOTIFY limit"""
+    event = make_event("test_output", "mock", {"stdout": "x" * 20000})
+    payload = event_bus.encode(event)
+
+    assert len(payload.encode("utf-8")) <= event_bus.MAX_PAYLOAD
+    decoded = event_bus.decode(payload)
+    assert decoded["type"] == "test_output"
+    assert decoded["details"]["truncated"] is True
+
+
+def test_malformed_payloads_are_rejected():
+    """Anything that isn't an event is dropped"""
+    assert event_bus.decode("not json") is None
+    assert event_bus.decode(json.dumps([1, 2, 3])) is None
+    assert event_bus.decode(json.dumps({"type": "x"})) is None
+
+
+def test_publish_without_dsn_is_a_no_op(monkeypatch):
+    """Scripts run standalone don't try to reach a dashboard"""
+    monkeypatch.delenv(event_bus.DSN_ENV, raising=False)
+    assert event_bus.publish("test_starting", "mock") is False
+
+
+def test_publish_to_unreachable_dashboard_does_not_raise():
+    """A dead dashboard must not fail the test run"""
+    dsn = "host=127.0.0.1 port=1 user=x dbname=x connect_timeout=1"
+    assert event_bus.publish("test_starting", "mock", dsn=dsn) is False
+
+
+def test_listener_delivers_valid_events_only():
+    """Malformed payloads are skipped; a failing handler doesn't kill the thread"""
+    received = []
+    listener = event_bus.Listener(lambda: {}, received.append)
+
+    event = make_event("ready", "testcontainers")
+    listener._deliver(event_bus.encode(event))
+    listener._deliver("garbage")
+
+    assert received == [event]
+    assert listener.received == 1
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    listener.on_event = broken
+    listener._deliver(event_bus.encode(event))
+    assert listener.received == 2
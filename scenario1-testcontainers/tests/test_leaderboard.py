@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+🏆 Leaderboard Tests
+====================
+
+The board's record / load / clear cycle and the rank-change feed, against
+a dict-backed fake Redis. The Lua scripts themselves run in the Docker tests.
+No Docker needed.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import leaderboard
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """Strings, hashes, sets and sorted sets in dicts; the scripts emulated without the publish"""
+
+    def __init__(self):
+        self.data = {}
+
+    def register_script(self, script):
+        return {leaderboard.RECORD: self._record, leaderboard.LOAD: self._load,
+                leaderboard.CLEAR: self._clear}[script]
+
+    def _raise(self, board, counts, shard, choice, tally):
+        seen = self.data.setdefault(counts, {}).get(f"{shard}:{choice}", 0)
+        if tally <= seen:
+            return 0
+        self.data[counts][f"{shard}:{choice}"] = tally
+        scores = self.data.setdefault(board, {})
+        scores[choice] = scores.get(choice, 0) + tally - seen
+        return tally - seen
+
+    def _record(self, keys, args):
+        board, counts, epoch, polls = keys
+        choice, shard, tally, expected, poll_id, _ = args
+        if self.data.get(epoch, "0") != expected:
+            return None
+        if not self._raise(board, counts, shard, choice, tally):
+            return None
+        self.data.setdefault(polls, set()).add(str(poll_id))
+        return [self.data[board][choice], 0, 1]
+
+    def _load(self, keys, args):
+        board, counts, loaded, epoch, polls = keys
+        if self.data.get(epoch, "0") != args[0]:
+            return None
+        raised = sum(self._raise(board, counts, *args[i:i + 3]) for i in range(2, len(args), 3))
+        self.data.setdefault(polls, set()).add(str(args[1]))
+        was_loaded = int(loaded in self.data)
+        self.data[loaded] = 1
+        return [was_loaded, raised]
+
+    def _clear(self, keys, args):
+        epoch, polls = keys
+        for poll_id in self.data.pop(polls, set()):
+            self.delete(*leaderboard.board_keys(poll_id))
+        self.data[epoch] = str(int(self.data.get(epoch, "0")) + 1)
+        return int(self.data[epoch])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def zrevrange(self, key, start, end, withscores=False):
+        pairs = sorted(self.data.get(key, {}).items(), key=lambda item: (-item[1], item[0]))
+        return [(choice, float(score)) for choice, score in pairs]
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def test_an_unloaded_board_counts_but_answers_nothing():
+    board = leaderboard.Leaderboard(FakeRedis())
+    epoch = board.epoch()
+
+    assert board.standings(1) is None
+    board.record(1, "Python", 0, 1, epoch)
+    assert board.standings(1) is None  # read from Postgres until it's loaded
+    assert board.load(1, [[("Python", 1)]], epoch) == (False, 0)  # already counted
+    assert board.standings(1) == ([("Python", 1)], 1)
+
+
+def test_loaded_board_counts_and_ranks():
+    board = leaderboard.Leaderboard(FakeRedis())
+    epoch = board.epoch()
+    board.load(1, [[("Go", 2), ("Python", 1), ("Rust", 0)]], epoch)
+
+    assert board.record(1, "Python", 0, 2, epoch) == (2, 0, 1)
+    board.record(1, "Python", 0, 3, epoch)
+
+    assert board.standings(1) == ([("Python", 3), ("Go", 2)], 5)
+    assert board.standings(2) is None  # boards are per poll
+
+
+def test_a_vote_is_counted_once_however_late_it_lands():
+    board = leaderboard.Leaderboard(FakeRedis())
+    epoch = board.epoch()
+    board.load(1, [[("Go", 4)]], epoch)
+
+    board.record(1, "Go", 0, 6, epoch)  # overtook the vote that made it 5
+    assert board.record(1, "Go", 0, 5, epoch) is None  # ... which landed late
+    assert board.load(1, [[("Go", 6)]], epoch) == (True, 0)  # a reload already saw both
+    assert board.standings(1) == ([("Go", 6)], 6)
+
+
+def test_reconcile_adds_only_what_the_board_missed():
+    board = leaderboard.Leaderboard(FakeRedis())
+    epoch = board.epoch()
+    board.load(1, [[("Go", 1)], [("Go", 2)]], epoch)
+
+    board.record(1, "Go", 1, 3, epoch)
+    # Shard 0's second Go vote never reached Redis; its Rust vote neither
+    assert board.load(1, [[("Go", 2), ("Rust", 1)], [("Go", 3)]], epoch) == (True, 2)
+    assert board.standings(1) == ([("Go", 5), ("Rust", 1)], 6)
+
+
+def test_clear_refuses_whatever_was_counted_before_it():
+    board = leaderboard.Leaderboard(FakeRedis())
+    before = board.epoch()
+    board.load(1, [[("Go", 1)]], before)
+    board.load(2, [[("Tabs", 1)]], before)
+
+    board.clear()
+
+    assert board.standings(1) is None and board.standings(2) is None
+    assert board.record(1, "Go", 0, 2, before) is None  # in flight across the reset
+    assert board.load(1, [[("Go", 2)]], before) is None  # read Postgres before the reset
+    after = board.epoch()
+    assert after != before
+    board.record(1, "Go", 0, 1, after)
+    assert board.load(1, [[("Go", 1)]], after) == (False, 0)
+    assert board.standings(1) == ([("Go", 1)], 1)
+
+
+def test_invalidate_sends_reads_back_to_postgres():
+    board = leaderboard.Leaderboard(FakeRedis())
+    epoch = board.epoch()
+    board.load(1, [[("Go", 1)]], epoch)
+    board.load(2, [[("Tabs", 1)]], epoch)
+
+    board.invalidate(1)
+    assert board.standings(1) is None
+    assert board.standings(2) is not None
+
+
+def test_only_one_process_claims_a_reconcile():
+    board = leaderboard.Leaderboard(FakeRedis())
+
+    assert board.claim_reconcile(27.0)
+    assert not board.claim_reconcile(27.0)
+
+
+def test_rank_changes_decode_with_standings():
+    payload = json.dumps({"poll_id": 1, "choice": "Go", "rank": 1, "previous_rank": 2,
+                          "standings": ["Go", "3", "Python", "2"]})
+
+    change = leaderboard.decode_change(payload)
+
+    assert change["standings"] == [{"choice": "Go", "count": 3}, {"choice": "Python", "count": 2}]
+    assert change["total_votes"] == 5
+    assert leaderboard.decode_change("not json") is None
+    assert leaderboard.decode_change(json.dumps({"standings": ["Go"]})) is None
+
+
+def test_feed_hands_each_subscriber_only_newer_changes():
+    feed = leaderboard.RankFeed(lambda: None, keep=3)
+    start = feed.sequence
+
+    feed._deliver(json.dumps({"poll_id": 1, "choice": "Go", "standings": ["Go", "1"]}))
+    feed._deliver("garbage")
+    sequence, changes = feed.since(start)
+    assert [json.loads(c)["choice"] for c in changes] == ["Go"]
+
+    for choice in ("Rust", "Java", "Python", "C"):
+        feed.add({"choice": choice})
+    sequence, changes = feed.since(sequence)
+    assert [json.loads(c)["choice"] for c in changes] == ["Java", "Python", "C"]  # only the last `keep`
+    assert feed.since(sequence) == (sequence, [])
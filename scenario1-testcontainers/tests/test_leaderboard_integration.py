@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+🏆 Leaderboard Integration Tests
+================================
+
+The leaderboard's Lua scripts in a real Redis container: ranking and
+rank-change pub/sub, a rebuild from PostgreSQL tallies, and resets that
+refuse anything counted before them. Needs Docker; kept out of the demo
+script so the dashboard's test comparison stays quick.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configure TestContainers
+os.environ["TESTCONTAINERS_CLOUD_ENABLED"] = "false"
+if sys.platform == "win32":
+    os.environ["DOCKER_HOST"] = "tcp://localhost:2375"
+else:
+    os.environ["DOCKER_HOST"] = "unix:///var/run/docker.sock"
+
+from testcontainers.postgres import PostgresContainer
+from testcontainers.redis import RedisContainer
+import psycopg
+import redis
+
+import db
+import leaderboard
+import schema
+
+
+class TestLeaderboardWithTestContainers(unittest.TestCase):
+    """The Redis leaderboard's Lua script, rank-change pub/sub and a rebuild from Postgres"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.redis = RedisContainer("redis:7-alpine")
+        cls.redis.start()
+        cls.postgres = PostgresContainer("postgres:15-alpine")
+        cls.postgres.start()
+        cls.conninfo = {
+            "host": cls.postgres.get_container_host_ip(),
+            "port": cls.postgres.get_exposed_port(5432),
+            "user": cls.postgres.username,
+            "password": cls.postgres.password,
+            "dbname": cls.postgres.dbname,
+        }
+        with psycopg.connect(**cls.conninfo, autocommit=True) as conn:
+            schema.init_schema(conn)
+
+    @classmethod
+    def tearDownClass(cls):
+        for name in ('redis', 'postgres'):
+            if hasattr(cls, name):
+                getattr(cls, name).stop()
+
+    def setUp(self):
+        self.client = redis.Redis(host=self.redis.get_container_host_ip(),
+                                  port=self.redis.get_exposed_port(6379), decode_responses=True)
+        self.client.flushall()
+        self.board = leaderboard.Leaderboard(self.client)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_votes_rerank_and_publish_rank_changes(self):
+        """Overtaking publishes the new standings; a vote that changes no rank publishes nothing"""
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(leaderboard.CHANNEL)
+        epoch = self.board.epoch()
+        self.board.load(1, [[("Python", 2), ("Go", 1)]], epoch)
+
+        self.assertEqual(self.board.record(1, "Python", 0, 3, epoch), (3, 1, 1))
+        self.assertEqual(self.board.record(1, "Go", 0, 2, epoch), (2, 2, 2))
+        self.assertEqual(self.board.record(1, "Go", 0, 3, epoch), (3, 2, 2))  # a tie ranks Python first (reverse lex order)
+        self.assertEqual(self.board.record(1, "Go", 0, 4, epoch), (4, 2, 1))
+        self.assertIsNone(self.board.record(1, "Go", 0, 3, epoch))  # landed late: already counted
+        self.assertEqual(self.board.standings(1), ([("Go", 4), ("Python", 3)], 7))
+
+        changes = []
+        deadline = time.time() + 5
+        while not changes and time.time() < deadline:
+            message = pubsub.get_message(timeout=0.5)
+            if message:
+                changes.append(leaderboard.decode_change(message["data"]))
+        pubsub.close()
+        self.assertEqual(len(changes), 1)
+        self.assertEqual((changes[0]["choice"], changes[0]["rank"], changes[0]["previous_rank"]), ("Go", 1, 2))
+        self.assertEqual(changes[0]["total_votes"], 7)
+
+    def test_empty_redis_is_rebuilt_from_postgres(self):
+        """After a Redis restart (here: FLUSHALL) nothing stale is served and a load counts each vote once"""
+        epoch = self.board.epoch()
+        with psycopg.connect(**self.conninfo, autocommit=True) as conn:
+            db.delete_votes(conn)
+            tallies = [db.insert_counted_vote(conn, f"user{n}", choice)
+                       for n, choice in enumerate(["Python", "Python", "Go"])]
+            rows, total = db.fetch_stats(conn)
+        self.assertEqual(tallies, [1, 2, 1])
+
+        self.board.record(1, "Python", 0, 2, epoch)
+        self.assertIsNone(self.board.standings(1))  # not loaded: Postgres answers
+        self.assertEqual(self.board.load(1, [rows], epoch), (False, 2))  # Python's first vote and Go's
+        self.assertEqual(self.board.standings(1), ([("Python", 2), ("Go", 1)], total))
+
+    def test_clear_refuses_votes_from_before_it(self):
+        """A vote or load that read the epoch before a reset never lands on the new board"""
+        before = self.board.epoch()
+        self.board.load(1, [[("Python", 5)]], before)
+        self.board.load(2, [[("Tabs", 1)]], before)
+
+        self.board.clear()
+
+        self.assertIsNone(self.board.standings(2))
+        self.assertIsNone(self.board.record(1, "Python", 0, 6, before))
+        self.assertIsNone(self.board.load(1, [[("Python", 6)]], before))
+        after = self.board.epoch()
+        self.assertEqual(self.board.load(1, [[]], after), (False, 0))
+        self.assertEqual(self.board.standings(1), ([], 0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
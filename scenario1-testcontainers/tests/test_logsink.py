@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+📜 Log Sink Tests
+=================
+
+Logging must be off the request path: records go through a queue,
+come out as JSON lines, and console echo is rate-limited.
+No Docker needed.
+"""
+
+import io
+import json
+import logging
+import os
+import queue
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logsink import DeferredQueueHandler, JsonFormatter, LogSink, RateLimitedStreamHandler
+
+
+def test_json_lines_include_extra_fields(tmp_path):
+    """Structured fields passed via extra= end up in the JSON file"""
+    log_file = tmp_path / "engine.jsonl"
+    sink = LogSink(log_file=str(log_file), stream=io.StringIO())
+    logger = logging.getLogger("test_logsink.json")
+    logger.propagate = False
+    sink.install(logger)
+
+    logger.info("📡 EVENT: %s", "vote_success", extra={"event": {"type": "vote_success"}})
+    sink.stop()
+
+    record = json.loads(log_file.read_text(encoding="utf-8").splitlines()[0])
+    assert record["message"] == "📡 EVENT: vote_success"
+    assert record["event"] == {"type": "vote_success"}
+    assert record["level"] == "INFO"
+
+
+def test_console_is_rate_limited():
+    """A burst beyond the budget is dropped and summarized"""
+    stream = io.StringIO()
+    handler = RateLimitedStreamHandler(stream, rate=5)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    for i in range(50):
+        handler.emit(logging.LogRecord("t", logging.INFO, "", 0, f"line {i}", (), None))
+    handler.flush()
+
+    output = stream.getvalue().splitlines()
+    assert output[:5] == [f"line {i}" for i in range(5)]
+    assert "45 log line(s) suppressed" in output[-1]
+
+
+def test_records_are_written_by_listener_thread():
+    """The caller only enqueues; the listener thread formats and writes"""
+    stream = io.StringIO()
+    sink = LogSink(stream=stream, console_format="json", console_rate=0)
+    logger = logging.getLogger("test_logsink.thread")
+    logger.propagate = False
+    sink.install(logger)
+
+    logger.warning("slow terminal")
+    sink.stop()
+
+    record = json.loads(stream.getvalue())
+    assert record["message"] == "slow terminal"
+    assert record["thread"] == "MainThread"  # thread that *logged* it
+
+
+def test_arguments_are_captured_when_logged():
+    """A caller changing its arguments after the call doesn't change the queued line"""
+    records = queue.Queue()
+    logger = logging.getLogger("test_logsink.args")
+    logger.propagate = False
+    logger.addHandler(DeferredQueueHandler(records))
+
+    pending = ["GET /containers/json"]
+    logger.warning("docker: %s", pending)
+    pending[0] = "changed before the listener got to it"
+
+    assert records.get_nowait().getMessage() == "docker: ['GET /containers/json']"
+
+
+def test_formatter_handles_exceptions():
+    """Exception info is serialized, not lost"""
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record = logging.LogRecord("t", logging.ERROR, "", 0, "failed", (), sys.exc_info())
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert "RuntimeError: boom" in payload["exc"]
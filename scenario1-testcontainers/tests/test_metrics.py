@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+📈 Metrics Tests
+================
+
+Striped counters must add up, and /metrics output must be valid
+Prometheus text format. No Docker needed.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+from metrics import Registry
+
+
+def test_counter_sums_across_threads():
+    """Threads write to their stripes; the scrape sees the total"""
+    registry = Registry()
+    counter = registry.counter("votes_total", "Votes", ["choice"])
+
+    def worker():
+        for _ in range(1000):
+            counter.labels("Python").inc()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counter.labels("Python").value == 8000
+
+
+def test_short_lived_threads_do_not_grow_cells():
+    """A thread per request (threaded Flask) reuses the fixed stripes"""
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests", ["route"])
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    def request():
+        counter.labels("/api/vote").inc()
+        histogram.observe(0.05)
+
+    for _ in range(2000):
+        t = threading.Thread(target=request)
+        t.start()
+        t.join()
+
+    child = counter.labels("/api/vote")
+    assert child.value == 2000
+    assert histogram.count == 2000
+    assert len(child._cells._stripes) == len(histogram._cells._stripes) == metrics.STRIPES
+
+
+def test_histogram_buckets_are_cumulative():
+    """Observations land in the right bucket and buckets accumulate"""
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+    assert "latency_seconds_sum 6.05" in text
+
+
+def test_callback_gauge_is_read_at_scrape_time():
+    """Gauges with func= reflect live state"""
+    registry = Registry(prefix="engine_")
+    queue = []
+    registry.gauge("queue_depth", "Queue depth", func=lambda: len(queue))
+
+    queue.extend([1, 2, 3])
+
+    assert "engine_queue_depth 3" in registry.render()
+
+
+def test_render_has_help_and_type():
+    """Every metric family is announced with HELP and TYPE"""
+    registry = Registry()
+    registry.counter("requests_total", 'Requests "by" route', ["route"]).labels("/api/vote").inc()
+
+    text = registry.render()
+
+    assert '# HELP requests_total Requests \\"by\\" route' in text
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/api/vote"} 1' in text
+
+
+def test_wrong_label_count_is_rejected():
+    """labels() must match the declared label names"""
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests", ["route", "method"])
+
+    with pytest.raises(ValueError):
+        counter.labels("/api/vote")
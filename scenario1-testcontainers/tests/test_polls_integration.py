@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+🗳️ Polls Integration Tests
+==========================
+
+The engine's real schema in a PostgreSQL container: one vote per user
+per poll, closed and unknown polls refused, trigger-kept tallies - on a
+plain votes table and on a hash-partitioned one.
+Needs Docker; kept out of the demo script so the dashboard's test
+comparison stays quick.
+"""
+
+import os
+import sys
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configure TestContainers
+os.environ["TESTCONTAINERS_CLOUD_ENABLED"] = "false"
+if sys.platform == "win32":
+    os.environ["DOCKER_HOST"] = "tcp://localhost:2375"
+else:
+    os.environ["DOCKER_HOST"] = "unix:///var/run/docker.sock"
+
+from testcontainers.postgres import PostgresContainer
+import psycopg
+from psycopg import IntegrityError
+
+import bulk_load
+import db
+import schema
+
+
+class TestPollsWithTestContainers(unittest.TestCase):
+    """The engine's real schema: per-poll uniqueness and trigger-kept tallies"""
+
+    PARTITIONS = 0
+
+    @classmethod
+    def setUpClass(cls):
+        cls.postgres = PostgresContainer("postgres:15-alpine")
+        cls.postgres.start()
+        conn = psycopg.connect(
+            host=cls.postgres.get_container_host_ip(),
+            port=cls.postgres.get_exposed_port(5432),
+            user=cls.postgres.username,
+            password=cls.postgres.password,
+            dbname=cls.postgres.dbname
+        )
+        cls.layout = schema.init_schema(conn, partitions=cls.PARTITIONS)
+        conn.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        if hasattr(cls, 'postgres'):
+            cls.postgres.stop()
+
+    def setUp(self):
+        # Autocommit, like the engine's pooled connections
+        self.conn = psycopg.connect(
+            host=self.postgres.get_container_host_ip(),
+            port=self.postgres.get_exposed_port(5432),
+            user=self.postgres.username,
+            password=self.postgres.password,
+            dbname=self.postgres.dbname,
+            autocommit=True
+        )
+        db.delete_votes(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def tallies(self, poll_id):
+        return dict(db.fetch_stats(self.conn, poll_id)[0])
+
+    def test_one_vote_per_user_per_poll(self):
+        """Same user: once in every poll, never twice in one"""
+        other = db.create_poll(self.conn, "Tabs or spaces?", ["Tabs", "Spaces"])
+
+        self.assertTrue(db.insert_vote(self.conn, "user1", "Python"))
+        self.assertTrue(db.insert_vote(self.conn, "user1", "Tabs", other["id"]))
+        with self.assertRaises(IntegrityError):
+            db.insert_vote(self.conn, "user1", "Spaces", other["id"])
+
+        self.assertEqual(self.tallies(schema.DEFAULT_POLL_ID), {"Python": 1})
+        self.assertEqual(self.tallies(other["id"]), {"Tabs": 1})
+
+    def test_closed_or_unknown_polls_and_foreign_choices_are_refused(self):
+        """insert_vote() refuses without raising; nothing is counted"""
+        poll = db.create_poll(self.conn, "Vim or Emacs?", ["Vim", "Emacs"])
+
+        self.assertFalse(db.insert_vote(self.conn, "user1", "Nano", poll["id"]))
+        self.assertFalse(db.insert_vote(self.conn, "user1", "Vim", 999_999))
+        db.close_poll(self.conn, poll["id"])
+        self.assertFalse(db.insert_vote(self.conn, "user1", "Vim", poll["id"]))
+
+        self.assertEqual(self.tallies(poll["id"]), {})
+        self.assertFalse(db.get_poll(self.conn, poll["id"])["open"])
+
+    def test_tallies_follow_copy_delete_and_truncate(self):
+        """Every write path keeps the running tallies exact"""
+        poll = db.create_poll(self.conn, "Favourite database?")
+        votes = list(bulk_load.synthetic_votes(10_000, ("Postgres", "MySQL", "SQLite"), seed=3))
+        expected = Counter(choice for _, choice, _ in votes)
+
+        bulk_load.copy_votes(self.conn, votes, poll_id=poll["id"])
+        self.assertEqual(self.tallies(poll["id"]), dict(expected))
+        self.assertEqual(self.tallies(schema.DEFAULT_POLL_ID), {})
+
+        self.conn.execute("DELETE FROM votes WHERE poll_id = %s AND choice = 'MySQL'", (poll["id"],))
+        del expected["MySQL"]
+        self.assertEqual(self.tallies(poll["id"]), dict(expected))
+
+        listed = {p["id"]: p["total_votes"] for p in db.list_polls(self.conn)}
+        self.assertEqual(listed[poll["id"]], sum(expected.values()))
+
+        db.delete_votes(self.conn)
+        self.assertEqual(self.tallies(poll["id"]), {})
+
+    def test_recount_matches_tallies(self):
+        """count_votes() over the votes agrees with the trigger-kept tallies"""
+        votes = list(bulk_load.synthetic_votes(5_000, seed=9))
+        bulk_load.copy_votes(self.conn, votes)
+
+        self.assertEqual(self.layout, self.PARTITIONS)
+        self.assertEqual(db.count_votes(self.conn), db.fetch_stats(self.conn))
+
+
+class TestPartitionedPollsWithTestContainers(TestPollsWithTestContainers):
+    """The same checks with votes hash-partitioned on user_id"""
+
+    PARTITIONS = 4
+
+    def test_votes_spread_over_partitions(self):
+        """Every partition takes a share; a voter's rows all land in one"""
+        bulk_load.copy_votes(self.conn, bulk_load.synthetic_votes(4_000))
+        other = db.create_poll(self.conn, "Tabs or spaces?")
+        db.insert_vote(self.conn, "synth-7", "Tabs", other["id"])
+
+        rows = self.conn.execute(
+            "SELECT tableoid::regclass::text, COUNT(*) FROM votes GROUP BY 1 ORDER BY 1"
+        ).fetchall()
+        self.assertEqual([name for name, _ in rows], [f"votes_p{i}" for i in range(4)])
+        self.assertTrue(all(count > 500 for _, count in rows))
+
+        homes = self.conn.execute(
+            "SELECT DISTINCT tableoid FROM votes WHERE user_id = 'synth-7'"
+        ).fetchall()
+        self.assertEqual(len(homes), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+🔍 Pre-flight Tests
+===================
+
+Docker probing over a socket (a fake daemon on a Unix socket), the TTL
+cache, concurrent checks and failure reporting. No Docker needed.
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import preflight
+
+
+@pytest.fixture(autouse=True)
+def cache_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "preflight.json")
+    monkeypatch.setattr(preflight, "CACHE_FILE", path)
+    return path
+
+
+class FakeDaemon:
+    """Answers one HTTP request per connection, recording them"""
+
+    def __init__(self, path, status="200 OK", body=None):
+        self.body = json.dumps(body if body is not None else {"Version": "27.1.1"}).encode()
+        self.status = status
+        self.requests = []
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(4)
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            with conn:
+                self.requests.append(conn.recv(4096).decode())
+                head = f"HTTP/1.0 {self.status}\r\nContent-Type: application/json\r\n\r\n"
+                conn.sendall(head.encode() + self.body)
+
+    def close(self):
+        self.server.close()
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    server = FakeDaemon(str(tmp_path / "docker.sock"))
+    yield server
+    server.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_docker_check_talks_to_the_socket(daemon, tmp_path):
+    result = preflight.check_docker(f"unix://{tmp_path}/docker.sock")
+
+    assert result.ok
+    assert "v27.1.1" in result.detail
+    assert daemon.requests[0].startswith("GET /version HTTP/1.0")
+
+
+def test_docker_check_reports_missing_daemon(tmp_path):
+    result = preflight.check_docker(f"unix://{tmp_path}/nothing.sock")
+
+    assert not result.ok
+    assert "not reachable" in result.detail
+    assert result.fixes
+
+
+def test_docker_check_reports_http_errors(tmp_path):
+    server = FakeDaemon(str(tmp_path / "docker.sock"), status="500 Internal Server Error", body={})
+    try:
+        result = preflight.check_docker(f"unix://{tmp_path}/docker.sock")
+    finally:
+        server.close()
+
+    assert not result.ok
+    assert "HTTP 500" in result.detail
+
+
+def test_port_in_use_is_reported():
+    with socket.socket() as sock:
+        sock.bind(("0.0.0.0", 0))
+        sock.listen(1)
+        result = preflight.check_port(sock.getsockname()[1])
+
+    assert not result.ok
+    assert any("lsof" in fix for fix in result.fixes)
+
+
+def test_missing_packages_are_named():
+    result = preflight.check_packages(("json", "no_such_package_xyz"))
+
+    assert not result.ok
+    assert "no_such_package_xyz" in result.detail
+
+
+def test_successful_docker_check_is_cached(daemon, tmp_path, cache_file):
+    host = f"unix://{tmp_path}/docker.sock"
+
+    first = preflight.run(port=free_port(), docker_host=host, ttl=60, packages=("json",))
+    second = preflight.run(port=free_port(), docker_host=host, ttl=60, packages=("json",))
+
+    assert first.ok and second.ok
+    assert not first.results[0].cached
+    assert second.results[0].cached
+    assert second.results[0].detail == first.results[0].detail
+    assert len(daemon.requests) == 1
+    assert os.path.exists(cache_file)
+
+
+def test_cache_expires_and_is_keyed_by_host(daemon, tmp_path):
+    host = f"unix://{tmp_path}/docker.sock"
+    preflight.run(port=free_port(), docker_host=host, ttl=60, packages=())
+
+    with open(preflight.CACHE_FILE) as f:
+        entry = json.load(f)
+    entry["checked_at"] -= 120
+    with open(preflight.CACHE_FILE, "w") as f:
+        json.dump(entry, f)
+
+    assert not preflight.run(port=free_port(), docker_host=host, ttl=60, packages=()).results[0].cached
+    assert len(daemon.requests) == 2
+
+    other = preflight.run(port=free_port(), docker_host=f"unix://{tmp_path}/other.sock", ttl=60, packages=())
+    assert not other.ok
+
+
+def test_failures_are_not_cached(tmp_path, cache_file):
+    report = preflight.run(port=free_port(), docker_host=f"unix://{tmp_path}/nothing.sock", ttl=60, packages=())
+
+    assert not report.ok
+    assert not os.path.exists(cache_file)
+
+
+def test_checks_run_concurrently(monkeypatch):
+    # All three checks must be in flight together to get past this
+    barrier = threading.Barrier(3, timeout=2)
+
+    def waiting(name):
+        def check(*args):
+            barrier.wait()
+            return preflight.CheckResult(name, True, "ok")
+        return check
+
+    monkeypatch.setattr(preflight, "check_docker", waiting("Docker"))
+    monkeypatch.setattr(preflight, "check_port", waiting("Port"))
+    monkeypatch.setattr(preflight, "check_packages", waiting("Packages"))
+
+    report = preflight.run(ttl=0)
+
+    assert report.ok
+    assert [r.name for r in report.results] == ["Docker", "Port", "Packages"]
+    assert report.lines()[-1].startswith("⏱️  Pre-flight total:")
+
+
+def test_report_lists_fixes_for_failures():
+    report = preflight.PreflightReport([
+        preflight.CheckResult("Docker", True, "running"),
+        preflight.CheckResult("Port 5001", False, "already in use", fixes=["lsof -i :5001"]),
+    ], 0.012)
+
+    assert not report.ok
+    assert "   • lsof -i :5001" in report.lines()
+    assert "12 ms" in report.lines()[-1]
+
+
+def test_port_check_can_be_skipped(daemon, tmp_path):
+    report = preflight.run(port=None, docker_host=f"unix://{tmp_path}/docker.sock", ttl=0, packages=())
+
+    assert report.ok
+    assert [r.name for r in report.results] == ["Docker", "Packages"]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+🔥 Profiler Tests
+=================
+
+The sampling profiler must find a busy thread's hot function and
+refuse overlapping or unbounded sessions. No Docker needed.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiler
+
+
+def spin_until(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_busy_thread_shows_up_in_collapsed_stacks():
+    """Collapsed output attributes samples to the spinning function"""
+    stop = threading.Event()
+    worker = threading.Thread(target=spin_until, args=(stop,), name="Thread-3 (spin)")
+    worker.start()
+    try:
+        result = profiler.profile(seconds=0.3, interval=0.002)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result.samples > 10
+    assert "Thread (spin)" in result.threads_seen
+    spin_lines = [line for line in result.collapsed().splitlines() if "spin_until" in line]
+    assert spin_lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in spin_lines)
+
+
+def test_rejects_unbounded_sessions():
+    """Profiles are time-boxed"""
+    with pytest.raises(ValueError):
+        profiler.profile(seconds=profiler.MAX_SECONDS + 1)
+
+
+def test_start_hook_runs_only_for_a_profile_that_runs():
+    """Rejected arguments and busy profilers never announce a start"""
+    started = []
+    with pytest.raises(ValueError):
+        profiler.profile(seconds=0, on_start=lambda: started.append("bad"))
+
+    first = threading.Thread(target=profiler.profile,
+                             kwargs={"seconds": 0.3, "on_start": lambda: started.append("first")})
+    first.start()
+    time.sleep(0.05)
+    try:
+        with pytest.raises(profiler.ProfilerBusy):
+            profiler.profile(seconds=0.1, on_start=lambda: started.append("busy"))
+    finally:
+        first.join()
+
+    assert started == ["first"]
+
+
+def test_only_one_profile_at_a_time():
+    """A second concurrent profile is refused"""
+    first = threading.Thread(target=profiler.profile, kwargs={"seconds": 0.3})
+    first.start()
+    time.sleep(0.05)
+    try:
+        with pytest.raises(profiler.ProfilerBusy):
+            profiler.profile(seconds=0.1)
+    finally:
+        first.join()
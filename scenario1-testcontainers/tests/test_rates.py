@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+📈 Vote Rate Tests
+==================
+
+Circular buckets (wrap-around, gaps, stale writes), event counting,
+seeding from history and the once-a-second live payload. No Docker needed.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rates
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_ring_wraps_around_in_fixed_space():
+    ring = rates.RingSeries(width=1, size=5)
+    for t in range(12):
+        ring.add(t + 0.5, n=t)
+
+    assert len(ring.counts) == 5
+    assert ring.window(11.9, 5) == [7, 8, 9, 10, 11]
+
+
+def test_ring_reports_gaps_and_drops_stale_writes():
+    ring = rates.RingSeries(width=10, size=4)
+    ring.add(100)
+    ring.add(105)
+    ring.add(130)
+    ring.add(60)  # older than the window: would clobber bucket 10 otherwise
+
+    assert ring.window(139, 4) == [2, 0, 0, 1]
+    assert ring.window(139, 99) == ring.window(139, 4)
+
+
+def test_events_feed_every_resolution():
+    clock = Clock()
+    vote_rates = rates.VoteRates(clock=clock)
+    for event_type in ("vote_success", "vote_success", "vote_blocked", "rate_limited", "vote_attempt"):
+        vote_rates.record_event({"type": event_type})
+
+    seconds = vote_rates.snapshot("second", 3)
+    minutes = vote_rates.snapshot("minute", 3)
+
+    assert seconds["series"] == {"votes": [0, 0, 2], "duplicates": [0, 0, 1], "rate_limited": [0, 0, 1]}
+    assert minutes["series"]["votes"][-1] == 2
+    assert seconds["start"] == int(clock.now) - 2
+    assert minutes["bucket_seconds"] == 60
+
+
+def test_per_second_rate_uses_complete_buckets():
+    clock = Clock()
+    vote_rates = rates.VoteRates(clock=clock)
+    for age in range(1, 11):
+        vote_rates.record("votes", clock.now - age, n=4)
+    vote_rates.record("votes", n=100)  # current second, still filling
+
+    assert vote_rates.snapshot("second", 60)["per_second"]["votes"] == 4.0
+    assert vote_rates.snapshot("minute", 5)["per_second"]["votes"] == 0.0
+
+
+def test_seed_from_history_and_clear():
+    clock = Clock()
+    vote_rates = rates.VoteRates(clock=clock)
+
+    added = vote_rates.seed([(0, 3), (59, 2), (7000, 1), (10_000, 9)])
+    snapshot = vote_rates.snapshot("minute", 120)
+
+    assert added == 15
+    assert sum(snapshot["series"]["votes"]) == 6  # 10,000s ago is outside both windows
+    assert vote_rates.snapshot("second", 300)["series"]["votes"][-1] == 3
+
+    vote_rates.clear()
+    assert sum(vote_rates.snapshot("minute", 120)["series"]["votes"]) == 0
+
+
+def test_live_payload_is_built_once_per_second():
+    clock = Clock()
+    vote_rates = rates.VoteRates(clock=clock)
+
+    first = vote_rates.live_json()
+    vote_rates.record("votes")
+    assert vote_rates.live_json() is first
+
+    clock.now += 1
+    latest = vote_rates.live_json()
+    assert latest is not first
+    assert json.loads(latest)["series"]["votes"][-2:] == [1, 0]
+    assert len(json.loads(latest)["series"]["votes"]) == rates.LIVE_POINTS
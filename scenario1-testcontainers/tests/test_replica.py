@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+🪞 Read Replica Tests
+=====================
+
+The lag monitor's routing verdicts: staleness measured from WAL positions,
+the max_lag bound and its hysteresis, failures, expiry of old verdicts
+and the events on the lifecycle stream. No Docker needed.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import replica
+
+
+class Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def fetchone(self):
+        return self.row
+
+
+class FakePool:
+    """pool.connection() yielding a connection whose execute() answers `row` (or raises `error`)"""
+
+    def __init__(self, row=(1,), error=None):
+        self.row = row
+        self.error = error
+
+    def connection(self):
+        return self
+
+    def __enter__(self):
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        return FakeResult(self.row)
+
+
+def make_monitor(**kwargs):
+    clock = Clock()
+    events = []
+    monitor = replica.LagMonitor(max_lag=2.0, interval=0.5, retry_after=5.0, clock=clock,
+                                 on_event=lambda event_type, name, details: events.append((event_type, details)),
+                                 **kwargs)
+    # Attached without the background thread: checks are fed by hand
+    monitor.state = "starting"
+    return monitor, clock, events
+
+
+def test_caught_up_replica_takes_reads_until_the_verdict_expires():
+    monitor, clock, events = make_monitor()
+
+    assert not monitor.use_replica()
+    assert monitor.observe(100, 100) == "healthy"
+    assert monitor.use_replica()
+    assert [event_type for event_type, _ in events] == ["replica_caught_up"]
+
+    clock.now += 3 * monitor.interval + 0.1  # checks stopped (primary unreachable?)
+    assert not monitor.use_replica()
+
+
+def test_stalled_replica_ages_on_our_clock():
+    monitor, clock, events = make_monitor()
+    monitor.observe(100, 100)
+
+    clock.now += 1
+    monitor.observe(200, 100)
+    assert monitor.staleness == 1.0
+    assert monitor.lag_bytes == 100
+    assert monitor.use_replica()
+
+    clock.now += 1.5  # nothing new replayed: 2.5s behind
+    assert monitor.observe(300, 100) == "lagging"
+    assert not monitor.use_replica()
+
+    clock.now += 0.5
+    assert monitor.observe(300, 300) == "healthy"
+    assert monitor.staleness == 0.0
+    assert [event_type for event_type, _ in events] == ["replica_caught_up", "replica_lagging", "replica_caught_up"]
+    assert events[1][1]["reads_on"] == "primary"
+
+
+def test_staleness_follows_the_newest_replayed_position():
+    monitor, clock, _ = make_monitor()
+    for lsn in (100, 200, 300, 400):
+        monitor.observe(lsn, 100)
+        clock.now += 0.5
+
+    # Replayed up to what the primary had 1.5s ago (lsn 200 was seen at +0.5)
+    monitor.observe(500, 250)
+    assert monitor.staleness == 1.5
+
+
+def test_reads_return_only_well_within_the_bound():
+    monitor, clock, _ = make_monitor()
+    monitor.observe(100, 100)
+    clock.now += 3
+    monitor.observe(300, 100)
+    assert monitor.state == "lagging"
+
+    clock.now += 1.5
+    monitor.observe(400, 300)  # 1.5s behind: within max_lag, not within max_lag / 2
+    assert monitor.staleness == 1.5
+    assert monitor.state == "lagging"
+
+    clock.now += 0.5
+    monitor.observe(400, 400)
+    assert monitor.state == "healthy"
+
+
+def test_unknown_history_counts_as_lagging():
+    monitor, _, events = make_monitor()
+
+    assert monitor.observe(500, 100) == "lagging"
+    assert monitor.staleness is None
+    assert events[0][0] == "replica_lagging"
+
+
+def test_not_streaming_or_unreachable_is_down():
+    monitor, _, events = make_monitor()
+    monitor.observe(100, 100)
+
+    assert monitor.observe(100, None) == "down"
+    assert events[-1][1]["reason"] == "not streaming from the primary"
+
+    monitor.observe(100, 100)
+    assert monitor.observe(100, 100, reachable=False, reason="unreachable: refused") == "down"
+    assert monitor.status()["reason"] == "unreachable: refused"
+    assert [event_type for event_type, _ in events] == [
+        "replica_caught_up", "replica_down", "replica_caught_up", "replica_down"]
+
+
+def test_failed_query_holds_reads_on_the_primary():
+    monitor, clock, events = make_monitor()
+    monitor.observe(100, 100)
+
+    monitor.mark_down("query failed: connection reset")
+    assert not monitor.use_replica()
+
+    clock.now += 1
+    assert monitor.observe(100, 100) == "down"  # looks fine, but still held down
+    clock.now += 5
+    assert monitor.observe(100, 100) == "healthy"
+    assert [event_type for event_type, _ in events] == ["replica_caught_up", "replica_down", "replica_caught_up"]
+
+
+def test_check_asks_the_primary_and_pings_the_replica():
+    monitor, _, _ = make_monitor()
+
+    assert monitor._check(FakePool((300, 300)), FakePool()) == "healthy"
+    assert monitor._check(FakePool((300, 300)), FakePool(error=OSError("refused"))) == "down"
+    assert monitor.reason.startswith("unreachable")
+
+
+def test_detached_monitor_sends_everything_to_the_primary():
+    monitor, _, events = make_monitor()
+    monitor.observe(100, 100)
+
+    monitor.detach()
+    monitor.observe(100, 100)
+
+    assert monitor.state == "off"
+    assert not monitor.use_replica()
+    assert monitor.status()["reads_on"] == "primary"
+    assert len(events) == 1
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+🧱 Shard Tests
+==============
+
+Routing by user_id, tallies merged across shards, polls copied to every
+shard and the parallel fan-out, against fake shard pools. No Docker needed.
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import shards
+import shared_state
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeShard:
+    """A shard's pool and connection in one: canned tallies and polls, executed SQL recorded"""
+
+    def __init__(self, index, tallies=(), polls=None, delay=0.0, voters=()):
+        self.conninfo = {"host": f"shard-{index}"}
+        self.tallies = list(tallies)
+        self.voters = list(voters)
+        self.polls = polls if polls is not None else {}
+        self.delay = delay
+        self.executed = []
+        self.closed = False
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def execute(self, sql, params=None):
+        time.sleep(self.delay)
+        self.executed.append((sql, params))
+        if sql == db.POLL_TALLIES:
+            return FakeResult(self.tallies)
+        if sql == db.LIST_POLLS:
+            total = sum(count for _, count in self.tallies)
+            return FakeResult([(poll_id, "Q?", [], None, None, total) for poll_id in sorted(self.polls)])
+        if sql == db.CREATE_POLL:
+            return FakeResult([(7, params[0], params[1], datetime(2026, 1, 1), None)])
+        if sql in (db.GET_POLL, db.CLOSE_POLL):
+            poll_id = params[0]
+            return FakeResult([(poll_id, "Q?", [], None, None)] if poll_id in self.polls else [])
+        return FakeResult([])
+
+    def cursor(self):
+        return self
+
+    def stream(self, sql):
+        assert sql == db.VOTER_IDS
+        return [(f"1:{user_id}",) for user_id in self.voters]
+
+    def close(self):
+        self.closed = True
+
+
+def test_users_always_land_on_the_same_shard():
+    users = [f"user-{n}" for n in range(4000)]
+
+    assert [shards.shard_index(u, 4) for u in users] == [shards.shard_index(u, 4) for u in users]
+    spread = Counter(shards.shard_index(u, 4) for u in users)
+    assert set(spread) == {0, 1, 2, 3}
+    assert min(spread.values()) > 800  # roughly even
+    assert shards.shard_index("anyone", 1) == 0
+
+
+def test_tallies_merge_most_votes_first():
+    merged = shards.merge_tallies([
+        ([("Python", 5), ("Go", 2)], 7),
+        ([("Go", 4), ("Rust", 2)], 6),
+        ([], 0),
+    ])
+
+    assert merged == ([("Go", 6), ("Python", 5), ("Rust", 2)], 13)
+
+
+def test_votes_route_to_the_owning_shard():
+    fakes = [FakeShard(i) for i in range(3)]
+    shard_set = shards.ShardSet(fakes)
+
+    for user_id in ("alice", "bob", "carol"):
+        index = shards.shard_index(user_id, 3)
+        assert shard_set.pool_for(user_id) is fakes[index]
+        assert shard_set.conninfo_for(user_id) == {"host": f"shard-{index}"}
+
+
+def test_stats_fan_out_in_parallel():
+    fakes = [FakeShard(i, tallies=[("Python", i + 1)], delay=0.2) for i in range(4)]
+    shard_set = shards.ShardSet(fakes)
+
+    start = time.perf_counter()
+    rows, total = shards.fetch_stats(shard_set, poll_id=1)
+
+    assert rows == [("Python", 10)] and total == 10
+    assert time.perf_counter() - start < 0.6  # not 4 x 0.2s one after another
+    assert all(fake.executed == [(db.POLL_TALLIES, (1,))] for fake in fakes)
+
+
+def test_polls_are_created_on_shard_0_and_copied_under_its_id():
+    fakes = [FakeShard(i) for i in range(3)]
+    shard_set = shards.ShardSet(fakes)
+
+    poll = shards.create_poll(shard_set, "Tabs or spaces?", ["Tabs", "Spaces"])
+
+    assert poll["id"] == 7
+    assert fakes[0].executed[0][0] == db.CREATE_POLL
+    for fake in fakes[1:]:
+        assert fake.executed == [(shards.COPY_POLL, (7, "Tabs or spaces?", ["Tabs", "Spaces"],
+                                                      datetime(2026, 1, 1), None))]
+
+
+def test_polls_close_everywhere_and_list_with_summed_totals():
+    polls = {1: None, 2: None}
+    fakes = [FakeShard(i, tallies=[("Go", 10 * (i + 1))], polls=polls) for i in range(3)]
+    shard_set = shards.ShardSet(fakes)
+
+    assert shards.close_poll(shard_set, 2)["id"] == 2
+    assert shards.close_poll(shard_set, 9) is None
+    assert all((db.CLOSE_POLL, (2,)) in fake.executed for fake in fakes)
+
+    listed = shards.list_polls(shard_set)
+    assert [(p["id"], p["total_votes"]) for p in listed] == [(1, 60), (2, 60)]
+
+
+def test_close_releases_every_pool():
+    fakes = [FakeShard(i) for i in range(2)]
+    shard_set = shards.ShardSet(fakes)
+
+    assert shard_set.map(lambda conn: conn.conninfo["host"]) == ["shard-0", "shard-1"]
+    shard_set.close()
+
+    assert all(fake.closed for fake in fakes)
+
+
+def test_voter_cache_is_seeded_from_every_shard():
+    fakes = [FakeShard(0, voters=["alice", "bob"]), FakeShard(1, voters=["carol"])]
+    state = shared_state.LocalState()
+
+    assert state.seed_voters(shards.voter_ids(fakes)) == 3
+    assert all(state.voter_status(f"1:{user_id}")[0] for user_id in ("alice", "bob", "carol"))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+🧩 Shards Integration Tests
+===========================
+
+Votes spread over two PostgreSQL containers by user_id: one vote per
+user overall, tallies merged back up, polls copied to every shard.
+Needs Docker; kept out of the demo script so the dashboard's test
+comparison stays quick.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configure TestContainers
+os.environ["TESTCONTAINERS_CLOUD_ENABLED"] = "false"
+if sys.platform == "win32":
+    os.environ["DOCKER_HOST"] = "tcp://localhost:2375"
+else:
+    os.environ["DOCKER_HOST"] = "unix:///var/run/docker.sock"
+
+from testcontainers.postgres import PostgresContainer
+import psycopg
+from psycopg import IntegrityError
+
+import db
+import schema
+import shards
+
+
+class TestShardsWithTestContainers(unittest.TestCase):
+    """Votes spread over two Postgres containers: one vote per user overall, merged tallies"""
+
+    SHARDS = 2
+
+    @classmethod
+    def setUpClass(cls):
+        cls.containers = []
+        pools = []
+        for _ in range(cls.SHARDS):
+            container = PostgresContainer("postgres:15-alpine")
+            container.start()
+            cls.containers.append(container)
+            conninfo = {
+                "host": container.get_container_host_ip(),
+                "port": container.get_exposed_port(5432),
+                "user": container.username,
+                "password": container.password,
+                "dbname": container.dbname,
+            }
+            with psycopg.connect(**conninfo, autocommit=True) as conn:
+                schema.init_schema(conn)
+            pools.append(db.ConnectionPool(conninfo))
+        cls.shard_set = shards.ShardSet(pools)
+
+    @classmethod
+    def tearDownClass(cls):
+        if hasattr(cls, 'shard_set'):
+            cls.shard_set.close()
+        for container in getattr(cls, 'containers', []):
+            container.stop()
+
+    def setUp(self):
+        shards.delete_votes(self.shard_set)
+
+    def test_votes_spread_and_merge(self):
+        """Every shard takes some votes; stats add them back up"""
+        users = [f"user{n}" for n in range(40)]
+        for n, user_id in enumerate(users):
+            with self.shard_set.pool_for(user_id).connection() as conn:
+                db.insert_vote(conn, user_id, ("Python", "Go")[n % 2])
+
+        per_shard = self.shard_set.map(lambda conn: db.fetch_stats(conn)[1])
+        self.assertTrue(all(count > 0 for count in per_shard))
+        self.assertEqual(shards.fetch_stats(self.shard_set, db.DEFAULT_POLL_ID), ([("Go", 20), ("Python", 20)], 40))
+
+    def test_one_vote_per_user_across_shards(self):
+        """A second vote from the same user hits the same shard's unique constraint"""
+        with self.shard_set.pool_for("user1").connection() as conn:
+            db.insert_vote(conn, "user1", "Python")
+        with self.assertRaises(IntegrityError):
+            with self.shard_set.pool_for("user1").connection() as conn:
+                db.insert_vote(conn, "user1", "Rust")
+        self.assertEqual(shards.fetch_stats(self.shard_set, db.DEFAULT_POLL_ID)[1], 1)
+
+    def test_new_polls_take_votes_on_every_shard(self):
+        """A poll created through shard 0 exists, under the same id, on each shard"""
+        poll = shards.create_poll(self.shard_set, "Tabs or spaces?", ["Tabs", "Spaces"])
+        for n in range(20):
+            user_id = f"voter{n}"
+            with self.shard_set.pool_for(user_id).connection() as conn:
+                db.insert_vote(conn, user_id, "Tabs", poll_id=poll["id"])
+
+        self.assertEqual(shards.fetch_stats(self.shard_set, poll["id"]), ([("Tabs", 20)], 20))
+        listed = {p["id"]: p["total_votes"] for p in shards.list_polls(self.shard_set)}
+        self.assertEqual(listed[poll["id"]], 20)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+🔗 Shared State Tests
+=====================
+
+The single-process backend must keep the behaviour the engine had
+before multi-worker mode, and attached containers must look like the
+testcontainers objects the engine already uses. No Docker needed.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shared_state
+from shared_state import AttachedContainer, LocalState, describe_container, make_event
+
+
+def test_toggle_flips_flags_independently():
+    """Toggling one flag leaves the other alone"""
+    state = LocalState()
+    assert state.toggle("rate_limit") is True
+    assert state.flag("rate_limit") is True
+    assert state.flag("chaos") is False
+    assert state.toggle("rate_limit") is False
+
+
+def test_record_vote_returns_running_total():
+    """Totals span every choice; clearing starts over"""
+    state = LocalState()
+    state.record_vote("testcontainers")
+    state.record_vote("mocks")
+    assert state.record_vote("testcontainers") == 3
+    assert state.tallies() == {"testcontainers": 2, "mocks": 1}
+
+    state.clear_tallies()
+    assert state.tallies() == {}
+
+
+def test_tallies_are_kept_per_poll():
+    """A vote in another poll neither counts towards nor reports the show poll's total"""
+    state = LocalState()
+    state.record_vote("Python")
+    assert state.record_vote("Tabs", poll_id=2) == 1
+    assert state.record_vote("Python") == 2
+
+    assert state.tallies() == {"Python": 2}
+    assert state.tallies(2) == {"Tabs": 1}
+
+
+def test_known_voters_answer_repeat_votes():
+    """A voter is known once Postgres accepted (or rejected) their vote"""
+    state = LocalState()
+    known, epoch = state.voter_status("u1")
+    assert known is False
+
+    state.mark_voted("u1", epoch)
+    assert state.voter_status("u1") == (True, epoch)
+    assert state.voter_status("u2")[0] is False
+
+
+def test_votes_started_before_a_reset_are_not_remembered():
+    """The vote's row was deleted by the reset, so it must go to Postgres again"""
+    state = LocalState()
+    state.seed_voters(["old"])
+    _, epoch = state.voter_status("u1")
+
+    state.clear_voters()
+    state.mark_voted("u1", epoch)
+
+    assert state.voter_status("u1")[0] is False
+    assert state.voter_status("old")[0] is False
+
+
+def test_seeded_voters_are_capped(monkeypatch):
+    """Over the cap the set is partial - still only definite duplicates"""
+    monkeypatch.setattr(shared_state, "VOTER_CACHE_LIMIT", 2)
+    state = LocalState()
+
+    assert state.seed_voters(iter(["a", "b", "c"])) == 2
+    state.mark_voted("d", state.voter_status("d")[1])
+
+    assert [state.voter_status(u)[0] for u in "abcd"] == [True, True, False, False]
+
+
+def test_publish_goes_to_registered_callback():
+    """Events reach the buffer callback synchronously"""
+    received = []
+    state = LocalState()
+    state.start(received.append)
+
+    event = make_event("ready", "postgres", {"port": 5432})
+    state.publish(event)
+
+    assert received == [event]
+    assert set(event) == {"timestamp", "type", "container", "details", "id"}
+
+
+def test_local_state_cannot_request_container_actions():
+    """Only the supervisor can start or stop shared containers"""
+    with pytest.raises(RuntimeError):
+        LocalState().request("kill_redis")
+
+
+class FakeContainer:
+    username = "test"
+    password = "secret"
+    dbname = "test"
+
+    def get_container_host_ip(self):
+        return "localhost"
+
+    def get_exposed_port(self, port):
+        return str(50000 + port)
+
+
+def test_attached_container_round_trip():
+    """describe_container -> AttachedContainer preserves endpoint and credentials"""
+    fake = FakeContainer()
+    info = describe_container(fake, 5432, username=fake.username, password=fake.password, dbname=fake.dbname)
+    attached = AttachedContainer("postgres", info)
+
+    assert attached.get_container_host_ip() == "localhost"
+    assert attached.get_exposed_port(5432) == 55432
+    assert (attached.username, attached.password, attached.dbname) == ("test", "secret", "test")
+
+    with pytest.raises(RuntimeError):
+        attached.stop()
+
+
+def test_from_env_defaults_to_local(monkeypatch):
+    """Without SHARED_STATE_URL the engine stays single-process"""
+    monkeypatch.delenv("SHARED_STATE_URL", raising=False)
+    assert isinstance(shared_state.from_env(), LocalState)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+📊 Container Telemetry Tests
+============================
+
+Stats frames in the Docker API format must turn into the numbers
+`docker stats` shows, series must stay bounded and pressure must be
+reported once per crossing. No Docker needed.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetry import Sampler, make_sample
+
+
+def stats_frame(cpu_total=2_000, pre_total=1_000, system=20_000, pre_system=10_000,
+                mem=300, cache=100, limit=1_000, read=0, write=0, rx=0, tx=0):
+    return {
+        "cpu_stats": {"cpu_usage": {"total_usage": cpu_total}, "system_cpu_usage": system, "online_cpus": 2},
+        "precpu_stats": {"cpu_usage": {"total_usage": pre_total}, "system_cpu_usage": pre_system},
+        "memory_stats": {"usage": mem, "limit": limit, "stats": {"inactive_file": cache}},
+        "blkio_stats": {"io_service_bytes_recursive": [
+            {"op": "read", "value": read}, {"op": "write", "value": write}]},
+        "networks": {"eth0": {"rx_bytes": rx, "tx_bytes": tx}},
+        "pids_stats": {"current": 7},
+    }
+
+
+def test_sample_matches_docker_stats():
+    """CPU share across online CPUs; page cache isn't used memory"""
+    sample = make_sample(stats_frame(), now=10.0)
+    assert sample["cpu_percent"] == 20.0       # 1000/10000 * 2 CPUs
+    assert sample["mem_bytes"] == 200
+    assert sample["mem_percent"] == 20.0
+    assert sample["pids"] == 7
+    assert "net_rx_bps" not in sample           # no rate without a previous point
+
+
+def test_rates_from_cumulative_counters():
+    """I/O counters become bytes per second between kept samples"""
+    first = make_sample(stats_frame(read=1_000, rx=500), now=10.0)
+    second = make_sample(stats_frame(read=5_000, rx=2_500), previous=first, now=12.0)
+    assert second["blk_read_bps"] == 2_000.0
+    assert second["net_rx_bps"] == 1_000.0
+
+
+class FakeContainer:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def stats(self, stream, decode):
+        for frame in self.frames:
+            yield frame
+
+
+def run_sampler(sampler, name, frames):
+    sampler.track(name, FakeContainer(frames))
+    deadline = time.time() + 2
+    while name in sampler.tracking() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_series_is_bounded_and_stream_end_stops_tracking():
+    """History limit holds; a finished stream means the container is gone"""
+    sampler = Sampler(interval=0, history=3, event_interval=0)
+    run_sampler(sampler, "postgres", [stats_frame() for _ in range(10)])
+
+    snapshot = sampler.snapshot("postgres")["containers"]["postgres"]
+    assert len(snapshot["series"]) == 3
+    assert snapshot["tracking"] is False
+    assert snapshot["latest"] == snapshot["series"][-1]
+
+
+def test_pressure_reported_once_per_crossing():
+    """High memory raises one event; recovery needs a real drop"""
+    events = []
+    sampler = Sampler(interval=0, event_interval=0, mem_threshold=80,
+                      on_event=lambda *e: events.append(e))
+    frames = [stats_frame(mem=900, cache=0)] * 3 + [stats_frame(mem=750, cache=0), stats_frame(mem=100, cache=0)]
+    run_sampler(sampler, "postgres", frames)
+
+    assert [e[0] for e in events] == ["resource_pressure", "resource_recovered"]
+    assert events[0][1] == "postgres"
+    assert events[0][2]["metric"] == "mem_percent"
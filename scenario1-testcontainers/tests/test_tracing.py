@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+🔬 Tracing Tests
+================
+
+Spans must attribute time to the right stage, sampling must be
+respected, and the buffer must stay bounded. No Docker needed.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracing import Tracer
+
+
+def test_stage_breakdown():
+    """Repeated stages are summed in the breakdown"""
+    tracer = Tracer()
+
+    tracer.start("/api/vote", method="POST")
+    with tracer.span("insert"):
+        time.sleep(0.01)
+    with tracer.span("emit_event"):
+        pass
+    with tracer.span("emit_event"):
+        pass
+    trace = tracer.finish(status=200).to_dict()
+
+    assert trace["status"] == 200
+    assert trace["stages_ms"]["insert"] >= 10
+    assert len(trace["spans"]) == 3
+    assert set(trace["stages_ms"]) == {"insert", "emit_event"}
+
+
+def test_unsampled_requests_are_not_recorded():
+    """sample_rate=0 turns tracing into a no-op"""
+    tracer = Tracer(sample_rate=0.0)
+
+    assert tracer.start("/api/vote") is None
+    with tracer.span("insert"):
+        pass
+    assert tracer.finish(status=200) is None
+    assert len(tracer) == 0
+
+
+def test_slowest_first_and_bounded():
+    """Only the newest traces are kept, listed slowest first"""
+    tracer = Tracer(capacity=3)
+
+    for delay in (0.0, 0.02, 0.0, 0.01, 0.0):
+        tracer.start("/api/stats")
+        time.sleep(delay)
+        tracer.finish(status=200)
+
+    traces = tracer.slowest(10)
+
+    assert len(traces) == 3
+    assert traces[0]["duration_ms"] >= traces[1]["duration_ms"] >= traces[2]["duration_ms"]
+    assert traces[0]["duration_ms"] >= 10
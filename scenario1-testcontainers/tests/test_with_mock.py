@@ -17,6 +17,10 @@ import os
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Progress shows up on the Reality Engine dashboard when it launched us
+# (no-op when run on its own)
+import event_bus
+
 class MockDatabase:
     """A mock database that doesn't enforce constraints"""
     
@@ -133,6 +137,7 @@ def demonstrate_mock_problem():
     print(f"   Result: {'✅ PASS' if result2 else '❌ FAIL'}")
     print(f"   Votes in mock: {len(mock_db.votes)}")
     print("   ⚠️  PROBLEM: Mock allows duplicate vote!")
+    event_bus.publish("duplicate_allowed", "mock", {"votes_for_user1": len(mock_db.votes)})
     
     print("\n📝 Test 3: Multiple duplicates")
     for i in range(3):
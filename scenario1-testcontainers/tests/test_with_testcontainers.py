@@ -35,6 +35,10 @@ except ImportError as e:
     print("Run: pip install testcontainers psycopg[binary]")
     sys.exit(1)
 
+# Progress shows up on the Reality Engine dashboard when it launched us
+# (no-op when run on its own)
+import event_bus
+
 def submit_vote_testcontainers(conn, user_id, choice):
     """Submit vote using real PostgreSQL database"""
     cur = conn.cursor()
@@ -93,6 +97,7 @@ class TestVotingWithTestContainers(unittest.TestCase):
         
         setup_time = time.time() - start_time
         print(f"✅ PostgreSQL ready! (startup: {setup_time:.1f}s)")
+        event_bus.publish("container_ready", "testcontainers", {"startup_time": f"{setup_time:.1f}s"})
         
         # Set up database schema
         setup_test_database(cls.postgres)
@@ -238,6 +243,7 @@ def demonstrate_testcontainers_solution():
     with PostgresContainer("postgres:15-alpine") as postgres:
         setup_time = time.time() - start_time
         print(f"✅ PostgreSQL ready! (startup: {setup_time:.1f}s)")
+        event_bus.publish("container_ready", "testcontainers", {"startup_time": f"{setup_time:.1f}s"})
         
         # Set up database
         setup_test_database(postgres)
@@ -270,6 +276,7 @@ def demonstrate_testcontainers_solution():
         result2 = submit_vote_testcontainers(conn, "user1", "Python")
         print(f"   Result: {'✅ PASS' if result2 else '❌ FAIL'}")
         print("   🎯 MAGIC: Real database caught duplicate vote!")
+        event_bus.publish("duplicate_blocked", "testcontainers", {"constraint": "UNIQUE(user_id)"})
         
         # Check vote count
         cur = conn.cursor()
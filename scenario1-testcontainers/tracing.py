@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+🔬 Reality Engine Request Tracing
+=================================
+
+Lightweight per-request spans: "where did the 800ms of this vote go?"
+
+A trace is started per request (head-sampled at `sample_rate`), stages are
+wrapped in `span()` blocks, and finished traces land in a bounded in-memory
+buffer. Unsampled requests pay one ContextVar lookup per span - cheap
+enough to leave on in production.
+
+Usage:
+    from tracing import TRACER
+
+    TRACER.start("/api/vote", method="POST")
+    with TRACER.span("insert"):
+        cur.execute(...)
+    TRACER.finish(status=200)
+
+    TRACER.slowest(10)   # slowest recent traces with stage breakdowns
+"""
+
+import contextvars
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+_current_trace = contextvars.ContextVar("reality_engine_trace", default=None)
+
+class Trace:
+    """One traced request: a name plus a flat list of timed spans"""
+
+    __slots__ = ("id", "name", "method", "started_at", "start", "duration", "status", "spans")
+
+    def __init__(self, name, method=None):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.method = method
+        self.started_at = datetime.now().isoformat()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.status = None
+        self.spans = []
+
+    def stages(self):
+        """Total time per stage name (a stage may run more than once)"""
+        totals = {}
+        for name, _offset, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "method": self.method,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "stages_ms": {
+                name: round(duration * 1000, 3) for name, duration in self.stages().items()
+            },
+            "spans": [
+                {"name": name, "offset_ms": round(offset * 1000, 3), "duration_ms": round(duration * 1000, 3)}
+                for name, offset, duration in self.spans
+            ],
+        }
+
+class Tracer:
+    """Samples requests, times their stages and keeps recent traces"""
+
+    def __init__(self, capacity=500, sample_rate=1.0):
+        self.sample_rate = sample_rate
+        self._traces = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return self._traces.maxlen
+
+    def configure(self, sample_rate=None, capacity=None):
+        """Change sampling rate and/or buffer size at runtime"""
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("sample_rate must be between 0.0 and 1.0")
+            self.sample_rate = sample_rate
+        if capacity is not None:
+            if capacity < 1:
+                raise ValueError("capacity must be at least 1")
+            with self._lock:
+                self._traces = deque(self._traces, maxlen=capacity)
+
+    def start(self, name, method=None):
+        """Begin a trace for the current request (None if not sampled)"""
+        if self.sample_rate <= 0.0 or (self.sample_rate < 1.0 and random.random() >= self.sample_rate):
+            _current_trace.set(None)
+            return None
+        trace = Trace(name, method)
+        _current_trace.set(trace)
+        return trace
+
+    def finish(self, status=None):
+        """Close the current trace and store it"""
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        _current_trace.set(None)
+        trace.duration = time.perf_counter() - trace.start
+        trace.status = status
+        with self._lock:
+            self._traces.append(trace)
+        return trace
+
+    @contextmanager
+    def span(self, name):
+        """Time a stage of the current trace (no-op when not sampled)"""
+        trace = _current_trace.get()
+        if trace is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            trace.spans.append((name, start - trace.start, end - start))
+
+    def slowest(self, limit=20, name=None):
+        """Slowest buffered traces first, optionally for one route"""
+        with self._lock:
+            traces = list(self._traces)
+        if name:
+            traces = [t for t in traces if t.name == name]
+        traces.sort(key=lambda t: t.duration, reverse=True)
+        return [t.to_dict() for t in traces[:limit]]
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+    def __len__(self):
+        return len(self._traces)
+
+TRACER = Tracer()
@@ -3,43 +3,152 @@
 Real-time Docker container monitor
 Watch TestContainers spin up and down during workshop/demos
 Works in Codespaces and local environments
+
+Follows the Docker events stream instead of polling `docker ps`, so
+containers that live for less than a second still show up, with their
+exact lifetime.
 """
 
-import subprocess
+import threading
 import time
 import sys
 import os
 from datetime import datetime
 
+try:
+    import docker
+except ImportError as e:
+    print(f"❌ Missing packages: {e}")
+    print("\n💡 Solution:")
+    print("   pip install -r requirements.txt")
+    sys.exit(1)
+
+from docker_events import ContainerTable, event_time, open_stream
+
+# Screen refresh when nothing happens (uptimes keep ticking)
+IDLE_REFRESH = 1.0
+
+# ANSI: cursor home + clear screen (no `clear` subprocess per frame)
+CLEAR = "\033[H\033[J"
+
+ICONS = {
+    "create": "🆕", "start": "🚀", "health_status": "💚", "kill": "🔪",
+    "stop": "🛑", "oom": "💥", "die": "⚰️ ", "destroy": "🧹",
+}
+
 def clear_screen():
     """Clear the terminal screen"""
-    os.system('clear' if os.name != 'nt' else 'cls')
-
-def get_containers():
-    """Get current container status"""
-    try:
-        result = subprocess.run(
-            ['docker', 'ps', '--format', 'table {{.Names}}\t{{.Image}}\t{{.Status}}\t{{.Ports}}'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        return result.stdout.strip()
-    except Exception as e:
-        return f"Error: {e}"
-
-def check_docker():
-    """Check if Docker is available"""
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        sys.stdout.write(CLEAR)
+
+def format_duration(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    if seconds < 120:
+        return f"{seconds:.1f}s"
+    return f"{int(seconds // 60)}m{int(seconds % 60):02d}s"
+
+def get_client():
+    """Docker client, or None if Docker is unreachable"""
     try:
-        subprocess.run(
-            ['docker', 'ps'],
-            capture_output=True,
-            timeout=5,
-            check=True
-        )
-        return True
-    except:
-        return False
+        client = docker.from_env()
+        client.ping()
+        return client
+    except Exception:
+        return None
+
+class Watcher:
+    """Consumes the event stream in a thread; the main thread redraws"""
+
+    def __init__(self, client):
+        self.client = client
+        self.table = ContainerTable()
+        self.log = []
+        self.changed = threading.Event()
+        self.error = None
+
+    def start(self):
+        stream = open_stream(self.client)  # subscribe before the snapshot
+        self.table.seed(self.client)
+        threading.Thread(target=self._consume, args=(stream,), name="docker-events", daemon=True).start()
+
+    def _consume(self, stream):
+        try:
+            for event in stream:
+                change = self.table.apply(event)
+                if change is None:
+                    continue
+                action, record = change
+                detail = ""
+                if action == "die":
+                    detail = f" after {format_duration(record.lifetime())} (exit {record.exit_code})"
+                elif action == "health_status":
+                    detail = f": {record.health}"
+                stamp = datetime.fromtimestamp(event_time(event))
+                self.log.append(
+                    f"{stamp.strftime('%H:%M:%S.%f')[:-3]}  {ICONS.get(action, '•')} "
+                    f"{action:<14}{record.name} ({record.image}){detail}"
+                )
+                del self.log[:-8]
+                self.changed.set()
+        except Exception as e:
+            self.error = e
+            self.changed.set()
+
+    def render(self):
+        now = time.time()
+        lines = [
+            "🔍 Docker Container Monitor (Live)",
+            "=" * 78,
+            f"Time: {datetime.now().strftime('%H:%M:%S')}",
+            "Press Ctrl+C to stop",
+            "=" * 78,
+            "",
+            f"{'NAME':<26}{'IMAGE':<24}{'STATE':<10}{'HEALTH':<10}{'UPTIME':>8}",
+        ]
+        running = sorted(self.table.running(), key=lambda r: r.started_at or 0)
+        for record in running:
+            marker = "🧪" if record.testcontainer else "  "
+            lines.append(
+                f"{record.name[:24]:<24}{marker}{record.image[:22]:<24}{record.state:<10}"
+                f"{(record.health or '-'):<10}{format_duration(record.lifetime(now)):>8}"
+            )
+        if not running:
+            lines.append("(no running containers)")
+
+        recent = self.table.recent(5)
+        if recent:
+            lines += ["", "Recently finished:"]
+            for record in reversed(recent):
+                lines.append(
+                    f"   {record.name[:24]:<24}{record.image[:22]:<24}"
+                    f"lived {format_duration(record.lifetime()):>8}   exit {record.exit_code}"
+                )
+
+        stats = self.table.stats()
+        lines += [
+            "",
+            f"Lifetimes: {stats['finished']} finished / {stats['started']} started"
+            f" | mean {format_duration(stats['lifetime_mean'])}"
+            f" | min {format_duration(stats['lifetime_min'])}"
+            f" | max {format_duration(stats['lifetime_max'])}",
+        ]
+
+        if self.log:
+            lines += ["", "Events:"] + [f"   {line}" for line in list(self.log)]
+
+        lines += [
+            "",
+            "=" * 78,
+            "👀 Watch for postgres:15-alpine and redis:7-alpine containers",
+            "   They will appear when workshop/demo starts (🧪 = TestContainers)",
+        ]
+        clear_screen()
+        print("\n".join(lines), flush=True)
 
 def main():
     """Main watch loop"""
@@ -53,7 +162,8 @@ def main():
         print("📍 Running locally")
 
     # Check Docker
-    if not check_docker():
+    client = get_client()
+    if client is None:
         print("\n❌ Docker is not running!")
         print("   In Codespaces: Docker should be available")
         print("   Locally: Start Docker Desktop")
@@ -63,35 +173,25 @@ def main():
     print("\nWatching for TestContainers...")
     print("Press Ctrl+C to stop\n")
 
-    time.sleep(2)
+    watcher = Watcher(client)
+    watcher.start()
 
     try:
         while True:
-            clear_screen()
-
-            # Header
-            print("🔍 Docker Container Monitor (Live)")
-            print("=" * 70)
-            print(f"Time: {datetime.now().strftime('%H:%M:%S')}")
-            print(f"Press Ctrl+C to stop")
-            print("=" * 70)
-            print()
-
-            # Get containers
-            containers = get_containers()
-            print(containers)
-
-            # Footer
-            print()
-            print("=" * 70)
-            print("👀 Watch for postgres:15-alpine and redis:7-alpine containers")
-            print("   They will appear when workshop/demo starts")
+            watcher.render()
+            if watcher.error is not None:
+                print(f"\n❌ Lost the Docker event stream: {watcher.error}")
+                sys.exit(1)
 
-            # Refresh every second
-            time.sleep(1)
+            # Redraw immediately on a lifecycle change, else once a second
+            watcher.changed.wait(IDLE_REFRESH)
+            watcher.changed.clear()
 
     except KeyboardInterrupt:
+        stats = watcher.table.stats()
         print("\n\n✅ Container monitoring stopped")
+        print(f"   {stats['started']} started, {stats['finished']} finished, "
+              f"mean lifetime {format_duration(stats['lifetime_mean'])}")
         sys.exit(0)
 
 if __name__ == "__main__":
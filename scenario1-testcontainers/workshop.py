@@ -24,6 +24,7 @@ import os
 import sys
 import time
 import subprocess
+import threading
 from pathlib import Path
 
 # ==============================================================================
@@ -49,14 +50,38 @@ if sys.platform == "win32":
 else:
     os.environ["DOCKER_HOST"] = "unix:///var/run/docker.sock"
 
-try:
-    from testcontainers.postgres import PostgresContainer
-    import psycopg
-    from psycopg import IntegrityError
-except ImportError as e:
-    print(f"❌ Missing packages: {e}")
-    print("Run: python setup.py")
-    sys.exit(1)
+# testcontainers and psycopg are slow to import and Section 1 doesn't use
+# them: they load in a background thread while it runs
+WORKSHOP_PACKAGES = ("testcontainers", "psycopg")
+
+PostgresContainer = psycopg = IntegrityError = None
+_preload_thread = None
+_deps_error = None
+
+def _import_container_deps():
+    global PostgresContainer, psycopg, IntegrityError, _deps_error
+    try:
+        from testcontainers.postgres import PostgresContainer
+        import psycopg
+        from psycopg import IntegrityError
+    except ImportError as e:
+        _deps_error = e
+
+def preload_container_deps():
+    global _preload_thread
+    _preload_thread = threading.Thread(target=_import_container_deps, name="preload-deps", daemon=True)
+    _preload_thread.start()
+
+def require_container_deps():
+    """Wait for the background import (usually long done) before using containers"""
+    if _preload_thread is None:
+        _import_container_deps()
+    else:
+        _preload_thread.join()
+    if _deps_error is not None:
+        print(f"❌ Missing packages: {_deps_error}")
+        print("Run: python setup.py")
+        sys.exit(1)
 
 # ==============================================================================
 # HELPER FUNCTIONS FOR INTERACTIVE EXPERIENCE
@@ -204,6 +229,7 @@ def demo_testcontainers_magic():
 
     print_header("SECTION 2: TestContainers Magic",
                  "Watch real containers catch bugs that mocks miss")
+    require_container_deps()
 
     show_docker_tip()
     if ENVIRONMENT == 'codespaces':
@@ -433,6 +459,7 @@ def hands_on_exercise():
 
     print_header("SECTION 4: Your Turn - Hands-On Exercise",
                  "Practice what you learned with a real scenario")
+    require_container_deps()
 
     print("\n📝 EXERCISE: E-commerce Product Inventory")
     print("\nScenario:")
@@ -534,8 +561,28 @@ def test_product_sku_uniqueness():
 # MAIN WORKSHOP FLOW
 # ==============================================================================
 
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="TestContainers Magic - interactive workshop")
+    parser.add_argument("--check", action="store_true", help="Check Docker and packages, then exit")
+    return parser.parse_args(argv)
+
 def main():
     """Main workshop entry point"""
+    args = parse_args()
+
+    import preflight
+    if args.check:
+        report = preflight.run(port=None, packages=WORKSHOP_PACKAGES)
+        report.print()
+        sys.exit(0 if report.ok else 1)
+
+    packages = preflight.check_packages(WORKSHOP_PACKAGES)
+    if not packages.ok:
+        print(f"❌ Missing packages: {packages.detail}")
+        print("Run: python setup.py")
+        sys.exit(1)
+    preload_container_deps()
 
     print("\n" + "🧪" * 30)
     print("\n" + " " * 15 + "TestContainers Magic Workshop")